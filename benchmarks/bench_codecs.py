@@ -0,0 +1,90 @@
+"""
+Bytes per cached entry and decode time for each storage codec.
+
+Entries are built from stub PokeAPI documents the same way the service builds
+them, written to Redis with each codec and read back through a pipeline.
+
+    python -m benchmarks.bench_codecs --fake-redis --species 500
+"""
+
+import argparse
+import time
+
+from benchmarks.common import emit, setup_django, start_fake_redis
+from benchmarks.stubs import species_document, species_names
+
+
+def encoded_size(encoded):
+    if isinstance(encoded, bytes):
+        return len(encoded)
+    return sum(len(field) + len(value) for field, value in encoded.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--species", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.fake_redis:
+        start_fake_redis()
+    setup_django()
+    import redis
+
+    from pokemon.codecs import CODECS, get_codec
+    from pokemon.models import Pokemon, RedisClient
+
+    entries = []
+    for name in species_names(args.species):
+        species = Pokemon.create_pokemon(species_document(name)).pokemon_to_dict()
+        species.pop("translation", None)
+        entries.append(species)
+
+    report = {}
+    for codec_name in sorted(CODECS):
+        try:
+            codec = get_codec(codec_name)
+        except Exception as e:
+            report[codec_name] = {"error": str(e)}
+            continue
+        entry_keys = [f"bench:codec:{codec_name}:{entry['name']}" for entry in entries]
+
+        pipe = RedisClient.pipeline(transaction=False)
+        for key, entry in zip(entry_keys, entries):
+            codec.write(pipe, key, entry, None)
+        pipe.execute()
+
+        payload = sum(encoded_size(codec.encode(entry)) for entry in entries)
+        try:
+            memory = sum(RedisClient.memory_usage(key) or 0 for key in entry_keys)
+        except redis.ResponseError:
+            memory = None
+
+        pipe = RedisClient.pipeline(transaction=False)
+        for key in entry_keys:
+            codec.read(pipe, key)
+        raws = pipe.execute()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for raw in raws:
+                codec.decode(raw)
+        decode = (time.perf_counter() - started) / (args.rounds * len(raws))
+
+        report[codec_name] = {
+            "payload_bytes_per_entry": round(payload / len(entries), 1),
+            "redis_bytes_per_entry": (
+                round(memory / len(entries), 1) if memory else None
+            ),
+            "decode_us": round(decode * 1e6, 2),
+        }
+        RedisClient.delete(*entry_keys)
+
+    emit(
+        {"benchmark": "codecs", "entries": len(entries), "codecs": report}, args.output
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-miss latency of upstream calls: a fresh connection per call (the old
+bare ``requests.get``) against the pooled keep-alive session.
+
+    python -m benchmarks.bench_http_client --requests 200 --connect-latency 0.02
+"""
+
+import argparse
+import time
+
+import requests
+
+from benchmarks.common import emit, setup_django, summarize
+from benchmarks.stubs import StubUpstream
+
+
+def run(fetch, urls):
+    latencies = []
+    started = time.perf_counter()
+    for url in urls:
+        began = time.perf_counter()
+        fetch(url)
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.02,
+        help="seconds the stub stalls on each new connection (DNS/TCP/TLS)",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with StubUpstream(
+        species_count=args.requests,
+        latency=args.latency,
+        connect_latency=args.connect_latency,
+    ) as stub:
+        setup_django(**stub.settings_overrides())
+        from pokemon.services import make_request, reset_session
+
+        urls = [stub.pokemon_api_url + name for name in stub.names]
+
+        def bare(url):
+            response = requests.get(url)
+            response.raise_for_status()
+            return response.json()
+
+        connections = stub.counts["connections"]
+        unpooled = run(bare, urls)
+        unpooled["connections"] = stub.counts["connections"] - connections
+
+        reset_session()
+        connections = stub.counts["connections"]
+        pooled = run(make_request, urls)
+        pooled["connections"] = stub.counts["connections"] - connections
+
+    emit(
+        {
+            "benchmark": "http_client",
+            "connect_latency_s": args.connect_latency,
+            "latency_s": args.latency,
+            "unpooled": unpooled,
+            "pooled": pooled,
+            "p50_speedup": round(unpooled["p50_ms"] / max(pooled["p50_ms"], 1e-6), 2),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Parse time and peak memory of turning a PokeAPI species response into a
+Pokemon: decoding the whole document (what the service does), decoding it and
+then projecting it, and projecting it while parsing (what the species pack
+builder does).
+
+    python -m benchmarks.bench_ingestion --species 200
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import emit, setup_django
+from benchmarks.stubs import species_document, species_names
+
+
+def measure(bodies, ingest):
+    started = time.perf_counter()
+    for body in bodies:
+        ingest(body)
+    elapsed = time.perf_counter() - started
+
+    peaks = []
+    for body in bodies:
+        tracemalloc.start()
+        pokemon = ingest(body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del pokemon
+    return {
+        "parse_us": round(elapsed / len(bodies) * 1e6, 1),
+        "peak_kb_mean": round(sum(peaks) / len(peaks) / 1024, 1),
+        "peak_kb_max": round(max(peaks) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--species", type=int, default=200)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    setup_django()
+    from pokemon.models import Pokemon
+    from pokemon.projection import loads_species, project_species
+
+    bodies = [
+        json.dumps(species_document(name)).encode("utf-8")
+        for name in species_names(args.species)
+    ]
+
+    full = measure(bodies, lambda body: Pokemon.create_pokemon(json.loads(body)))
+    decoded_then_projected = measure(
+        bodies, lambda body: Pokemon.create_pokemon(project_species(json.loads(body)))
+    )
+    projected = measure(
+        bodies, lambda body: Pokemon.create_pokemon(loads_species(body))
+    )
+    emit(
+        {
+            "benchmark": "ingestion",
+            "body_kb_mean": round(sum(map(len, bodies)) / len(bodies) / 1024, 1),
+            "full": full,
+            "decoded_then_projected": decoded_then_projected,
+            "projected": projected,
+            "peak_reduction": round(
+                full["peak_kb_mean"] / projected["peak_kb_mean"], 2
+            ),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
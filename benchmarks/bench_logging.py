@@ -0,0 +1,101 @@
+"""
+Requests/sec on warm cache hits under different logging configurations:
+
+- debug: every debug message and the access log are written.
+- debug-sampled: the same, keeping 1% of the models' debug messages.
+- default: the shipped settings, INFO with the access log.
+- access-sampled: the access log sampled down to 10%.
+- quiet: WARNING only, no access log.
+
+Log lines go to /dev/null, so the numbers measure formatting and handling
+rather than the terminal. Requests go through Django's full handler and
+middleware stack in-process.
+
+    python -m benchmarks.bench_logging --fake-redis --requests 5000
+"""
+
+import argparse
+import copy
+import logging
+import logging.config
+import os
+
+from benchmarks.bench_rendered_cache import run
+from benchmarks.common import emit, setup_django, start_fake_redis
+
+
+def configure(base, stream, level="INFO", access=True, sample_rates=None):
+    config = copy.deepcopy(base)
+    for handler in config["handlers"].values():
+        handler["stream"] = stream
+    config["loggers"]["pokemon"]["level"] = level
+    config["loggers"]["pokemon.access"]["level"] = "INFO" if access else "CRITICAL"
+    for name, rate in (sample_rates or {}).items():
+        config["filters"][f"sample:{name}"] = {
+            "()": "pokemon.logs.SampleFilter",
+            "rate": rate,
+        }
+        config["loggers"].setdefault(name, {})["filters"] = [f"sample:{name}"]
+    logging.config.dictConfig(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--species", type=int, default=100)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.fake_redis:
+        start_fake_redis()
+    setup_django(quiet=False)
+    from django.conf import settings
+    from django.test import Client
+
+    from pokemon.models import Pokemon
+
+    names = [f"benchmon-{index:04d}" for index in range(args.species)]
+    for name in names:
+        Pokemon(
+            name=name,
+            description="A strange seed was planted on its back at birth.",
+            habitat="grassland",
+            isLegendary=False,
+            translation="A strange seed wast planted on its back at birth.",
+        ).save()
+
+    configurations = {
+        "debug": {"level": "DEBUG"},
+        "debug-sampled": {"level": "DEBUG", "sample_rates": {"pokemon.models": 0.01}},
+        "default": {},
+        "access-sampled": {"sample_rates": {"pokemon.access": 0.1}},
+        "quiet": {"level": "WARNING", "access": False},
+    }
+    client = Client()
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for variant, prefix in (
+            ("plain", "/pokemon/"),
+            ("translated", "/pokemon/translated/"),
+        ):
+            paths = [f"{prefix}{name}/" for name in names]
+            results[variant] = {}
+            for configuration, options in configurations.items():
+                configure(settings.LOGGING, devnull, **options)
+                run(client, paths, len(paths))
+                results[variant][configuration] = run(client, paths, args.requests)
+            results[variant]["quiet_vs_debug"] = round(
+                results[variant]["quiet"]["requests_per_sec"]
+                / results[variant]["debug"]["requests_per_sec"],
+                2,
+            )
+        configure(settings.LOGGING, devnull, level="WARNING", access=False)
+
+    emit({"benchmark": "logging", **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
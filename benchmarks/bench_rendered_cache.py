@@ -0,0 +1,81 @@
+"""
+Requests/sec on warm cache hits with and without the pre-rendered body cache.
+
+Requests go through Django's full handler and middleware stack in-process, so
+the numbers compare the view paths rather than the network.
+
+    python -m benchmarks.bench_rendered_cache --fake-redis --requests 5000
+"""
+
+import argparse
+import time
+
+from benchmarks.common import emit, setup_django, start_fake_redis, summarize
+
+
+def run(client, paths, requests):
+    latencies = []
+    started = time.perf_counter()
+    for index in range(requests):
+        began = time.perf_counter()
+        response = client.get(paths[index % len(paths)])
+        latencies.append(time.perf_counter() - began)
+        assert response.status_code == 200, response.status_code
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--species", type=int, default=100)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.fake_redis:
+        start_fake_redis()
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+
+    from pokemon.models import Pokemon
+
+    names = [f"benchmon-{index:04d}" for index in range(args.species)]
+    for name in names:
+        pokemon = Pokemon(
+            name=name,
+            description="A strange seed was planted on its back at birth.",
+            habitat="grassland",
+            isLegendary=False,
+            translation="A strange seed wast planted on its back at birth.",
+        )
+        pokemon.save()
+
+    client = Client()
+    results = {}
+    for variant, prefix in (
+        ("plain", "/pokemon/"),
+        ("translated", "/pokemon/translated/"),
+    ):
+        paths = [f"{prefix}{name}/" for name in names]
+        settings.POKEMON_RENDERED_CACHE = False
+        run(client, paths, len(paths))
+        current = run(client, paths, args.requests)
+
+        settings.POKEMON_RENDERED_CACHE = True
+        run(client, paths, len(paths))
+        rendered = run(client, paths, args.requests)
+
+        results[variant] = {
+            "current": current,
+            "rendered": rendered,
+            "speedup": round(
+                rendered["requests_per_sec"] / current["requests_per_sec"], 2
+            ),
+        }
+
+    emit({"benchmark": "rendered_cache", **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
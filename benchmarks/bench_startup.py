@@ -0,0 +1,153 @@
+"""
+Worker start-up and per-request cost of the default settings against the
+lean profile (pokedex/settings_lean.py).
+
+Each run is a fresh interpreter, as a worker would be, and reports:
+
+- import_ms: django.setup() plus loading the WSGI application, and how many
+  modules that imported.
+- cold_start_ms: from spawning the interpreter to its first response.
+- requests/sec and latency on warm cache hits through the full middleware
+  stack, in-process.
+
+    python -m benchmarks.bench_startup --fake-redis --runs 5 --requests 3000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import ROOT, emit, start_fake_redis, summarize
+
+PROFILES = {
+    "default": "pokedex.settings",
+    "lean": "pokedex.settings_lean",
+}
+SPECIES = 50
+
+
+def worker(requests_count):
+    """
+    Run in the child: start Django, answer one request, then measure warm
+    requests.
+    """
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    from django.core.wsgi import get_wsgi_application
+
+    get_wsgi_application()
+    import_s = time.perf_counter() - started
+    modules = len(sys.modules)
+
+    import logging
+
+    logging.disable(logging.INFO)
+    from django.test import Client
+
+    from pokemon.models import Pokemon
+
+    names = [f"benchmon-{index:04d}" for index in range(SPECIES)]
+    for name in names:
+        Pokemon(
+            name=name,
+            description="A strange seed was planted on its back at birth.",
+            habitat="grassland",
+            isLegendary=False,
+        ).save()
+
+    client = Client()
+    assert client.get(f"/pokemon/{names[0]}/").status_code == 200
+    first_response_at = time.time()
+
+    paths = [f"/pokemon/{name}/" for name in names]
+    latencies = []
+    began = time.perf_counter()
+    for index in range(requests_count):
+        request_started = time.perf_counter()
+        response = client.get(paths[index % len(paths)])
+        latencies.append(time.perf_counter() - request_started)
+        assert response.status_code == 200, response.status_code
+    print(
+        json.dumps(
+            {
+                "import_s": import_s,
+                "modules": modules,
+                "first_response_at": first_response_at,
+                "warm": summarize(latencies, time.perf_counter() - began),
+            }
+        )
+    )
+
+
+def spawn(settings_module, requests_count):
+    environment = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    spawned_at = time.time()
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_startup",
+            "--worker",
+            "--requests",
+            str(requests_count),
+        ],
+        cwd=ROOT,
+        env=environment,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["cold_start_s"] = result["first_response_at"] - spawned_at
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.requests)
+        return
+    if args.fake_redis:
+        start_fake_redis()
+
+    results = {}
+    for profile, settings_module in PROFILES.items():
+        runs = [spawn(settings_module, args.requests) for _ in range(args.runs)]
+        results[profile] = {
+            "import_ms": round(
+                statistics.median(run["import_s"] for run in runs) * 1000, 1
+            ),
+            "modules": runs[0]["modules"],
+            "cold_start_ms": round(
+                statistics.median(run["cold_start_s"] for run in runs) * 1000, 1
+            ),
+            "requests_per_sec": statistics.median(
+                run["warm"]["requests_per_sec"] for run in runs
+            ),
+            "p50_ms": statistics.median(run["warm"]["p50_ms"] for run in runs),
+            "p99_ms": statistics.median(run["warm"]["p99_ms"] for run in runs),
+        }
+    results["lean_speedup"] = round(
+        results["lean"]["requests_per_sec"] / results["default"]["requests_per_sec"],
+        2,
+    )
+    emit({"benchmark": "startup", "runs": args.runs, **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+import json
+import logging
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, Iterable
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(
+    settings_module: str = "pokedex.settings", quiet: bool = True, **overrides
+) -> None:
+    """
+    Configure Django for a standalone script and apply setting overrides.
+
+    With ``quiet`` records below WARNING are dropped, access log included, so
+    per-request log lines neither flood the output nor skew the numbers.
+    """
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    if quiet:
+        logging.disable(logging.INFO)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def start_fake_redis() -> None:
+    """
+    Serve an in-memory Redis on a free port and point the settings at it.
+
+    Must run before ``setup_django`` since the Redis client is created when
+    ``pokemon.models`` is imported.
+    """
+    import socket
+    import threading
+
+    from fakeredis import TcpFakeServer
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    server.daemon_threads = True
+
+    # The fake server writes each reply of a pipeline separately; with Nagle's
+    # algorithm on, every pipelined read would stall on a delayed ACK.
+    class RequestHandler(server.RequestHandlerClass):
+        disable_nagle_algorithm = True
+
+    server.RequestHandlerClass = RequestHandler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["REDIS_HOST"] = "127.0.0.1"
+    os.environ["REDIS_PORT"] = str(port)
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: Iterable[float], elapsed: float = None) -> Dict[str, float]:
+    """
+    Summarize latencies (in seconds) as milliseconds plus throughput.
+    """
+    samples = list(latencies)
+    summary = {
+        "requests": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+    }
+    if elapsed:
+        summary["requests_per_sec"] = round(len(samples) / elapsed, 1)
+    return summary
+
+
+def emit(result: Dict, output: str = None) -> None:
+    """
+    Print the result as JSON and optionally write it to a file.
+    """
+    text = json.dumps(result, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n")
@@ -0,0 +1,223 @@
+"""
+Load test of both endpoints against stub upstreams.
+
+The service runs in-process behind a threaded WSGI server and is driven over
+HTTP at each concurrency level through four scenarios:
+
+- cold: every request is the first for its species, nothing is cached.
+- warm: species and translations are all cached.
+- mixed: plain and translated lookups over half-cached species, with a few
+  unknown names.
+- translation-heavy: species are cached, translations are not.
+
+The cache is emptied before every run, so against a real Redis the service's
+keys are deleted; use ``--fake-redis`` or a scratch instance.
+
+    python -m benchmarks.loadtest --fake-redis --concurrency 1,8,32 \\
+        --requests 1000 --latency 0.05 --error-rate 0.01 --throttle-rate 0.05
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import requests
+
+from benchmarks.common import emit, setup_django, start_fake_redis, summarize
+from benchmarks.stubs import StubUpstream
+
+SCENARIOS = ("cold", "warm", "mixed", "translation-heavy")
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(application):
+    server = make_server(
+        "127.0.0.1",
+        0,
+        application,
+        server_class=ThreadingWSGIServer,
+        handler_class=QuietHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def plain(name):
+    return f"/pokemon/{name}/"
+
+
+def translated(name):
+    return f"/pokemon/translated/{name}/"
+
+
+def scenario_paths(scenario, names, requests_count, rng):
+    """
+    The paths to warm before measuring and the paths to measure.
+    """
+    if scenario == "cold":
+        count = min(requests_count, len(names))
+        return [], [plain(name) for name in rng.sample(names, count)]
+    if scenario == "warm":
+        warmup = [path(name) for name in names for path in (plain, translated)]
+        return warmup, [rng.choice(warmup) for _ in range(requests_count)]
+    if scenario == "mixed":
+        warmup = [plain(name) for name in names[: len(names) // 2]]
+        paths = []
+        for index in range(requests_count):
+            name = f"unknownmon-{index}" if rng.random() < 0.05 else rng.choice(names)
+            paths.append(translated(name) if rng.random() < 0.3 else plain(name))
+        return warmup, paths
+    if scenario == "translation-heavy":
+        return [plain(name) for name in names], [
+            translated(rng.choice(names)) for _ in range(requests_count)
+        ]
+    raise ValueError(f"Unknown scenario {scenario}")
+
+
+def reset_service(redis_client):
+    """
+    Empty every cache the service keeps and refill the translation quota.
+    """
+    from django.conf import settings
+
+    from pokemon.models import PokemonCache, TranslationBreaker, TranslationQuota
+
+    pattern = f"{settings.POKEMON_KEY_PREFIX}:*"
+    batch = list(redis_client.scan_iter(match=pattern, count=1000))
+    if batch:
+        redis_client.delete(*batch)
+    PokemonCache.clear()
+    TranslationQuota.reset()
+    TranslationBreaker.reset()
+
+
+def drive(base_url, paths, concurrency):
+    """
+    Send the requests from ``concurrency`` clients at once and summarize
+    their latencies and status codes.
+    """
+    local = threading.local()
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def send(path):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        began = time.perf_counter()
+        try:
+            status = session.get(base_url + path, timeout=60).status_code
+        except requests.RequestException:
+            status = "error"
+        elapsed = time.perf_counter() - began
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(status)] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, paths))
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary["status"] = dict(sorted(statuses.items()))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--translation-rate-limit",
+        type=int,
+        default=1_000_000,
+        help="translations allowed per period; the production default of 5 an "
+        "hour would turn translation-heavy runs into plain fallbacks",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",")
+    levels = [int(level) for level in args.concurrency.split(",")]
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f"unknown scenario {scenario}")
+
+    if args.fake_redis:
+        start_fake_redis()
+    os.environ["POKEMON_TRANSLATION_RATE_LIMIT"] = str(args.translation_rate_limit)
+
+    with StubUpstream(
+        species_count=args.species,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    ) as stub:
+        setup_django(**stub.settings_overrides())
+        from django.core.wsgi import get_wsgi_application
+
+        from pokemon.models import RedisClient
+
+        server = serve(get_wsgi_application())
+        base_url = "http://%s:%s" % server.server_address[:2]
+        rng = random.Random(args.seed)
+
+        results = {}
+        for scenario in scenarios:
+            results[scenario] = {}
+            for concurrency in levels:
+                reset_service(RedisClient)
+                warmup, paths = scenario_paths(scenario, stub.names, args.requests, rng)
+                drive(base_url, warmup, concurrency)
+                before = dict(stub.counts)
+                summary = drive(base_url, paths, concurrency)
+                summary["upstream"] = {
+                    key: stub.counts[key] - before[key]
+                    for key in ("species", "translations", "errors")
+                }
+                results[scenario][str(concurrency)] = summary
+        server.shutdown()
+
+    emit(
+        {
+            "benchmark": "loadtest",
+            "config": {
+                "requests": args.requests,
+                "species": args.species,
+                "latency_s": args.latency,
+                "error_rate": args.error_rate,
+                "throttle_rate": args.throttle_rate,
+                "seed": args.seed,
+            },
+            "scenarios": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
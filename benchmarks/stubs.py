@@ -0,0 +1,269 @@
+"""
+Local stand-ins for PokeAPI and funtranslations.
+
+The stub speaks keep-alive HTTP/1.1 so it can tell pooled clients apart from
+clients that reconnect on every call. ``connect_latency`` is paid once per new
+connection (standing in for DNS, TCP and TLS setup) while ``latency`` is paid
+on every request.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib import parse
+
+LANGUAGES = ["ja-Hrkt", "ko", "zh-Hant", "fr", "de", "es", "it", "en", "ja", "zh-Hans"]
+VERSIONS = ["red", "blue", "yellow", "gold", "silver", "crystal", "ruby", "sapphire"]
+HABITATS = ["cave", "forest", "grassland", "mountain", "rare", "sea", "urban", None]
+
+
+def species_names(count: int) -> List[str]:
+    return [f"stubmon-{index:04d}" for index in range(count)]
+
+
+def species_document(name: str) -> Dict:
+    """
+    Build a document shaped and sized like a real PokeAPI species response.
+    """
+    seed = random.Random(name)
+    habitat = seed.choice(HABITATS)
+    flavor_text_entries = [
+        {
+            "flavor_text": f"{name} ({language}/{version}): "
+            + " ".join(
+                seed.choice(["a", "quick", "electric", "mouse", "flame"])
+                for _ in range(20)
+            ),
+            "language": {
+                "name": language,
+                "url": f"https://pokeapi.co/api/v2/language/{index}/",
+            },
+            "version": {
+                "name": version,
+                "url": f"https://pokeapi.co/api/v2/version/{position}/",
+            },
+        }
+        for position, version in enumerate(VERSIONS, start=1)
+        for index, language in enumerate(LANGUAGES, start=1)
+    ]
+    return {
+        "id": seed.randint(1, 10000),
+        "name": name,
+        "order": seed.randint(1, 10000),
+        "base_happiness": 50,
+        "capture_rate": 45,
+        "color": {"name": "green", "url": "https://pokeapi.co/api/v2/pokemon-color/5/"},
+        "egg_groups": [
+            {"name": "monster", "url": "https://pokeapi.co/api/v2/egg-group/1/"}
+        ],
+        "flavor_text_entries": flavor_text_entries,
+        "form_descriptions": [],
+        "forms_switchable": False,
+        "gender_rate": 1,
+        "genera": [
+            {
+                "genus": f"Seed Pokémon ({language})",
+                "language": {"name": language, "url": "https://pokeapi.co/"},
+            }
+            for language in LANGUAGES
+        ],
+        "habitat": (
+            {"name": habitat, "url": "https://pokeapi.co/api/v2/pokemon-habitat/3/"}
+            if habitat
+            else None
+        ),
+        "is_baby": False,
+        "is_legendary": seed.random() < 0.05,
+        "is_mythical": False,
+        "names": [
+            {"language": {"name": language, "url": "https://pokeapi.co/"}, "name": name}
+            for language in LANGUAGES
+        ],
+        "pokedex_numbers": [
+            {
+                "entry_number": seed.randint(1, 1000),
+                "pokedex": {"name": f"dex-{index}", "url": "https://pokeapi.co/"},
+            }
+            for index in range(12)
+        ],
+        "varieties": [
+            {
+                "is_default": True,
+                "pokemon": {
+                    "name": name,
+                    "url": "https://pokeapi.co/api/v2/pokemon/1/",
+                },
+            }
+        ],
+    }
+
+
+class StubUpstream:
+    """
+    A threaded HTTP server serving species, species listings and translations.
+    """
+
+    def __init__(
+        self,
+        species_count: int = 200,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.names = species_names(species_count)
+        self.known = set(self.names)
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.counts = {"connections": 0, "species": 0, "translations": 0, "errors": 0}
+        self._counts_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def pokemon_api_url(self) -> str:
+        return f"{self.base_url}/api/v2/pokemon-species/"
+
+    @property
+    def shakespeare_url(self) -> str:
+        return f"{self.base_url}/translate/shakespeare.json"
+
+    @property
+    def yoda_url(self) -> str:
+        return f"{self.base_url}/translate/yoda.json"
+
+    def settings_overrides(self) -> Dict:
+        """
+        The settings that point the service at this stub.
+        """
+        return {
+            "POKEMON_API_URL": self.pokemon_api_url,
+            "SHAKESPEARE_TRANSLATION_API": self.shakespeare_url,
+            "YODA_TRANSLATION_API": self.yoda_url,
+            "HTTP_POOL_SIZES": {self.pokemon_api_url: 64, self.shakespeare_url: 16},
+        }
+
+    def count(self, key: str) -> None:
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    def start(self) -> "StubUpstream":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "StubUpstream":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def _make_handler(stub: StubUpstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            stub.count("connections")
+            if stub.connect_latency:
+                time.sleep(stub.connect_latency)
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if stub.latency:
+                time.sleep(stub.latency)
+            url = parse.urlsplit(self.path)
+            if url.path.startswith("/translate/"):
+                return self.translate(url)
+            if url.path.startswith("/api/v2/pokemon-species/"):
+                return self.species(url)
+            return self.send_json(404, {"detail": "Not found."})
+
+        def upstream_failure(self, throttle=False):
+            roll = stub.random.random()
+            if throttle and roll < stub.throttle_rate:
+                stub.count("errors")
+                self.send_json(429, {"error": {"code": 429}}, {"Retry-After": "60"})
+                return True
+            if roll < stub.throttle_rate + stub.error_rate:
+                stub.count("errors")
+                self.send_json(503, {"error": {"code": 503}})
+                return True
+            return False
+
+        def species(self, url):
+            name = url.path.rstrip("/").rsplit("/", 1)[-1]
+            if name == "pokemon-species":
+                query = parse.parse_qs(url.query)
+                limit = int(query.get("limit", ["20"])[0])
+                offset = int(query.get("offset", ["0"])[0])
+                page = stub.names[offset : offset + limit]
+                return self.send_json(
+                    200,
+                    {
+                        "count": len(stub.names),
+                        "results": [
+                            {"name": item, "url": f"{stub.pokemon_api_url}{item}/"}
+                            for item in page
+                        ],
+                    },
+                )
+            if self.upstream_failure():
+                return
+            if name not in stub.known:
+                return self.send_json(404, {"detail": "Not found."})
+            stub.count("species")
+            self.send_json(200, species_document(name))
+
+        def translate(self, url):
+            if self.upstream_failure(throttle=True):
+                return
+            stub.count("translations")
+            text = parse.parse_qs(url.query).get("text", [""])[0]
+            kind = url.path.rsplit("/", 1)[-1].split(".")[0]
+            self.send_json(
+                200,
+                {
+                    "success": {"total": 1},
+                    "contents": {
+                        "translated": f"[{kind}] {text}",
+                        "text": text,
+                        "translation": kind,
+                    },
+                },
+            )
+
+    return Handler
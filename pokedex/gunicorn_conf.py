@@ -0,0 +1,76 @@
+"""
+gunicorn configuration for serving the API in production.
+
+    gunicorn --config pokedex/gunicorn_conf.py
+
+The application is preloaded in the master, so settings, the species index
+and the species pack are loaded once and shared copy-on-write by the forked
+workers; each worker then drops the connections it inherited and warms its
+own caches before /ready passes. Read from the environment:
+
+- PORT: the port to bind on every interface, 5000 by default.
+- GUNICORN_WORKER_CLASS: sync, gthread (the default), gevent (needs gevent
+  installed) or uvicorn, which serves pokedex/asgi.py with async views.
+- GUNICORN_WORKERS: worker processes, 2 per CPU plus 1 by default.
+- GUNICORN_THREADS: threads per gthread worker, 4 by default.
+- GUNICORN_WORKER_CONNECTIONS: concurrent requests per gevent worker.
+- GUNICORN_TIMEOUT and GUNICORN_GRACEFUL_TIMEOUT, in seconds.
+- GUNICORN_MAX_REQUESTS: restart a worker after that many requests (with up
+  to 10% jitter), 0 to never.
+- GUNICORN_PRELOAD: 0 to import the application in every worker instead.
+"""
+
+import multiprocessing
+import os
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "gevent": "gevent",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+worker_type = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_type not in WORKER_CLASSES:
+    raise ValueError(
+        f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, "
+        f"not {worker_type!r}"
+    )
+worker_class = WORKER_CLASSES[worker_type]
+wsgi_app = (
+    "pokedex.asgi:application"
+    if worker_type == "uvicorn"
+    else "pokedex.wsgi:application"
+)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+preload_app = bool(int(os.environ.get("GUNICORN_PRELOAD", 1)))
+
+
+def when_ready(server):
+    # Without preloading the master never imports Django.
+    if server.cfg.preload_app:
+        from pokemon.workers import preload
+
+        preload()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from pokemon.workers import reset_after_fork
+
+        reset_after_fork()
+
+
+def post_worker_init(worker):
+    from pokemon.workers import warm_up
+
+    warm_up()
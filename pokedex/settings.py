@@ -3,7 +3,7 @@ from pathlib import Path
 
 
 def get_env_with_context(value: str, default=None, context="DJANGO") -> str:
-    return os.environ.get(f"{context}_{value}")
+    return os.environ.get(f"{context}_{value}", default)
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -16,7 +16,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = get_env_with_context("SECRET_KEY", default="secret")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = bool(get_env_with_context("SECRET_KEY", default=1))
+DEBUG = bool(int(get_env_with_context("DEBUG", default=1)))
 
 ALLOWED_HOSTS = get_env_with_context("ALLOWED_HOSTS", default="*").split(" ")
 
@@ -36,6 +36,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "pokemon.middleware.MetricsMiddleware",
+    "pokemon.middleware.AccessLogMiddleware",
+    "pokemon.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -120,7 +123,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REDIS_HOST = get_env_with_context("HOST", default="localhost", context="REDIS")
 
-REDIS_PORT = 6379
+REDIS_PORT = int(get_env_with_context("PORT", default=6379, context="REDIS"))
 
 POKEMON_API_URL = "https://pokeapi.co/api/v2/pokemon-species/"
 
@@ -129,3 +132,326 @@ SHAKESPEARE_TRANSLATION_API = (
 )
 
 YODA_TRANSLATION_API = "https://api.funtranslations.com/translate/yoda.json"
+
+# Serve the native async views. pokedex/asgi.py turns this on by default since
+# sync views under ASGI are pushed onto a thread pool.
+POKEMON_ASYNC_VIEWS = bool(
+    int(get_env_with_context("ASYNC_VIEWS", default=0, context="POKEMON"))
+)
+
+# In-process cache of decoded Pokemon in front of Redis. Every save is
+# published on the invalidation channel so other workers drop their copy.
+# A size of 0 disables it.
+POKEMON_L1_CACHE_SIZE = int(
+    get_env_with_context("L1_CACHE_SIZE", default=1024, context="POKEMON")
+)
+
+POKEMON_L1_CACHE_TTL = float(
+    get_env_with_context("L1_CACHE_TTL", default=60, context="POKEMON")
+)
+
+POKEMON_CACHE_INVALIDATION_CHANNEL = "pokedex:invalidate"
+
+# Concurrent misses for the same species or translation share one upstream
+# call. The lease bounds how long a worker may hold a fetch (keep it above the
+# upstream timeouts); the wait bounds how long everyone else waits for it
+# before fetching themselves.
+POKEMON_SINGLE_FLIGHT_LEASE = float(
+    get_env_with_context("SINGLE_FLIGHT_LEASE", default=15, context="POKEMON")
+)
+
+POKEMON_SINGLE_FLIGHT_WAIT = float(
+    get_env_with_context("SINGLE_FLIGHT_WAIT", default=10, context="POKEMON")
+)
+
+# How long stored entries live in Redis, in seconds (0 keeps them forever).
+# Species data and translations expire independently; each expiry is spread
+# by up to +/- POKEMON_TTL_JITTER of its TTL.
+POKEMON_SPECIES_TTL = int(
+    get_env_with_context("SPECIES_TTL", default=7 * 24 * 60 * 60, context="POKEMON")
+)
+
+POKEMON_TRANSLATION_TTL = int(
+    get_env_with_context(
+        "TRANSLATION_TTL", default=30 * 24 * 60 * 60, context="POKEMON"
+    )
+)
+
+POKEMON_TTL_JITTER = 0.1
+
+# Opt-in: keep the final JSON body of each response in Redis and serve it
+# without building a Pokemon, validating or rendering. Bodies are dropped
+# whenever the data behind them changes.
+POKEMON_RENDERED_CACHE = bool(
+    int(get_env_with_context("RENDERED_CACHE", default=0, context="POKEMON"))
+)
+
+POKEMON_RENDERED_CACHE_TTL = int(
+    get_env_with_context("RENDERED_CACHE_TTL", default=24 * 60 * 60, context="POKEMON")
+)
+
+# Cache-Control for successful responses. Clients and CDNs may reuse a body
+# for HTTP_MAX_AGE seconds, then keep serving it for up to
+# HTTP_STALE_WHILE_REVALIDATE seconds while they revalidate it with its ETag.
+# With HTTP_MAX_AGE=0 every reuse has to be revalidated.
+POKEMON_HTTP_MAX_AGE = int(
+    get_env_with_context("HTTP_MAX_AGE", default=60 * 60, context="POKEMON")
+)
+
+POKEMON_HTTP_STALE_WHILE_REVALIDATE = int(
+    get_env_with_context(
+        "HTTP_STALE_WHILE_REVALIDATE", default=24 * 60 * 60, context="POKEMON"
+    )
+)
+
+# Redis keys look like "<prefix>:v<schema version>:species:<name>". Species
+# data is stored with the configured codec: "json", "msgpack" or "hash" (a
+# Redis hash with short field names). Run `manage.py migrate_pokedex_cache`
+# after changing either.
+POKEMON_KEY_PREFIX = get_env_with_context(
+    "KEY_PREFIX", default="pdx", context="POKEMON"
+)
+
+POKEMON_CACHE_CODEC = get_env_with_context(
+    "CACHE_CODEC", default="json", context="POKEMON"
+)
+
+# Bulk lookups: how many names one request may ask for, and how many upstream
+# fetches or translations a worker runs at once to fill the misses.
+POKEMON_BULK_MAX_NAMES = int(
+    get_env_with_context("BULK_MAX_NAMES", default=200, context="POKEMON")
+)
+
+POKEMON_BULK_CONCURRENCY = int(
+    get_env_with_context("BULK_CONCURRENCY", default=16, context="POKEMON")
+)
+
+# Stale-while-revalidate: species data older than the soft TTL is still
+# served, and refreshed in the background on a pool of REFRESH_CONCURRENCY
+# threads. Data older than the hard TTL is refetched before it is served.
+# Keep the hard TTL below POKEMON_SPECIES_TTL, after which Redis drops the entry.
+POKEMON_SOFT_TTL = int(
+    get_env_with_context("SOFT_TTL", default=24 * 60 * 60, context="POKEMON")
+)
+
+POKEMON_HARD_TTL = int(
+    get_env_with_context("HARD_TTL", default=6 * 24 * 60 * 60, context="POKEMON")
+)
+
+POKEMON_REFRESH_CONCURRENCY = int(
+    get_env_with_context("REFRESH_CONCURRENCY", default=4, context="POKEMON")
+)
+
+# funtranslations quota, shared by every worker through Redis: at most
+# TRANSLATION_RATE_LIMIT calls per TRANSLATION_RATE_PERIOD seconds (0 turns
+# the limit off). A 429, or BREAKER_THRESHOLD 5xx/connection failures in a
+# row, stop translation calls for BREAKER_COOLDOWN seconds (or as long as the
+# Retry-After header asks); descriptions are served untranslated meanwhile.
+POKEMON_TRANSLATION_RATE_LIMIT = int(
+    get_env_with_context("TRANSLATION_RATE_LIMIT", default=5, context="POKEMON")
+)
+
+POKEMON_TRANSLATION_RATE_PERIOD = int(
+    get_env_with_context("TRANSLATION_RATE_PERIOD", default=60 * 60, context="POKEMON")
+)
+
+POKEMON_TRANSLATION_BREAKER_THRESHOLD = int(
+    get_env_with_context("TRANSLATION_BREAKER_THRESHOLD", default=3, context="POKEMON")
+)
+
+POKEMON_TRANSLATION_BREAKER_COOLDOWN = int(
+    get_env_with_context("TRANSLATION_BREAKER_COOLDOWN", default=60, context="POKEMON")
+)
+
+# How the translated endpoint gets a missing translation: "inline" calls
+# funtranslations during the request; "queue" queues a job for
+# `manage.py translation_worker` and answers straight away, with the plain
+# description (PENDING_STATUS 200) or a 202 telling clients to retry after
+# RETRY_AFTER seconds.
+POKEMON_TRANSLATION_MODE = get_env_with_context(
+    "TRANSLATION_MODE", default="inline", context="POKEMON"
+)
+
+POKEMON_TRANSLATION_PENDING_STATUS = int(
+    get_env_with_context("TRANSLATION_PENDING_STATUS", default=200, context="POKEMON")
+)
+
+POKEMON_TRANSLATION_RETRY_AFTER = int(
+    get_env_with_context("TRANSLATION_RETRY_AFTER", default=5, context="POKEMON")
+)
+
+# Translations are also stored by translation type and source text, so a
+# text shared by several species is only translated once. Entries expire
+# this many seconds after they were last read; 0 keeps them forever.
+POKEMON_TRANSLATION_STORE_TTL = int(
+    get_env_with_context(
+        "TRANSLATION_STORE_TTL", default=90 * 24 * 60 * 60, context="POKEMON"
+    )
+)
+
+# Names PokeAPI doesn't know are remembered for NEGATIVE_TTL seconds. With a
+# species index snapshot (`manage.py build_species_index`), names missing
+# from it are rejected without any Redis or PokeAPI call; the file is
+# re-read when it changes, checked every SPECIES_INDEX_REFRESH seconds.
+POKEMON_NEGATIVE_TTL = int(
+    get_env_with_context("NEGATIVE_TTL", default=5 * 60, context="POKEMON")
+)
+
+POKEMON_SPECIES_INDEX = get_env_with_context(
+    "SPECIES_INDEX", default=str(BASE_DIR / "species_index.json"), context="POKEMON"
+)
+
+POKEMON_SPECIES_INDEX_REFRESH = int(
+    get_env_with_context("SPECIES_INDEX_REFRESH", default=60, context="POKEMON")
+)
+
+# Where species data comes from: "remote" (PokeAPI) or "pack", a local data
+# pack built with `manage.py build_species_pack` and memory-mapped by every
+# worker. Restart workers after rebuilding the pack.
+POKEMON_DATA_SOURCE = get_env_with_context(
+    "DATA_SOURCE", default="remote", context="POKEMON"
+)
+
+POKEMON_SPECIES_PACK = get_env_with_context(
+    "SPECIES_PACK", default=str(BASE_DIR / "species.pack"), context="POKEMON"
+)
+
+# Descriptions are picked from the species' flavor texts in the requested
+# language (`?lang=`, DEFAULT_LANGUAGE otherwise). DESCRIPTION_POLICY picks
+# among them: "latest" (the newest game's text), "earliest", or "random",
+# which makes responses differ between species refreshes and workers.
+POKEMON_DEFAULT_LANGUAGE = get_env_with_context(
+    "DEFAULT_LANGUAGE", default="en", context="POKEMON"
+)
+
+POKEMON_DESCRIPTION_POLICY = get_env_with_context(
+    "DESCRIPTION_POLICY", default="latest", context="POKEMON"
+)
+
+# Timings and counters served at /metrics in the Prometheus text format.
+# Each worker buffers them in memory and adds them to a Redis hash shared by
+# all workers every METRICS_FLUSH_INTERVAL seconds, so any worker's /metrics
+# shows the totals.
+POKEMON_METRICS = bool(
+    int(get_env_with_context("METRICS", default=1, context="POKEMON"))
+)
+
+POKEMON_METRICS_FLUSH_INTERVAL = float(
+    get_env_with_context("METRICS_FLUSH_INTERVAL", default=5, context="POKEMON")
+)
+
+# Logging. The service's loggers ("pokemon.*") log at LOG_LEVEL; per-request
+# detail is at DEBUG. ACCESS_LOG writes one JSON line per request, with
+# timings, to "pokemon.access". LOG_SAMPLE_RATES keeps only a fraction of
+# the INFO and DEBUG records of the loggers it lists, e.g.
+# "pokemon.access=0.1,pokemon.models=0.01"; warnings and errors are kept.
+POKEMON_LOG_LEVEL = get_env_with_context("LOG_LEVEL", default="INFO", context="POKEMON")
+
+POKEMON_ACCESS_LOG = bool(
+    int(get_env_with_context("ACCESS_LOG", default=1, context="POKEMON"))
+)
+
+POKEMON_LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, _, rate in (
+        item.partition("=")
+        for item in get_env_with_context(
+            "LOG_SAMPLE_RATES", default="", context="POKEMON"
+        ).split(",")
+        if item.strip()
+    )
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+        "access": {"format": "%(message)s"},
+    },
+    "filters": {
+        f"sample:{name}": {"()": "pokemon.logs.SampleFilter", "rate": rate}
+        for name, rate in POKEMON_LOG_SAMPLE_RATES.items()
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"},
+        "access": {"class": "logging.StreamHandler", "formatter": "access"},
+    },
+    "loggers": {
+        "pokemon": {
+            "handlers": ["console"],
+            "level": POKEMON_LOG_LEVEL,
+            "propagate": False,
+        },
+        "pokemon.access": {
+            "handlers": ["access"],
+            "level": "INFO" if POKEMON_ACCESS_LOG else "CRITICAL",
+            "propagate": False,
+        },
+    },
+}
+
+for _name in POKEMON_LOG_SAMPLE_RATES:
+    LOGGING["loggers"].setdefault(_name, {})["filters"] = [f"sample:{_name}"]
+
+# Request profiling. A request to one of PROFILE_VIEWS is profiled with
+# cProfile when it carries an X-Pokedex-Profile header made by
+# `manage.py profiles --token` (valid for PROFILE_TOKEN_MAX_AGE seconds), when
+# it has ?profile=1 and comes from one of PROFILE_ALLOWED_IPS (space
+# separated), or for a PROFILE_SAMPLE_RATE fraction of requests. The newest
+# PROFILE_RING_SIZE profiles are kept in PROFILE_DIR.
+POKEMON_PROFILE_VIEWS = ("pokemon-retrieve", "pokemon-translate")
+
+POKEMON_PROFILE_TOKEN_MAX_AGE = int(
+    get_env_with_context("PROFILE_TOKEN_MAX_AGE", default=3600, context="POKEMON")
+)
+
+POKEMON_PROFILE_ALLOWED_IPS = get_env_with_context(
+    "PROFILE_ALLOWED_IPS", default="", context="POKEMON"
+).split()
+
+POKEMON_PROFILE_SAMPLE_RATE = float(
+    get_env_with_context("PROFILE_SAMPLE_RATE", default=0, context="POKEMON")
+)
+
+POKEMON_PROFILE_DIR = get_env_with_context(
+    "PROFILE_DIR", default=str(BASE_DIR / "profiles"), context="POKEMON"
+)
+
+POKEMON_PROFILE_RING_SIZE = int(
+    get_env_with_context("PROFILE_RING_SIZE", default=50, context="POKEMON")
+)
+
+# Species loaded into each worker's local cache before its readiness check
+# (/ready) passes, space separated.
+POKEMON_WARM_SPECIES = get_env_with_context(
+    "WARM_SPECIES", default="", context="POKEMON"
+).split()
+
+# Upstream HTTP client
+# Connections are pooled per upstream host and kept alive across requests.
+# Timeouts are in seconds; retries only cover connection errors and 502/503/504
+# so a 429 from funtranslations is never retried against the quota.
+
+HTTP_CONNECT_TIMEOUT = float(
+    get_env_with_context("CONNECT_TIMEOUT", default=3.05, context="HTTP")
+)
+
+HTTP_READ_TIMEOUT = float(
+    get_env_with_context("READ_TIMEOUT", default=10, context="HTTP")
+)
+
+HTTP_MAX_RETRIES = int(get_env_with_context("MAX_RETRIES", default=2, context="HTTP"))
+
+HTTP_RETRY_BACKOFF = float(
+    get_env_with_context("RETRY_BACKOFF", default=0.3, context="HTTP")
+)
+
+HTTP_POOL_SIZES = {
+    POKEMON_API_URL: int(
+        get_env_with_context("POKEAPI_POOL_SIZE", default=20, context="HTTP")
+    ),
+    SHAKESPEARE_TRANSLATION_API: int(
+        get_env_with_context("TRANSLATION_POOL_SIZE", default=4, context="HTTP")
+    ),
+}
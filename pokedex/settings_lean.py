@@ -0,0 +1,48 @@
+"""
+Lean settings for serving the API in production.
+
+The service is stateless JSON over Redis, so this profile drops what the
+default settings load for the admin and the browsable API: the auth,
+sessions, messages and staticfiles apps, templates, the database and the
+session, CSRF, auth, messages and clickjacking middleware. DRF renders and
+parses JSON only and runs no authentication or permission classes.
+
+Select it with DJANGO_SETTINGS_MODULE=pokedex.settings_lean; everything
+else, POKEMON_* settings included, is read as in pokedex/settings.py.
+"""
+
+from pokedex.settings import *  # noqa: F401,F403
+from pokedex.settings import get_env_with_context
+
+DEBUG = bool(int(get_env_with_context("DEBUG", default=0)))
+
+INSTALLED_APPS = [
+    "pokemon.apps.PokemonConfig",
+    "rest_framework",
+]
+
+# SecurityMiddleware sets the nosniff and referrer policy headers, and
+# CommonMiddleware redirects paths missing their trailing slash.
+MIDDLEWARE = [
+    "pokemon.middleware.MetricsMiddleware",
+    "pokemon.middleware.AccessLogMiddleware",
+    "pokemon.middleware.ProfilingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+TEMPLATES = []
+
+DATABASES = {}
+
+AUTH_PASSWORD_VALIDATORS = []
+
+USE_I18N = False
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+}
@@ -13,9 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.urls import include, path
 
+from pokemon.views import MetricsView, ReadyView
+
 urlpatterns = [
     path('pokemon/', include('pokemon.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('ready', ReadyView.as_view(), name='ready'),
 ]
@@ -0,0 +1,258 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import redis
+
+from pokemon import keys
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """
+    A bounded, thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    A ``maxsize`` of 0 disables the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CacheInvalidator:
+    """
+    Keeps a ``LocalCache`` coherent across processes over a Redis pub/sub channel.
+
+    Writers call ``publish`` with the key they changed; every other process
+    evicts it from its own cache. Messages carry an origin id so a process
+    ignores its own writes. If the subscription drops, the cache is cleared
+    since invalidations may have been missed.
+    """
+
+    def __init__(
+        self,
+        cache: LocalCache,
+        channel: str,
+        redis_client: redis.Redis,
+        retry_interval: float = 1.0,
+    ) -> None:
+        self.cache = cache
+        self.channel = channel
+        self.redis_client = redis_client
+        self.retry_interval = retry_interval
+        self.origin = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_listening(self) -> None:
+        """
+        Start the listener thread once per process.
+        """
+        if self._pid == os.getpid() or self.cache.maxsize <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.origin = uuid.uuid4().hex
+            # Anything cached before a fork may already be stale.
+            self.cache.clear()
+            threading.Thread(
+                target=self._listen, name="pokedex-cache-invalidator", daemon=True
+            ).start()
+
+    def publish(self, key: str, redis_client: redis.Redis = None) -> None:
+        """
+        Announce a change to ``key``; pass a pipeline to batch it with the write.
+        """
+        self.cache.delete(key)
+        redis_client = redis_client or self.redis_client
+        redis_client.publish(self.channel, f"{self.origin}:{key}")
+
+    def handle(self, message: bytes) -> None:
+        origin, _, key = message.decode("utf-8").partition(":")
+        if origin != self.origin:
+            self.cache.delete(key)
+
+    def _listen(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if self._pid != pid:
+                        return
+                    if message["type"] == "message":
+                        self.handle(message["data"])
+            except redis.RedisError as e:
+                logger.warning("Cache invalidation channel dropped: %s", e)
+                self.cache.clear()
+                time.sleep(self.retry_interval)
+            finally:
+                pubsub.close()
+
+
+# Read an entry, slide its expiry forward on a hit (a TTL of 0 means it never
+# expires), and count the outcome.
+LOOKUP_SCRIPT = """
+local value = redis.call("get", KEYS[1])
+if value then
+    if tonumber(ARGV[1]) > 0 then
+        redis.call("pexpire", KEYS[1], ARGV[1])
+    else
+        redis.call("persist", KEYS[1])
+    end
+    redis.call("hincrby", KEYS[2], "hits", 1)
+else
+    redis.call("hincrby", KEYS[2], "misses", 1)
+end
+return value
+"""
+
+
+class TranslationStore:
+    """
+    Translations keyed by their translation type and source text rather than
+    by species, so any text is translated once no matter how many species or
+    flavor texts share it.
+
+    Entries expire ``ttl`` seconds after they were last read, so texts
+    nobody asks for any more age out while popular ones stay; with a ``ttl``
+    of 0 they never expire. Hits and misses are counted in Redis across all
+    workers.
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: int) -> None:
+        self.redis_client = redis_client
+        self.ttl = ttl
+
+    def get(self, translation_type: str, text: str) -> Optional[str]:
+        return self._decode(
+            self.redis_client.eval(
+                LOOKUP_SCRIPT, *self._lookup_args(translation_type, text)
+            )
+        )
+
+    async def aget(
+        self, redis_client, translation_type: str, text: str
+    ) -> Optional[str]:
+        return self._decode(
+            await redis_client.eval(
+                LOOKUP_SCRIPT, *self._lookup_args(translation_type, text)
+            )
+        )
+
+    def set(self, translation_type: str, text: str, translation: str) -> None:
+        self._queue_set(
+            self.redis_client.pipeline(), translation_type, text, translation
+        ).execute()
+
+    async def aset(
+        self, redis_client, translation_type: str, text: str, translation: str
+    ) -> None:
+        await self._queue_set(
+            redis_client.pipeline(), translation_type, text, translation
+        ).execute()
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {
+            field.decode("utf-8"): int(value)
+            for field, value in self.redis_client.hgetall(
+                keys.translation_stats_key()
+            ).items()
+        }
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "stored": counts.get("stored", 0),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "ttl": self.ttl,
+        }
+
+    def reset_stats(self) -> None:
+        self.redis_client.delete(keys.translation_stats_key())
+
+    def _lookup_args(self, translation_type, text):
+        return (
+            2,
+            keys.translation_text_key(translation_type, text),
+            keys.translation_stats_key(),
+            self.ttl * 1000,
+        )
+
+    def _queue_set(self, pipe, translation_type, text, translation):
+        pipe.set(
+            keys.translation_text_key(translation_type, text),
+            translation,
+            ex=self.ttl or None,
+        )
+        pipe.hincrby(keys.translation_stats_key(), "stored", 1)
+        return pipe
+
+    @staticmethod
+    def _decode(value):
+        return value.decode("utf-8") if value is not None else None
@@ -0,0 +1,141 @@
+"""
+Storage formats for cached species data.
+
+A codec queues the Redis commands that write or read one entry on a
+pipeline (sync or async) and decodes what the read returned, so callers can
+batch reads and writes for several keys into a single round trip.
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class Codec(ABC):
+    name = None
+
+    def write(self, pipe, key: str, data: Dict[str, Any], ex: Optional[int]) -> None:
+        pipe.set(key, self.encode(data), ex=ex)
+
+    def read(self, pipe, key: str) -> None:
+        pipe.get(key)
+
+    @abstractmethod
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """
+        The stored form of an entry, as ``write`` passes it to Redis.
+        """
+
+    def decode(self, raw) -> Optional[Dict[str, Any]]:
+        """
+        Decode a stored entry; a missing or unreadable entry decodes to None.
+        """
+        if not raw:
+            return None
+        try:
+            return self.loads(raw)
+        except Exception as e:
+            logger.warning("Could not decode %s entry: %s", self.name, e)
+            return None
+
+    @abstractmethod
+    def loads(self, raw) -> Dict[str, Any]:
+        """
+        Decode what ``read`` returned, raising if it is unreadable.
+        """
+
+
+class JSONCodec(Codec):
+    name = "json"
+
+    def encode(self, data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, raw):
+        return json.loads(raw)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImproperlyConfigured("The msgpack codec requires msgpack.")
+
+    def encode(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, raw):
+        return msgpack.unpackb(raw, raw=False)
+
+
+class HashCodec(Codec):
+    """
+    Stores an entry as a Redis hash with short field names, so single fields
+    can be read or updated in place. Values are JSON encoded to keep types.
+    """
+
+    name = "hash"
+    FIELDS = {
+        "name": "n",
+        "description": "d",
+        "habitat": "h",
+        "isLegendary": "l",
+        "fetched_at": "f",
+        "descriptions": "e",
+        "flavor_texts": "t",
+        "validators": "v",
+    }
+    NAMES = {short: name for name, short in FIELDS.items()}
+
+    def write(self, pipe, key, data, ex):
+        pipe.delete(key)
+        pipe.hset(key, mapping=self.encode(data))
+        if ex:
+            pipe.expire(key, ex)
+
+    def read(self, pipe, key):
+        pipe.hgetall(key)
+
+    def encode(self, data):
+        return {
+            self.FIELDS.get(field, field): json.dumps(value, separators=(",", ":"))
+            for field, value in data.items()
+        }
+
+    def loads(self, raw):
+        return {
+            self.NAMES.get(field, field): json.loads(value)
+            for field, value in (
+                (field.decode("utf-8"), value) for field, value in raw.items()
+            )
+        }
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, MsgpackCodec, HashCodec)}
+
+_codecs = {}
+
+
+def get_codec(name: str = None) -> Codec:
+    """
+    Return the codec registered under ``name``, by default the configured one.
+    """
+    name = name or settings.POKEMON_CACHE_CODEC
+    if name not in _codecs:
+        if name not in CODECS:
+            raise ImproperlyConfigured(f"Unknown cache codec: {name}")
+        _codecs[name] = CODECS[name]()
+    return _codecs[name]
@@ -0,0 +1,195 @@
+"""
+Background jobs on Redis Streams.
+
+Jobs are appended to a stream and handed out to workers through a consumer
+group. A job stays pending until its worker acks it, and is then deleted, so
+the stream length is the number of jobs still to be done. Jobs a crashed
+worker never acked are reclaimed by the next reader once they have been
+idle long enough.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from pokemon import keys
+
+Job = Tuple[str, Dict[str, str]]
+
+# Mark ``KEYS[1]`` as queued for ``ARGV[1]`` seconds and append a job with
+# the fields in ``ARGV[3..]`` to the stream ``KEYS[2]``, capped near
+# ``ARGV[2]`` entries, unless the mark is already set. The mark is dropped
+# again if the job can't be added, so it never outlives a job that isn't
+# there.
+ENQUEUE_SCRIPT = """
+if not redis.call("set", KEYS[1], 1, "NX", "EX", ARGV[1]) then
+    return 0
+end
+local added = redis.pcall(
+    "xadd", KEYS[2], "MAXLEN", "~", ARGV[2], "*", unpack(ARGV, 3)
+)
+if type(added) == "table" and added.err then
+    redis.call("del", KEYS[1])
+    return added
+end
+return 1
+"""
+
+
+class JobQueue:
+    def __init__(
+        self,
+        name: str,
+        redis_client: redis.Redis,
+        group: str = "workers",
+        maxlen: int = 10000,
+        dedupe_ttl: int = 600,
+    ) -> None:
+        self.name = name
+        self.redis_client = redis_client
+        self.group = group
+        self.maxlen = maxlen
+        self.dedupe_ttl = dedupe_ttl
+
+    @property
+    def stream(self) -> str:
+        return keys.jobs_key(self.name)
+
+    def queued_key(self, key: str) -> str:
+        return keys.job_queued_key(self.name, key)
+
+    def _enqueue_args(self, key: str, fields: Dict[str, Any]) -> tuple:
+        job = {"key": key, **fields}
+        return (
+            ENQUEUE_SCRIPT,
+            2,
+            self.queued_key(key),
+            self.stream,
+            self.dedupe_ttl,
+            self.maxlen,
+            *(value for item in job.items() for value in item),
+        )
+
+    def enqueue(self, key: str, **fields: Any) -> bool:
+        """
+        Queue a job unless one for ``key`` is already waiting. Returns whether
+        a job was queued.
+        """
+        return bool(self.redis_client.eval(*self._enqueue_args(key, fields)))
+
+    def enqueue_many(self, job_keys: List[str]) -> List[bool]:
+        """
+        Queue a job for each key not already waiting, in one round trip.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in job_keys:
+            pipe.eval(*self._enqueue_args(key, {}))
+        return [bool(queued) for queued in pipe.execute()]
+
+    async def aenqueue(self, redis_client, key: str, **fields: Any) -> bool:
+        return bool(await redis_client.eval(*self._enqueue_args(key, fields)))
+
+    def ensure_group(self) -> None:
+        try:
+            self.redis_client.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read(
+        self, consumer: str, count: int, block_ms: Optional[int], min_idle_ms: int
+    ) -> List[Job]:
+        """
+        Take up to ``count`` jobs: first any left pending by a worker for
+        longer than ``min_idle_ms``, then new ones, blocking up to
+        ``block_ms`` for them. With ``block_ms=None`` it returns at once;
+        0 would block until a job arrives.
+        """
+        _, claimed, *_ = self.redis_client.xautoclaim(
+            self.stream, self.group, consumer, min_idle_ms, "0-0", count=count
+        )
+        if not claimed:
+            replies = self.redis_client.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+            )
+            claimed = replies[0][1] if replies else []
+        return [
+            (
+                job_id.decode("utf-8"),
+                {k.decode("utf-8"): v.decode("utf-8") for k, v in fields.items()},
+            )
+            for job_id, fields in claimed
+            # Entries deleted while pending come back without fields.
+            if fields
+        ]
+
+    def deliveries(self, job_id: str) -> int:
+        """
+        How many times a pending job has been handed out, this time included.
+        """
+        pending = self.redis_client.xpending_range(
+            self.stream, self.group, min=job_id, max=job_id, count=1
+        )
+        return pending[0]["times_delivered"] if pending else 0
+
+    def retry_later(self, key: str) -> None:
+        """
+        Leave the job for ``key`` pending, to be reclaimed and run again, and
+        keep its dedupe marker alive meanwhile.
+        """
+        self.redis_client.expire(self.queued_key(key), self.dedupe_ttl)
+
+    def ack(self, job_id: str, key: str) -> None:
+        pipe = self.redis_client.pipeline()
+        pipe.xack(self.stream, self.group, job_id)
+        pipe.xdel(self.stream, job_id)
+        pipe.delete(self.queued_key(key))
+        pipe.execute()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth (jobs not yet acked), how many of them no worker has
+        picked up yet, how many are being worked on, and the age in seconds
+        of the oldest one.
+        """
+        depth = self.redis_client.xlen(self.stream)
+        group = self.group_info()
+        oldest = self.oldest_job_time(group)
+        pending = group["pending"] if group else 0
+        # Redis before 7.0 doesn't report the lag itself.
+        lag = group.get("lag") if group else None
+        return {
+            "depth": depth,
+            "lag": depth - pending if lag is None else lag,
+            "pending": pending,
+            "consumers": group["consumers"] if group else 0,
+            "oldest_age": round(time.time() - oldest / 1000, 3) if oldest else 0,
+        }
+
+    def group_info(self) -> Optional[Dict[str, Any]]:
+        try:
+            groups = self.redis_client.xinfo_groups(self.stream)
+        except redis.ResponseError:
+            return None
+        for group in groups:
+            if group["name"].decode("utf-8") == self.group:
+                return group
+        return None
+
+    def oldest_job_time(self, group) -> Optional[int]:
+        """
+        Creation time in ms of the oldest job still to be done, read off its
+        stream ID.
+        """
+        candidates = []
+        if group and group["pending"]:
+            pending = self.redis_client.xpending(self.stream, self.group)
+            candidates.append(pending["min"])
+        start = f"({group['last-delivered-id'].decode('utf-8')}" if group else "-"
+        if first := self.redis_client.xrange(self.stream, min=start, count=1):
+            candidates.append(first[0][0])
+        timestamps = [int(job_id.split(b"-")[0]) for job_id in candidates]
+        return min(timestamps) if timestamps else None
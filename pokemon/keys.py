@@ -0,0 +1,94 @@
+"""
+Redis key layout.
+
+Every key is namespaced and carries the schema version, e.g.
+``pdx:v2:species:pikachu``, so entries can't collide with anything else in
+the database and a layout change can be migrated key by key.
+"""
+
+import hashlib
+
+from django.conf import settings
+
+SCHEMA_VERSION = 2
+
+
+def normalize_name(name: str) -> str:
+    """
+    Species names are case-insensitive, so ``Pikachu`` and ``pikachu`` share
+    one entry.
+    """
+    return name.strip().lower()
+
+
+def prefix(version: int = SCHEMA_VERSION) -> str:
+    return f"{settings.POKEMON_KEY_PREFIX}:v{version}"
+
+
+def species_key(name: str) -> str:
+    return f"{prefix()}:species:{normalize_name(name)}"
+
+
+def missing_key(name: str) -> str:
+    return f"{prefix()}:missing:{normalize_name(name)}"
+
+
+def translation_key(name: str) -> str:
+    return f"{prefix()}:translation:{normalize_name(name)}"
+
+
+def rendered_key(name: str, variant: str) -> str:
+    return f"{prefix()}:body:{variant}:{normalize_name(name)}"
+
+
+def etag_key(name: str, variant: str) -> str:
+    return f"{prefix()}:etag:{variant}:{normalize_name(name)}"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Flavor texts come with line breaks, form feeds and runs of spaces in
+    different places; collapse them so equal texts hash equally.
+    """
+    return " ".join(text.split())
+
+
+def translation_text_key(translation_type: str, text: str) -> str:
+    digest = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{prefix()}:text:{translation_type}:{digest}"
+
+
+def translation_stats_key() -> str:
+    return f"{prefix()}:text:stats"
+
+
+def refresh_stats_key() -> str:
+    return f"{prefix()}:refresh:stats"
+
+
+def throttle_key(name: str, kind: str) -> str:
+    return f"{prefix()}:throttle:{name}:{kind}"
+
+
+def flight_key(namespace: str, key: str, kind: str) -> str:
+    return f"{prefix()}:flight:{namespace}:{key}:{kind}"
+
+
+def jobs_key(queue: str) -> str:
+    return f"{prefix()}:jobs:{queue}"
+
+
+def job_queued_key(queue: str, key: str) -> str:
+    return f"{prefix()}:jobs:{queue}:queued:{key}"
+
+
+def metrics_key() -> str:
+    return f"{prefix()}:metrics"
+
+
+def species_pattern() -> str:
+    return f"{prefix()}:species:*"
+
+
+def name_from_key(key: str) -> str:
+    return key.rsplit(":", 1)[-1]
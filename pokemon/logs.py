@@ -0,0 +1,21 @@
+"""
+Logging helpers wired up by ``LOGGING`` in the settings.
+"""
+
+import logging
+import random
+
+
+class SampleFilter(logging.Filter):
+    """
+    Let through a ``rate`` fraction of a logger's records below WARNING, so
+    chatty debug and access logs can stay on at a fraction of their volume.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float = 1.0) -> None:
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
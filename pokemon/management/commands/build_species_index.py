@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pokemon.species import species_pages, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot every species name PokeAPI lists into POKEMON_SPECIES_INDEX. "
+        "Running workers pick up the new snapshot on their next index refresh "
+        "and reject names missing from it without any lookup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.POKEMON_SPECIES_INDEX,
+            help="where to write the snapshot",
+        )
+        parser.add_argument("--page-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        names = [
+            name
+            for page in species_pages(page_size=options["page_size"])
+            for name in page
+        ]
+        if not names:
+            self.stderr.write("PokeAPI listed no species; keeping the old snapshot")
+            return
+        write_snapshot(options["output"], names)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(names)} species to {options['output']}")
+        )
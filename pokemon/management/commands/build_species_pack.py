@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pokemon.pack import PackError, write_pack
+from pokemon.projection import keep_species_fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a species data pack from a directory of PokeAPI species JSON "
+        "documents (searched recursively), keeping only the fields the service "
+        "reads. Serve from it with POKEMON_DATA_SOURCE=pack."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="directory of species JSON documents")
+        parser.add_argument(
+            "--output",
+            default=settings.POKEMON_SPECIES_PACK,
+            help="where to write the pack",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"])
+        if not source.is_dir():
+            raise CommandError(f"{source} is not a directory")
+        self.skipped = 0
+        try:
+            count = write_pack(options["output"], self.documents(source))
+        except PackError:
+            raise CommandError(f"No species documents found in {source}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Packed {count} species into {options['output']} "
+                f"({os.path.getsize(options['output'])} bytes), "
+                f"skipped {self.skipped} files"
+            )
+        )
+
+    def documents(self, source):
+        for path in sorted(source.rglob("*.json")):
+            try:
+                document = json.loads(
+                    path.read_text(), object_pairs_hook=keep_species_fields
+                )
+            except (OSError, ValueError) as e:
+                self.stderr.write(f"Skipping {path}: {e}")
+                self.skipped += 1
+                continue
+            if not isinstance(document, dict) or "flavor_text_entries" not in document:
+                self.skipped += 1
+                continue
+            yield document
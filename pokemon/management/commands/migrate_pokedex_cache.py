@@ -0,0 +1,170 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pokemon import keys
+from pokemon.codecs import CODECS, get_codec
+from pokemon.models import RedisClient, ttl_with_jitter
+
+SPECIES_FIELDS = {"name", "description", "habitat", "isLegendary"}
+# Rendered bodies were kept under "<name>:body:<variant>" for these variants.
+LEGACY_VARIANTS = ("plain", "translated")
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite cached Pokemon into the current key layout and codec. Legacy "
+        "entries stored under bare species names are moved to namespaced, "
+        "versioned keys; with --from-codec, current entries are re-encoded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-codec",
+            choices=sorted(CODECS),
+            help="codec the current entries were written with; they are "
+            "re-encoded with POKEMON_CACHE_CODEC",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--keep-old", action="store_true", help="leave legacy keys in place"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="report what would be migrated without writing or deleting; "
+            "with -v 2, list each entry",
+        )
+
+    def handle(self, *args, **options):
+        self.redis_client = RedisClient
+        self.codec = get_codec()
+        self.batch_size = options["batch_size"]
+        self.keep_old = options["keep_old"]
+        self.dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        if self.dry_run:
+            self.stdout.write("Dry run: nothing is written or deleted.")
+
+        moved, skipped = self.migrate_legacy()
+        self.stdout.write(f"Legacy entries migrated: {moved}, skipped: {skipped}")
+
+        source = options["from_codec"]
+        if source and source != self.codec.name:
+            recoded = self.recode(get_codec(source))
+            self.stdout.write(
+                f"Entries re-encoded from {source} to {self.codec.name}: {recoded}"
+            )
+
+    def legacy_keys(self):
+        """
+        Candidate legacy species keys: bare string keys outside the current
+        namespace. Whether one really is a pokemon is only known once its
+        value has been read.
+        """
+        current = f"{settings.POKEMON_KEY_PREFIX}:"
+        scan = self.redis_client.scan_iter(count=self.batch_size, _type="string")
+        for key in scan:
+            key = key.decode("utf-8")
+            if not key.startswith(current) and ":" not in key:
+                yield key
+
+    @staticmethod
+    def legacy_satellites(key):
+        """
+        The keys the old layout kept next to a species stored under ``key``.
+        """
+        return [
+            f"{key}:translation",
+            *(f"{key}:body:{variant}" for variant in LEGACY_VARIANTS),
+        ]
+
+    def migrate_legacy(self):
+        """
+        Move every legacy species entry, and drop it along with its
+        translation and rendered bodies. Keys are only touched once their
+        base key holds a legacy pokemon payload, so other data sharing the
+        database is left alone.
+        """
+        moved = skipped = 0
+        for batch in batched(self.legacy_keys(), self.batch_size):
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in batch:
+                pipe.get(key)
+                pipe.get(f"{key}:translation")
+                pipe.pttl(key)
+            replies = pipe.execute()
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for index, key in enumerate(batch):
+                raw, translation, pttl = replies[index * 3 : index * 3 + 3]
+                data = self.parse_legacy(raw)
+                if data is None:
+                    skipped += 1
+                    continue
+                translation = data.pop("translation", None) or translation
+                ex = max(1, pttl // 1000) if pttl and pttl > 0 else None
+                self.codec.write(
+                    pipe,
+                    keys.species_key(data["name"]),
+                    data,
+                    ex or ttl_with_jitter(settings.POKEMON_SPECIES_TTL),
+                )
+                if translation:
+                    pipe.set(
+                        keys.translation_key(data["name"]),
+                        translation,
+                        ex=ttl_with_jitter(settings.POKEMON_TRANSLATION_TTL),
+                    )
+                if not self.keep_old:
+                    pipe.delete(key, *self.legacy_satellites(key))
+                if self.verbosity > 1:
+                    self.stdout.write(f"{key} -> {keys.species_key(data['name'])}")
+                moved += 1
+            if not self.dry_run:
+                pipe.execute()
+        return moved, skipped
+
+    @staticmethod
+    def parse_legacy(raw):
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict) or not SPECIES_FIELDS <= set(data):
+            return None
+        return data
+
+    def recode(self, source):
+        recoded = 0
+        species_keys = self.redis_client.scan_iter(
+            match=keys.species_pattern(), count=self.batch_size
+        )
+        for batch in batched(species_keys, self.batch_size):
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in batch:
+                source.read(pipe, key)
+                pipe.pttl(key)
+            # Entries already in another format fail to read and are skipped.
+            replies = pipe.execute(raise_on_error=False)
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for index, key in enumerate(batch):
+                raw, pttl = replies[index * 2 : index * 2 + 2]
+                data = source.decode(raw)
+                if data is None:
+                    continue
+                ex = max(1, pttl // 1000) if pttl and pttl > 0 else None
+                self.codec.write(pipe, key, data, ex)
+                recoded += 1
+            if not self.dry_run:
+                pipe.execute()
+        return recoded
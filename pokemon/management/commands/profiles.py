@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pokemon.profiling import PROFILE_HEADER, get_profile_ring, make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "List the stored request profiles, oldest first, or summarize one: "
+        "the costliest functions of the request as pstats prints them. "
+        "--token prints a header value that gets a request profiled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="the profile to summarize")
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            help="pstats sort key for the summary, e.g. tottime or calls",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=25, help="functions to show in the summary"
+        )
+        parser.add_argument(
+            "--token",
+            action="store_true",
+            help=f"print a signed {PROFILE_HEADER} header value",
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="delete every stored profile"
+        )
+
+    def handle(self, *args, **options):
+        ring = get_profile_ring()
+        if options["token"]:
+            self.stdout.write(make_token())
+            return
+        if options["clear"]:
+            ring.clear()
+            return
+        if options["name"]:
+            details = ring.details(options["name"])
+            if details is None:
+                raise CommandError(f"No profile named {options['name']}")
+            self.stdout.write(json.dumps(details, indent=2))
+            self.stdout.write(
+                ring.summary(options["name"], options["sort"], options["limit"])
+            )
+            return
+        for name in ring.names():
+            details = ring.details(name)
+            if details:
+                self.stdout.write(
+                    "{name}  {method} {path}  {status}  {duration_ms}ms  "
+                    "{trigger}".format(**details)
+                )
@@ -0,0 +1,30 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pokemon import keys
+from pokemon.models import Pokemon, RedisClient
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how species refreshes went as JSON: how many there were and how "
+        "many PokeAPI answered with 304 Not Modified, so only the fetch time "
+        "of the stored copy had to move on."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="zero the counters first"
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            RedisClient.delete(keys.refresh_stats_key())
+        status = {
+            **Pokemon.refresh_stats(),
+            "soft_ttl": settings.POKEMON_SOFT_TTL,
+            "hard_ttl": settings.POKEMON_HARD_TTL,
+        }
+        self.stdout.write(json.dumps(status, indent=2))
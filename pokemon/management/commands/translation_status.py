@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from pokemon.models import (
+    TranslationBreaker,
+    TranslationJobs,
+    TranslationQuota,
+    TranslationTexts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the shared funtranslations quota, circuit breaker and job queue "
+        "as JSON: tokens left in the bucket, whether the breaker is open and "
+        "for how long, the failures counted towards opening it, the depth "
+        "and lag of the translation queue, and the translation store's hit rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="refill the bucket and close the breaker first",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            TranslationQuota.reset()
+            TranslationBreaker.reset()
+        status = {
+            "quota": TranslationQuota.status(),
+            "breaker": TranslationBreaker.status(),
+            "queue": TranslationJobs.stats(),
+            "store": TranslationTexts.stats(),
+        }
+        self.stdout.write(json.dumps(status, indent=2))
@@ -0,0 +1,114 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from pokemon.models import (
+    Pokemon,
+    TranslationBreaker,
+    TranslationJobs,
+    TranslationQuota,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Work through queued translation jobs (POKEMON_TRANSLATION_MODE=queue). "
+        "Workers share the queue through a consumer group and wait for the "
+        "shared funtranslations quota and circuit breaker before each call, "
+        "so any number of them stays within the rate limit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consumer",
+            default=f"{socket.gethostname()}-{os.getpid()}",
+            help="name of this worker in the consumer group",
+        )
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument(
+            "--block", type=int, default=5000, help="ms to wait for new jobs"
+        )
+        parser.add_argument(
+            "--reclaim-after",
+            type=int,
+            default=60000,
+            help="ms after which another worker's unacked job is retried",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="times a failing job is tried before it is dropped",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="seconds between checks while the quota or breaker hold calls",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="exit once the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        TranslationJobs.ensure_group()
+        self.poll_interval = options["poll_interval"]
+        self.max_attempts = options["max_attempts"]
+        done = 0
+        while True:
+            jobs = TranslationJobs.read(
+                options["consumer"],
+                options["batch_size"],
+                None if options["once"] else options["block"],
+                options["reclaim_after"],
+            )
+            if not jobs and options["once"]:
+                break
+            for job_id, fields in jobs:
+                self.wait_for_capacity()
+                self.run(job_id, fields["key"])
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f"Translation jobs done: {done}"))
+
+    def wait_for_capacity(self):
+        """
+        Hold off while translation calls would only be short-circuited.
+        """
+        while not TranslationBreaker.allow() or not self.has_quota():
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def has_quota():
+        remaining = TranslationQuota.remaining()
+        return remaining is None or remaining >= 1
+
+    def run(self, job_id, name):
+        """
+        Translate one species and ack its job once that worked, or once the
+        species is gone. A job whose translation failed (an upstream error,
+        an open breaker, no quota left) stays pending, so it is reclaimed and
+        tried again after ``--reclaim-after``, up to ``--max-attempts`` times.
+        """
+        failure = None
+        try:
+            pokemon = Pokemon.translate_and_save(name)
+        except Exception as e:
+            failure = str(e) or type(e).__name__
+        else:
+            if pokemon and not pokemon.translation:
+                failure = "no translation"
+        if failure:
+            attempts = TranslationJobs.deliveries(job_id)
+            if attempts < self.max_attempts:
+                self.stderr.write(
+                    f"Translation of {name} failed ({failure}), attempt {attempts}"
+                )
+                TranslationJobs.retry_later(name)
+                return
+            self.stderr.write(
+                f"Giving up on translating {name} after {attempts} attempts: "
+                f"{failure}"
+            )
+        TranslationJobs.ack(job_id, name)
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from pokemon import keys
+from pokemon.models import Pokemon, RedisClient
+from pokemon.species import species_pages
+
+
+class RateLimiter:
+    """
+    Spaces calls at least ``1 / rate`` seconds apart across threads.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Command(BaseCommand):
+    help = (
+        "Preload the species catalogue into Redis. Walks the PokeAPI species "
+        "list, fetches every species that isn't cached and writes each page in "
+        "one pipeline. Progress is checkpointed so an interrupted run resumes "
+        "where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--rate", type=float, default=20, help="max upstream requests per second"
+        )
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument(
+            "--limit", type=int, default=None, help="stop after this many species"
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="warm_pokedex.checkpoint.json",
+            help="file recording progress between runs",
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="ignore an existing checkpoint"
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options["checkpoint"])
+        state = {"offset": 0, "failures": {}}
+        if checkpoint.exists() and not options["restart"]:
+            state = json.loads(checkpoint.read_text())
+            self.stdout.write(f"Resuming from species #{state['offset']}")
+
+        limiter = RateLimiter(options["rate"])
+        stats = {"seen": 0, "cached": 0, "fetched": 0, "failed": 0}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            for names in species_pages(
+                state["offset"], options["page_size"], options["limit"]
+            ):
+                missing = self.missing(names)
+                stats["seen"] += len(names)
+                stats["cached"] += len(names) - len(missing)
+
+                pokemons = []
+                results = executor.map(lambda name: self.fetch(name, limiter), missing)
+                for name, (pokemon, error) in zip(missing, results):
+                    if pokemon:
+                        pokemons.append(pokemon)
+                        state["failures"].pop(name, None)
+                    else:
+                        state["failures"][name] = error
+                Pokemon.save_many(pokemons)
+                stats["fetched"] += len(pokemons)
+                stats["failed"] += len(missing) - len(pokemons)
+
+                state["offset"] += len(names)
+                checkpoint.write_text(json.dumps(state))
+                self.report(stats, started)
+
+        if state["failures"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(state['failures'])} species failed: "
+                    + ", ".join(sorted(state["failures"]))
+                )
+            )
+        self.stdout.write(self.style.SUCCESS("Warm-up finished"))
+
+    def missing(self, names):
+        """
+        The names that have no cached species entry.
+        """
+        pipe = RedisClient.pipeline(transaction=False)
+        for name in names:
+            pipe.exists(keys.species_key(name))
+        return [name for name, exists in zip(names, pipe.execute()) if not exists]
+
+    @staticmethod
+    def fetch(name, limiter):
+        limiter.wait()
+        try:
+            pokemon = Pokemon.create_pokemon_from_remote(name)
+        except Exception as e:
+            return None, str(e)
+        return pokemon, None if pokemon else "Pokemon not found"
+
+    def report(self, stats, started):
+        elapsed = time.monotonic() - started
+        rate = stats["fetched"] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"seen={stats['seen']} cached={stats['cached']} "
+            f"fetched={stats['fetched']} failed={stats['failed']} "
+            f"elapsed={elapsed:.1f}s throughput={rate:.1f}/s"
+        )
@@ -0,0 +1,322 @@
+"""
+Service metrics in the Prometheus text format.
+
+Counters and latency histograms are recorded in memory, so recording costs
+no I/O, and a background thread in each process adds what it buffered to
+one Redis hash every ``flush_interval`` seconds. Every worker adds to the
+same hash, so a scrape of ``/metrics`` on any worker sees the totals of all
+of them. Gauges such as the translation circuit state are read when scraped
+from collectors registered with ``register_collector``.
+
+Hash fields are the sample names with their labels, e.g.
+``pokedex_span_seconds_bucket{span="Pokemon.get",le="0.005"}``; histogram
+buckets are stored cumulatively so the hash renders as it is.
+"""
+
+import atexit
+import bisect
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from django.conf import settings
+
+from pokemon import keys
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Upper bounds of the latency buckets, in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FAMILIES = {
+    "pokedex_span_seconds": (
+        HISTOGRAM,
+        "Time spent in each stage of serving a request.",
+    ),
+    "pokedex_responses_total": (COUNTER, "Responses by view and status code."),
+    "pokedex_cache_lookups_total": (COUNTER, "Cache lookups by layer and result."),
+    "pokedex_upstream_responses_total": (
+        COUNTER,
+        "Upstream responses by host and status code, or error if none came.",
+    ),
+    "pokedex_translation_skipped_total": (
+        COUNTER,
+        "Translations not attempted, by reason.",
+    ),
+}
+
+# Span durations of the request being served, summed by span name, for the
+# access log. None outside a request.
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families.
+Family = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]
+
+
+def escape(value: Any) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    return ",".join(f'{name}="{escape(labels[name])}"' for name in sorted(labels))
+
+
+def sample_name(name: str, labels: str) -> str:
+    return f"{name}{{{labels}}}" if labels else name
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """
+    Process-local counters and histograms, flushed into a Redis hash shared
+    by every worker.
+
+    Disabled metrics record nothing, and outside an access-logged request
+    ``span`` and ``timed`` only add a check of ``enabled``.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        flush_interval: float = 5.0,
+        enabled: bool = True,
+    ) -> None:
+        self.redis_client = redis_client
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        field = sample_name(name, format_labels(labels))
+        self.ensure_flushing()
+        with self._lock:
+            self._counters[field] = self._counters.get(field, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Add ``value`` to a histogram, in its bucket and to its sum.
+        """
+        if not self.enabled:
+            return
+        series = (name, format_labels(labels))
+        index = bisect.bisect_left(BUCKETS, value)
+        self.ensure_flushing()
+        with self._lock:
+            counts = self._histograms.get(series)
+            if counts is None:
+                # One count per bucket, then +Inf, then the sum.
+                counts = self._histograms[series] = [0] * (len(BUCKETS) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Time the block into ``pokedex_span_seconds{span=name}`` and into the
+        current request's timings.
+        """
+        timings = request_timings.get()
+        if not self.enabled and timings is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + elapsed
+            self.observe("pokedex_span_seconds", elapsed, span=name)
+
+    def timed(self, name: str):
+        """
+        Decorate a function, or a coroutine function, to run in a ``span``.
+        """
+
+        def decorator(function):
+            if inspect.iscoroutinefunction(function):
+
+                @functools.wraps(function)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await function(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """
+        Add a function read at every scrape for values that live elsewhere,
+        e.g. in Redis already.
+        """
+        self._collectors.append(collector)
+
+    def ensure_flushing(self) -> None:
+        """
+        Start the flusher thread once per process.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            # Whatever a parent buffered before forking is its to flush.
+            self._counters, self._histograms = {}, {}
+            threading.Thread(
+                target=self._run, name="pokedex-metrics", daemon=True
+            ).start()
+
+    def flush(self) -> None:
+        """
+        Add everything buffered since the last flush to the shared hash.
+        """
+        with self._flush_lock:
+            with self._lock:
+                counters, histograms = self._counters, self._histograms
+                self._counters, self._histograms = {}, {}
+            if not counters and not histograms:
+                return
+            key = keys.metrics_key()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for field, value in counters.items():
+                pipe.hincrbyfloat(key, field, value)
+            for (name, labels), counts in histograms.items():
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), counts):
+                    cumulative += count
+                    bucket_labels = f'{labels},le="{format_value(bound)}"'.lstrip(",")
+                    pipe.hincrbyfloat(
+                        key, sample_name(f"{name}_bucket", bucket_labels), cumulative
+                    )
+                pipe.hincrbyfloat(key, sample_name(f"{name}_sum", labels), counts[-1])
+                pipe.hincrbyfloat(key, sample_name(f"{name}_count", labels), cumulative)
+            try:
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning("Could not flush metrics: %s", e)
+                self._restore(counters, histograms)
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format, this
+        process's buffer included.
+        """
+        self.flush()
+        stored = self.redis_client.hgetall(keys.metrics_key())
+        families: Dict[str, List[Tuple[str, float]]] = {}
+        for field, value in stored.items():
+            field = field.decode("utf-8")
+            families.setdefault(self._family(field), []).append((field, float(value)))
+
+        lines = []
+        for family in sorted(families):
+            kind, help_text = FAMILIES.get(family, ("untyped", None))
+            lines.extend(self._header(family, kind, help_text))
+            for field, value in sorted(families[family], key=sample_order):
+                lines.append(f"{field} {format_value(value)}")
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.extend(self._header(name, kind, help_text))
+                for labels, value in samples:
+                    if value is not None:
+                        field = sample_name(name, format_labels(labels))
+                        lines.append(f"{field} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters, self._histograms = {}, {}
+        self.redis_client.delete(keys.metrics_key())
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Metrics flush failed")
+
+    def _restore(self, counters, histograms) -> None:
+        with self._lock:
+            for field, value in counters.items():
+                self._counters[field] = self._counters.get(field, 0) + value
+            for series, counts in histograms.items():
+                current = self._histograms.setdefault(series, [0] * len(counts))
+                for index, count in enumerate(counts):
+                    current[index] += count
+
+    @staticmethod
+    def _family(field: str) -> str:
+        name = field.partition("{")[0]
+        for suffix in ("_bucket", "_sum", "_count"):
+            base = name.removesuffix(suffix)
+            if base != name and FAMILIES.get(base, (None,))[0] == HISTOGRAM:
+                return base
+        return name
+
+    @staticmethod
+    def _header(name: str, kind: str, help_text: Optional[str]) -> List[str]:
+        lines = [f"# HELP {name} {help_text}"] if help_text else []
+        lines.append(f"# TYPE {name} {kind}")
+        return lines
+
+
+def sample_order(sample: Tuple[str, float]):
+    """
+    Order samples by series, with a histogram's buckets by bound and before
+    its sum and count.
+    """
+    field = sample[0]
+    name, _, labels = field.partition("{")
+    series, bound = [], 0.0
+    for label in labels.rstrip("}").split('",'):
+        if label.startswith('le="'):
+            value = label[4:].rstrip('"')
+            bound = float("inf") if value == "+Inf" else float(value)
+        elif label:
+            series.append(label.rstrip('"'))
+    return series, not name.endswith("_bucket"), bound, name
+
+
+metrics = Metrics(
+    redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0),
+    flush_interval=settings.POKEMON_METRICS_FLUSH_INTERVAL,
+    enabled=settings.POKEMON_METRICS,
+)
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from pokemon.metrics import metrics, request_timings
+from pokemon.profiling import Profile, get_profile_ring, profile_trigger
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("pokemon.access")
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.url_name if match and match.url_name else "unmatched"
+
+
+class RequestTimingMiddleware(ABC):
+    """
+    Run ``start`` before and ``finish`` after the rest of the stack, under
+    WSGI or ASGI alike.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.start(request)
+        response = self.get_response(request)
+        self.finish(request, response, state)
+        return response
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        response = await self.get_response(request)
+        self.finish(request, response, state)
+        return response
+
+    def start(self, request):
+        return time.perf_counter()
+
+    @abstractmethod
+    def finish(self, request, response, state):
+        """
+        Record the finished request, given what ``start`` returned.
+        """
+
+
+class MetricsMiddleware(RequestTimingMiddleware):
+    """
+    Time every request through the views and count responses by status code,
+    both labelled with the name of the URL pattern that matched.
+    """
+
+    def finish(self, request, response, started):
+        view = view_name(request)
+        metrics.observe(
+            "pokedex_span_seconds", time.perf_counter() - started, span=f"view.{view}"
+        )
+        metrics.inc("pokedex_responses_total", view=view, status=response.status_code)
+
+
+class AccessLogMiddleware(RequestTimingMiddleware):
+    """
+    Log one JSON line per request to ``pokemon.access``, with the total time
+    and the time spent in each span, in milliseconds. Server errors are
+    logged as warnings so sampling never drops them. Costs one level check
+    when the access log is off.
+    """
+
+    def start(self, request):
+        if not access_logger.isEnabledFor(logging.INFO):
+            return None
+        return time.perf_counter(), request_timings.set({})
+
+    def finish(self, request, response, state):
+        if state is None:
+            return
+        started, token = state
+        duration = time.perf_counter() - started
+        timings = request_timings.get()
+        request_timings.reset(token)
+        entry = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": view_name(request),
+            "status": response.status_code,
+            "bytes": None if response.streaming else len(response.content),
+            "duration_ms": round(duration * 1000, 3),
+            "spans_ms": {
+                name: round(elapsed * 1000, 3) for name, elapsed in timings.items()
+            },
+        }
+        level = logging.WARNING if response.status_code >= 500 else logging.INFO
+        access_logger.log(level, json.dumps(entry, separators=(",", ":")))
+
+
+class ProfilingMiddleware(RequestTimingMiddleware):
+    """
+    Profile requests to the views in ``POKEMON_PROFILE_VIEWS`` that ask for
+    it (see ``pokemon.profiling``), and name the stored profile in the
+    ``X-Pokedex-Profile-Id`` response header.
+    """
+
+    def start(self, request):
+        trigger = profile_trigger(request)
+        if trigger is None:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.url_name not in settings.POKEMON_PROFILE_VIEWS:
+            return None
+        profile = Profile()
+        if not profile.start():
+            return None
+        return profile, trigger, match.url_name
+
+    def finish(self, request, response, state):
+        if state is None:
+            return
+        profile, trigger, view = state
+        duration = profile.stop()
+        try:
+            name = get_profile_ring().write(
+                profile.profiler,
+                {
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "view": view,
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 3),
+                    "trigger": trigger,
+                    "pid": os.getpid(),
+                },
+            )
+        except OSError as e:
+            logger.warning("Could not store profile: %s", e)
+            return
+        response["X-Pokedex-Profile-Id"] = name
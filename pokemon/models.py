@@ -1,23 +1,136 @@
-import json
+import asyncio
+import copy
+import hashlib
 import logging
 import random
+import time
+import weakref
 from typing import Any, Dict, List
 from urllib import parse
 
 from django.conf import settings
+import httpx
 import redis
+import redis.asyncio
 
 import requests
 
-from pokemon.services import make_request
+from pokemon import keys
+from pokemon.cache import CacheInvalidator, LocalCache, TranslationStore
+from pokemon.codecs import get_codec
+from pokemon.jobs import JobQueue
+from pokemon.metrics import COUNTER, GAUGE, metrics
+from pokemon.pack import get_species_pack
+from pokemon.projection import flavor_text_index, select_description
+from pokemon.serializers import (
+    PokemonSerializer,
+    PokemonTranslatedSerializer,
+    is_valid,
+    render,
+)
+from pokemon.services import (
+    UpstreamTimeout,
+    UpstreamUnavailable,
+    get_executor,
+    make_async_conditional_request,
+    make_async_request,
+    make_conditional_request,
+    make_request,
+    submit_once,
+)
+from pokemon.singleflight import SingleFlight
+from pokemon.species import SpeciesIndex
+from pokemon.throttling import CircuitBreaker, TokenBucket, retry_after
 
 
+logger = logging.getLogger(__name__)
+
 RedisClient = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
-logging.basicConfig(level=logging.DEBUG)
+
+PokemonCache = LocalCache(
+    maxsize=settings.POKEMON_L1_CACHE_SIZE, ttl=settings.POKEMON_L1_CACHE_TTL
+)
+PokemonCacheInvalidator = CacheInvalidator(
+    PokemonCache, settings.POKEMON_CACHE_INVALIDATION_CHANNEL, RedisClient
+)
+
+PokemonFetches = SingleFlight(
+    "species",
+    RedisClient,
+    lease_ttl=settings.POKEMON_SINGLE_FLIGHT_LEASE,
+    wait_timeout=settings.POKEMON_SINGLE_FLIGHT_WAIT,
+)
+TranslationFetches = SingleFlight(
+    "translation",
+    RedisClient,
+    lease_ttl=settings.POKEMON_SINGLE_FLIGHT_LEASE,
+    wait_timeout=settings.POKEMON_SINGLE_FLIGHT_WAIT,
+)
+
+SpeciesNames = SpeciesIndex(
+    settings.POKEMON_SPECIES_INDEX, settings.POKEMON_SPECIES_INDEX_REFRESH
+)
+
+TranslationQuota = TokenBucket(
+    "translation",
+    RedisClient,
+    rate=settings.POKEMON_TRANSLATION_RATE_LIMIT
+    / settings.POKEMON_TRANSLATION_RATE_PERIOD,
+    capacity=settings.POKEMON_TRANSLATION_RATE_LIMIT,
+)
+TranslationBreaker = CircuitBreaker(
+    "translation",
+    RedisClient,
+    failure_threshold=settings.POKEMON_TRANSLATION_BREAKER_THRESHOLD,
+    cooldown=settings.POKEMON_TRANSLATION_BREAKER_COOLDOWN,
+)
+
+TranslationTexts = TranslationStore(
+    RedisClient, ttl=settings.POKEMON_TRANSLATION_STORE_TTL
+)
+TranslationJobs = JobQueue("translation", RedisClient, group="translators")
+
+_async_redis_clients = weakref.WeakKeyDictionary()
+
+# Returned by ``Pokemon.get_remote_pokemon`` when PokeAPI confirms that a
+# stored copy is still current.
+NOT_MODIFIED = object()
+
+
+def ttl_with_jitter(ttl):
+    """
+    Spread expiries so entries written together don't all expire together.
+    """
+    if not ttl:
+        return None
+    jitter = ttl * settings.POKEMON_TTL_JITTER
+    return int(ttl + random.uniform(-jitter, jitter))
+
+
+def count_lookup(layer, result):
+    metrics.inc("pokedex_cache_lookups_total", layer=layer, result=result)
+
+
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Return the async Redis client bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = _async_redis_clients[loop] = redis.asyncio.Redis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0
+        )
+    return client
 
 
 class Pokemon:
-    POKEMON_LANGUAGE_KEY = "en"
+    POKEMON_LANGUAGE_KEY = settings.POKEMON_DEFAULT_LANGUAGE
+    PLAIN = "plain"
+    TRANSLATED = "translated"
+    FRESH = "fresh"
+    STALE = "stale"
+    EXPIRED = "expired"
 
     def __init__(
         self,
@@ -27,6 +140,10 @@ class Pokemon:
         isLegendary: bool,
         translation: str = None,
         redis_client: redis.Redis = RedisClient,
+        fetched_at: float = None,
+        flavor_texts: Dict[str, List[str]] = None,
+        descriptions: List[str] = None,
+        validators: Dict[str, str] = None,
     ) -> None:
         self.name = name
         self.description = description
@@ -34,37 +151,222 @@ class Pokemon:
         self.isLegendary = isLegendary
         self.translation = translation
         self.redis_client = redis_client
+        self.fetched_at = fetched_at or time.time()
+        # Entries stored before flavor texts were indexed by language only
+        # carry the default language's descriptions.
+        if flavor_texts is None and descriptions:
+            flavor_texts = {self.POKEMON_LANGUAGE_KEY: descriptions}
+        self.flavor_texts = flavor_texts or {}
+        self.validators = validators or {}
+        self.species_changed = True
+        self.species_touched = False
+        self.translation_changed = bool(translation)
 
     @staticmethod
-    def get_remote_pokemon(name):
+    @metrics.timed("Pokemon.get_remote_pokemon")
+    def get_remote_pokemon(name, validators=None):
         """
-        Get the pokemon from the remote API.
+        Get the pokemon from the remote API, or from the local species pack
+        when that is the configured data source.
+
+        Given the upstream ``validators`` of a stored copy, the request is
+        conditional and ``NOT_MODIFIED`` is returned if the copy is current.
+        Raises ``UpstreamUnavailable`` when PokeAPI can't be reached or fails,
+        so that isn't mistaken for an unknown name.
         """
-        logging.info(f"Getting remote pokemon: {name}")
+        if settings.POKEMON_DATA_SOURCE == "pack":
+            return get_species_pack().get(name)
+        logger.debug("Getting remote pokemon: %s", name)
         try:
-            pokemon_details = make_request(settings.POKEMON_API_URL + name)
-        except requests.exceptions.HTTPError:
-            pokemon_details = None
+            pokemon_details, validators = make_conditional_request(
+                settings.POKEMON_API_URL + name, validators
+            )
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status == 404:
+                RedisClient.set(
+                    keys.missing_key(name), 1, ex=settings.POKEMON_NEGATIVE_TTL
+                )
+            if status is None or status >= 500:
+                raise UpstreamUnavailable(f"PokeAPI failed: {e}") from e
+            return None
+        except requests.exceptions.Timeout as e:
+            raise UpstreamTimeout(f"PokeAPI timed out: {e}") from e
+        except requests.exceptions.RequestException as e:
+            raise UpstreamUnavailable(f"PokeAPI unavailable: {e}") from e
 
-        return pokemon_details
+        if pokemon_details is None:
+            return NOT_MODIFIED
+        return dict(pokemon_details, validators=validators)
 
     @staticmethod
-    def get_translation(description, translation_type):
+    @metrics.timed("Pokemon.get_remote_pokemon")
+    async def aget_remote_pokemon(name, validators=None):
         """
-        Get the shakespeare translation of the pokemon description.
+        Get the pokemon from the remote API without blocking the event loop.
         """
-        logging.info("Getting remote translation for pokemon")
-        url = settings.SHAKESPEARE_TRANSLATION_API
+        if settings.POKEMON_DATA_SOURCE == "pack":
+            return get_species_pack().get(name)
+        logger.debug("Getting remote pokemon: %s", name)
+        try:
+            pokemon_details, validators = await make_async_conditional_request(
+                settings.POKEMON_API_URL + name, validators
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                await get_async_redis_client().set(
+                    keys.missing_key(name), 1, ex=settings.POKEMON_NEGATIVE_TTL
+                )
+            if e.response.status_code >= 500:
+                raise UpstreamUnavailable(f"PokeAPI failed: {e}") from e
+            return None
+        except httpx.TimeoutException as e:
+            raise UpstreamTimeout(f"PokeAPI timed out: {e}") from e
+        except httpx.TransportError as e:
+            raise UpstreamUnavailable(f"PokeAPI unavailable: {e}") from e
+
+        if pokemon_details is None:
+            return NOT_MODIFIED
+        return dict(pokemon_details, validators=validators)
+
+    @staticmethod
+    def translation_url(translation_type):
         if translation_type == "yoda":
-            url = settings.YODA_TRANSLATION_API
+            return settings.YODA_TRANSLATION_API
+        return settings.SHAKESPEARE_TRANSLATION_API
+
+    @staticmethod
+    def translation_key(description, translation_type):
+        text = f"{translation_type}:{keys.normalize_text(description)}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    @metrics.timed("Pokemon.get_translation")
+    def get_translation(cls, description, translation_type):
+        """
+        Get the translation of the pokemon description from the translation
+        store, or else from upstream, sharing one upstream call between
+        everyone asking for the same text at the same time.
+        """
+        if translation := TranslationTexts.get(translation_type, description):
+            return translation
+
+        def fetch():
+            translation = cls.request_translation(description, translation_type)
+            if translation:
+                TranslationTexts.set(translation_type, description, translation)
+            return translation
+
+        return TranslationFetches.do(
+            cls.translation_key(description, translation_type), fetch
+        )
+
+    @classmethod
+    def request_translation(cls, description, translation_type):
+        """
+        Get the shakespeare translation of the pokemon description.
+        """
+        logger.debug("Getting remote translation for pokemon")
+        url = cls.translation_url(translation_type)
+        if not TranslationBreaker.allow():
+            logger.debug("Translation circuit is open, skipping translation")
+            metrics.inc("pokedex_translation_skipped_total", reason="circuit_open")
+            return None
+        if not TranslationQuota.acquire():
+            logger.debug("Translation quota exhausted, skipping translation")
+            metrics.inc("pokedex_translation_skipped_total", reason="quota")
+            return None
 
         try:
             translation_json = make_request(url, params={"text": description})
-            logging.info("Translation json: %s", translation_json)
+            logger.debug("Translation json: %s", translation_json)
+            result = translation_json["contents"]["translated"]
+        except requests.exceptions.HTTPError as e:
+            logger.warning("Translation request failed: %s", e)
+            status = e.response.status_code
+            if status == 429 or status >= 500:
+                TranslationBreaker.record_failure(
+                    retry_after(e.response.headers), trip=status == 429
+                )
+            result = None
+        except requests.exceptions.RequestException as e:
+            logger.warning("Translation request failed: %s", e)
+            TranslationBreaker.record_failure()
+            result = None
+        except Exception as e:
+            logger.warning("Translation request failed: %s", e)
+            result = None
+        else:
+            TranslationBreaker.record_success()
+
+        return result
+
+    @classmethod
+    @metrics.timed("Pokemon.get_translation")
+    async def aget_translation(cls, description, translation_type, redis_client=None):
+        """
+        Get the translation of the pokemon description without blocking the
+        event loop, sharing one upstream call between concurrent callers.
+        """
+        redis_client = redis_client or get_async_redis_client()
+        if translation := await TranslationTexts.aget(
+            redis_client, translation_type, description
+        ):
+            return translation
+
+        async def fetch():
+            translation = await cls.arequest_translation(description, translation_type)
+            if translation:
+                await TranslationTexts.aset(
+                    redis_client, translation_type, description, translation
+                )
+            return translation
+
+        return await TranslationFetches.ado(
+            cls.translation_key(description, translation_type), fetch, redis_client
+        )
+
+    @classmethod
+    async def arequest_translation(cls, description, translation_type):
+        """
+        Get the translation of the pokemon description without blocking the
+        event loop.
+        """
+        logger.debug("Getting remote translation for pokemon")
+        url = cls.translation_url(translation_type)
+        redis_client = get_async_redis_client()
+        if not await TranslationBreaker.aallow(redis_client):
+            logger.debug("Translation circuit is open, skipping translation")
+            metrics.inc("pokedex_translation_skipped_total", reason="circuit_open")
+            return None
+        if not await TranslationQuota.aacquire(redis_client):
+            logger.debug("Translation quota exhausted, skipping translation")
+            metrics.inc("pokedex_translation_skipped_total", reason="quota")
+            return None
+
+        try:
+            translation_json = await make_async_request(
+                url, params={"text": description}
+            )
+            logger.debug("Translation json: %s", translation_json)
             result = translation_json["contents"]["translated"]
+        except httpx.HTTPStatusError as e:
+            logger.warning("Translation request failed: %s", e)
+            status = e.response.status_code
+            if status == 429 or status >= 500:
+                await TranslationBreaker.arecord_failure(
+                    redis_client, retry_after(e.response.headers), trip=status == 429
+                )
+            result = None
+        except httpx.HTTPError as e:
+            logger.warning("Translation request failed: %s", e)
+            await TranslationBreaker.arecord_failure(redis_client)
+            result = None
         except Exception as e:
-            logging.info(f"An error occurred: {e}")
+            logger.warning("Translation request failed: %s", e)
             result = None
+        else:
+            await TranslationBreaker.arecord_success(redis_client)
 
         return result
 
@@ -73,21 +375,39 @@ class Pokemon:
         """
         Retrieve the description from the list of descriptions.
         """
-        logging.info("Parsing data for description")
-        english_descriptions = filter(
-            lambda desc: desc["language"]["name"] == cls.POKEMON_LANGUAGE_KEY,
-            descriptions,
+        logger.debug("Parsing data for description")
+        return select_description(
+            flavor_text_index(descriptions).get(cls.POKEMON_LANGUAGE_KEY),
+            settings.POKEMON_DESCRIPTION_POLICY,
         )
 
-        chosen_description = random.choice([*english_descriptions])
-        return chosen_description["flavor_text"]
+    @property
+    def descriptions(self) -> List[str]:
+        return self.flavor_texts.get(self.POKEMON_LANGUAGE_KEY, [])
+
+    def description_in(self, language=None):
+        """
+        The description in ``language``, or None if the species has no
+        flavor text in it.
+        """
+        if not language or language == self.POKEMON_LANGUAGE_KEY:
+            return self.description
+        return select_description(
+            self.flavor_texts.get(language), settings.POKEMON_DESCRIPTION_POLICY
+        )
+
+    @classmethod
+    def rendered_variant(cls, variant, language=None):
+        if not language or language == cls.POKEMON_LANGUAGE_KEY:
+            return variant
+        return f"{variant}:{language}"
 
     @classmethod
     def create_pokemon_from_remote(cls, name):
         """
         Create the pokemon from the remote API.
         """
-        logging.info("Creating pokemon from remote data")
+        logger.debug("Creating pokemon from remote data")
         pokemon_details = cls.get_remote_pokemon(name)
         if not pokemon_details:
             return None
@@ -95,16 +415,30 @@ class Pokemon:
         pokemon = cls.create_pokemon(pokemon_details)
         return pokemon
 
+    @classmethod
+    async def acreate_pokemon_from_remote(cls, name):
+        """
+        Create the pokemon from the remote API without blocking the event loop.
+        """
+        logger.debug("Creating pokemon from remote data")
+        pokemon_details = await cls.aget_remote_pokemon(name)
+        if not pokemon_details:
+            return None
+
+        return cls.create_pokemon(pokemon_details)
+
     @classmethod
     def create_pokemon(cls, pokemon_data: Dict[Any, Any]) -> "Pokemon":
         """
         Convert the remote API data to a pokemon.
         """
-        logging.info("Creating pokemon from dictionary")
+        logger.debug("Creating pokemon from dictionary")
         pokemon = dict()
         pokemon["name"] = pokemon_data["name"]
-        pokemon["description"] = cls.retrieve_description(
-            pokemon_data["flavor_text_entries"]
+        pokemon["flavor_texts"] = flavor_text_index(pokemon_data["flavor_text_entries"])
+        pokemon["description"] = select_description(
+            pokemon["flavor_texts"].get(cls.POKEMON_LANGUAGE_KEY),
+            settings.POKEMON_DESCRIPTION_POLICY,
         )
         pokemon["habitat"] = ""
         if pokemon_data["habitat"]:
@@ -112,26 +446,490 @@ class Pokemon:
         pokemon["isLegendary"] = pokemon_data["is_legendary"]
         if translation := pokemon_data.get("translation"):
             pokemon["translation"] = translation
+        if validators := pokemon_data.get("validators"):
+            pokemon["validators"] = validators
 
         return Pokemon(**pokemon)
 
     @classmethod
+    def fetch_pokemon(cls, name):
+        """
+        Create the pokemon from the remote API, sharing one upstream call
+        between everyone missing the same name at the same time.
+        """
+
+        def fetch():
+            pokemon = cls.create_pokemon_from_remote(name)
+            return pokemon and pokemon.species_data()
+
+        pokemon_dict = PokemonFetches.do(name, fetch)
+        return cls(**pokemon_dict) if pokemon_dict else None
+
+    @classmethod
+    async def afetch_pokemon(cls, name, redis_client):
+        """
+        Async counterpart of ``fetch_pokemon``.
+        """
+
+        async def fetch():
+            pokemon = await cls.acreate_pokemon_from_remote(name)
+            return pokemon and pokemon.species_data()
+
+        pokemon_dict = await PokemonFetches.ado(name, fetch, redis_client)
+        return cls(**pokemon_dict) if pokemon_dict else None
+
+    @classmethod
+    @metrics.timed("Pokemon.get")
     def get(cls, name, redis_client=RedisClient):
         """
         Retrieve pokemon
         """
-        logging.info("Retrieving pokemon from DB")
-        redis_pokemon = redis_client.get(name)
-        if not redis_pokemon:
-            return cls.create_pokemon_from_remote(name)
-        return Pokemon(**json.loads(redis_pokemon))
+        name = keys.normalize_name(name)
+        if not SpeciesNames.allows(name):
+            return None
+        PokemonCacheInvalidator.ensure_listening()
+        if cached := PokemonCache.get(name):
+            count_lookup("local", "hit")
+            return cls.revalidate(copy.copy(cached))
+        if PokemonCache.maxsize:
+            count_lookup("local", "miss")
+
+        logger.debug("Retrieving pokemon from DB")
+        pipe = redis_client.pipeline(transaction=False)
+        cls.queue_read(pipe, name)
+        raw, translation, missing = pipe.execute()
+        if missing:
+            count_lookup("redis", "negative")
+            return None
+        pokemon = cls.from_redis(raw, translation)
+        if not pokemon:
+            count_lookup("redis", "miss")
+            return cls.fetch_pokemon(name)
+        count_lookup("redis", "hit")
+        PokemonCache.set(name, copy.copy(pokemon))
+        return cls.revalidate(pokemon)
+
+    @classmethod
+    @metrics.timed("Pokemon.get")
+    async def aget(cls, name, redis_client=None):
+        """
+        Retrieve pokemon through the async Redis client.
+        """
+        name = keys.normalize_name(name)
+        if not SpeciesNames.allows(name):
+            return None
+        PokemonCacheInvalidator.ensure_listening()
+        redis_client = redis_client or get_async_redis_client()
+        if cached := PokemonCache.get(name):
+            count_lookup("local", "hit")
+            return await cls.arevalidate(copy.copy(cached), redis_client)
+        if PokemonCache.maxsize:
+            count_lookup("local", "miss")
+
+        logger.debug("Retrieving pokemon from DB")
+        pipe = redis_client.pipeline(transaction=False)
+        cls.queue_read(pipe, name)
+        raw, translation, missing = await pipe.execute()
+        if missing:
+            count_lookup("redis", "negative")
+            return None
+        pokemon = cls.from_redis(raw, translation)
+        if not pokemon:
+            count_lookup("redis", "miss")
+            return await cls.afetch_pokemon(name, redis_client)
+        count_lookup("redis", "hit")
+        PokemonCache.set(name, copy.copy(pokemon))
+        return await cls.arevalidate(pokemon, redis_client)
+
+    @property
+    def freshness(self):
+        """
+        How old the species data is against the soft and hard TTLs.
+        """
+        age = time.time() - self.fetched_at
+        if settings.POKEMON_HARD_TTL and age >= settings.POKEMON_HARD_TTL:
+            return self.EXPIRED
+        if settings.POKEMON_SOFT_TTL and age >= settings.POKEMON_SOFT_TTL:
+            return self.STALE
+        return self.FRESH
+
+    @classmethod
+    def revalidate(cls, pokemon):
+        """
+        Serve stale data while it is refreshed in the background; refetch
+        expired data before serving it, falling back to the stale copy if the
+        upstream is unavailable.
+        """
+        freshness = pokemon.freshness
+        if freshness == cls.STALE:
+            cls.schedule_refresh(pokemon)
+        elif freshness == cls.EXPIRED:
+            try:
+                return cls.refresh(pokemon) or pokemon
+            except Exception as e:
+                logger.warning("Could not refresh pokemon %s: %s", pokemon.name, e)
+        return pokemon
+
+    @classmethod
+    async def arevalidate(cls, pokemon, redis_client):
+        """
+        Async counterpart of ``revalidate``.
+        """
+        freshness = pokemon.freshness
+        if freshness == cls.STALE:
+            cls.schedule_refresh(pokemon)
+        elif freshness == cls.EXPIRED:
+            try:
+                return await cls.arefresh(pokemon, redis_client) or pokemon
+            except Exception as e:
+                logger.warning("Could not refresh pokemon %s: %s", pokemon.name, e)
+        return pokemon
+
+    @classmethod
+    def schedule_refresh(cls, pokemon):
+        """
+        Refresh the pokemon on the background pool, at most once at a time
+        per name in this process.
+        """
+        name = keys.normalize_name(pokemon.name)
+        submit_once(
+            "refresh",
+            settings.POKEMON_REFRESH_CONCURRENCY,
+            name,
+            cls.refresh_in_background,
+            pokemon,
+        )
+
+    @classmethod
+    def refresh_in_background(cls, pokemon):
+        try:
+            cls.refresh(pokemon)
+        except Exception as e:
+            logger.warning("Could not refresh pokemon %s: %s", pokemon.name, e)
+
+    @classmethod
+    def refresh(cls, pokemon):
+        """
+        Refetch the species data of a stored pokemon and save it. Workers
+        refreshing the same name share one upstream call.
+        """
+        name = keys.normalize_name(pokemon.name)
+
+        def fetch():
+            details = cls.get_remote_pokemon(name, pokemon.validators)
+            if not details:
+                return None
+            refreshed = cls.refreshed(pokemon, details)
+            refreshed.save()
+            cls.record_refresh(details, RedisClient)
+            return dict(refreshed.species_data(), translation=refreshed.translation)
+
+        pokemon_dict = PokemonFetches.do(f"{name}:refresh", fetch)
+        return cls.from_dict(pokemon_dict) if pokemon_dict else None
+
+    @classmethod
+    async def arefresh(cls, pokemon, redis_client):
+        """
+        Async counterpart of ``refresh``.
+        """
+        name = keys.normalize_name(pokemon.name)
+
+        async def fetch():
+            details = await cls.aget_remote_pokemon(name, pokemon.validators)
+            if not details:
+                return None
+            refreshed = cls.refreshed(pokemon, details)
+            await refreshed.asave(redis_client)
+            await cls.record_refresh(details, redis_client)
+            return dict(refreshed.species_data(), translation=refreshed.translation)
+
+        pokemon_dict = await PokemonFetches.ado(f"{name}:refresh", fetch, redis_client)
+        return cls.from_dict(pokemon_dict) if pokemon_dict else None
+
+    @staticmethod
+    def record_refresh(details, redis_client):
+        """
+        Count a refresh as answered by a 304 or by a new document.
+        """
+        outcome = "not_modified" if details is NOT_MODIFIED else "refetched"
+        return redis_client.hincrby(keys.refresh_stats_key(), outcome, 1)
+
+    @staticmethod
+    def refresh_stats(redis_client=RedisClient):
+        counts = {
+            field.decode("utf-8"): int(value)
+            for field, value in redis_client.hgetall(keys.refresh_stats_key()).items()
+        }
+        not_modified = counts.get("not_modified", 0)
+        refreshes = not_modified + counts.get("refetched", 0)
+        return {
+            "refreshes": refreshes,
+            "not_modified": not_modified,
+            "not_modified_rate": (
+                round(not_modified / refreshes, 4) if refreshes else None
+            ),
+        }
+
+    @classmethod
+    def refreshed(cls, pokemon, pokemon_data):
+        """
+        Build the refreshed pokemon from new remote data. The stored
+        description, and so its translation, is kept while the upstream still
+        lists it. When the upstream says nothing changed, only the fetch time
+        moves on.
+        """
+        if pokemon_data is NOT_MODIFIED:
+            refreshed = copy.copy(pokemon)
+            refreshed.fetched_at = time.time()
+            refreshed.species_touched = True
+            return refreshed
+        refreshed = cls.create_pokemon(pokemon_data)
+        if pokemon.description in refreshed.descriptions:
+            refreshed.description = pokemon.description
+            refreshed.translation = pokemon.translation
+            refreshed.translation_changed = False
+        return refreshed
+
+    @classmethod
+    def from_dict(cls, pokemon_dict):
+        """
+        Create a pokemon that was just saved from its dictionary.
+        """
+        pokemon = cls(**pokemon_dict)
+        pokemon.species_changed = False
+        pokemon.translation_changed = False
+        return pokemon
+
+    @classmethod
+    @metrics.timed("Pokemon.get_many")
+    def get_many(cls, names, translate=False, redis_client=RedisClient):
+        """
+        Retrieve several pokemon at once.
+
+        Cached entries are read in one pipelined round trip, misses (and
+        missing translations) are fetched concurrently on a bounded pool, and
+        everything that changed is written back in one pipeline. Returns the
+        pokemon found, keyed by normalized name, and an error per name that
+        could not be retrieved.
+        """
+        names = list(dict.fromkeys(keys.normalize_name(name) for name in names))
+        PokemonCacheInvalidator.ensure_listening()
+        found, errors = {}, {}
+        uncached = []
+        for name in names:
+            if not SpeciesNames.allows(name):
+                errors[name] = "Pokemon not found"
+            elif cached := PokemonCache.get(name):
+                count_lookup("local", "hit")
+                found[name] = copy.copy(cached)
+            else:
+                if PokemonCache.maxsize:
+                    count_lookup("local", "miss")
+                uncached.append(name)
+
+        if uncached:
+            logger.debug("Retrieving %s pokemon from DB", len(uncached))
+            pipe = redis_client.pipeline(transaction=False)
+            for name in uncached:
+                cls.queue_read(pipe, name)
+            replies = pipe.execute()
+            misses = []
+            for index, name in enumerate(uncached):
+                raw, translation, missing = replies[index * 3 : index * 3 + 3]
+                if missing:
+                    count_lookup("redis", "negative")
+                    errors[name] = "Pokemon not found"
+                elif pokemon := cls.from_redis(raw, translation):
+                    count_lookup("redis", "hit")
+                    found[name] = pokemon
+                    PokemonCache.set(name, copy.copy(pokemon))
+                else:
+                    count_lookup("redis", "miss")
+                    misses.append(name)
+
+            executor = get_executor("bulk", settings.POKEMON_BULK_CONCURRENCY)
+            fetches = {
+                name: executor.submit(cls.fetch_pokemon, name) for name in misses
+            }
+            for name, future in fetches.items():
+                try:
+                    pokemon = future.result()
+                except Exception as e:
+                    logger.warning("Could not fetch pokemon %s: %s", name, e)
+                    errors[name] = "Pokemon could not be retrieved"
+                    continue
+                if pokemon:
+                    found[name] = pokemon
+                else:
+                    errors[name] = "Pokemon not found"
+
+        # Bulk lookups never wait on a refresh, expired entries included.
+        for pokemon in found.values():
+            if pokemon.freshness != cls.FRESH:
+                cls.schedule_refresh(pokemon)
+
+        if translate:
+            executor = get_executor("bulk", settings.POKEMON_BULK_CONCURRENCY)
+            translations = [
+                executor.submit(pokemon.translate_description)
+                for pokemon in found.values()
+                if not pokemon.translation
+            ]
+            for future in translations:
+                future.result()
+
+        cls.save_many(found.values(), redis_client)
+        return {name: found[name] for name in names if name in found}, errors
+
+    @classmethod
+    @metrics.timed("Pokemon.save_many")
+    def save_many(cls, pokemons, redis_client=RedisClient):
+        """
+        Save every changed pokemon in a single pipeline.
+        """
+        changed = [pokemon for pokemon in pokemons if pokemon.has_changed]
+        if not changed:
+            return
+        logger.debug("Saving %s pokemon to DB", len(changed))
+        pipe = redis_client.pipeline(transaction=False)
+        for pokemon in changed:
+            pokemon.write_changes(pipe)
+            PokemonCacheInvalidator.publish(keys.normalize_name(pokemon.name), pipe)
+        pipe.execute()
+        for pokemon in changed:
+            pokemon.mark_saved()
+
+    @staticmethod
+    def queue_read(pipe, name):
+        """
+        Queue the reads for a stored pokemon: species data, translation, and
+        whether PokeAPI recently said there is no such pokemon.
+        """
+        get_codec().read(pipe, keys.species_key(name))
+        pipe.get(keys.translation_key(name))
+        pipe.exists(keys.missing_key(name))
+
+    @classmethod
+    def get_rendered(cls, name, variant, redis_client=RedisClient):
+        """
+        Retrieve the rendered response body stored for a pokemon, if any.
+        """
+        return redis_client.get(keys.rendered_key(name, variant))
+
+    @staticmethod
+    def rendered_keys(name, variant):
+        """
+        The keys of a rendered response: its body, if kept, and its ETag.
+        Read both with one MGET.
+        """
+        return keys.rendered_key(name, variant), keys.etag_key(name, variant)
+
+    @staticmethod
+    def rendered_etag(body):
+        return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @classmethod
+    def queue_save_rendered(
+        cls, pipe, name, variant, body, keep_body=True, only_missing=False
+    ):
+        """
+        Queue the writes storing the ETag of a rendered response body and,
+        with ``keep_body``, the body itself so it can be served as is.
+        With ``only_missing`` nothing already stored is overwritten.
+        Returns the ETag.
+        """
+        etag = cls.rendered_etag(body)
+        ex = ttl_with_jitter(settings.POKEMON_RENDERED_CACHE_TTL)
+        if keep_body:
+            pipe.set(keys.rendered_key(name, variant), body, ex=ex, nx=only_missing)
+        pipe.set(keys.etag_key(name, variant), etag, ex=ex, nx=only_missing)
+        return etag
+
+    @classmethod
+    def save_rendered(
+        cls,
+        name,
+        variant,
+        body,
+        redis_client=RedisClient,
+        keep_body=True,
+        only_missing=False,
+    ):
+        """
+        Store a rendered response body so it can be served as is, and its
+        ETag so requests for it can be answered with a 304.
+        """
+        pipe = redis_client.pipeline(transaction=False)
+        etag = cls.queue_save_rendered(
+            pipe, name, variant, body, keep_body, only_missing
+        )
+        pipe.execute()
+        return etag
+
+    def render(self, translate=False, language=None):
+        """
+        The response body of a variant, as the views render it, or None if
+        it doesn't validate.
+        """
+        serializer_class = (
+            PokemonTranslatedSerializer if translate else PokemonSerializer
+        )
+        serializer = serializer_class(
+            data=self.serialize(translate=translate, language=language)
+        )
+        if not is_valid(serializer):
+            return None
+        return render(serializer.data)
+
+    def queue_rendered(self, pipe, plain=True, translated=True):
+        """
+        Queue the writes storing the rendered variants of the pokemon: the
+        plain one in the default language and, once there is a translation,
+        the translated one. Other languages are rarely asked for; the views
+        store them on first request.
+        """
+        variants = []
+        if plain and self.description is not None:
+            variants.append((self.PLAIN, False, None))
+        if translated and self.translation:
+            variants.append((self.TRANSLATED, True, None))
+        for variant, translate, language in variants:
+            body = self.render(translate=translate, language=language)
+            if body is not None:
+                self.queue_save_rendered(
+                    pipe,
+                    self.name,
+                    variant,
+                    body,
+                    keep_body=settings.POKEMON_RENDERED_CACHE,
+                )
+
+    @classmethod
+    def from_redis(cls, redis_pokemon, translation=None):
+        """
+        Create the pokemon from its stored species data and translation, or
+        return None when there is no usable species data.
+
+        Nothing on it has changed yet, so saving it again is a no-op.
+        """
+        species = get_codec().decode(redis_pokemon)
+        if not species:
+            return None
+        # Entries written before fetch times were stored count as stale.
+        species.setdefault("fetched_at", time.time() - settings.POKEMON_SOFT_TTL)
+        pokemon = cls(**species)
+        if translation:
+            pokemon.translation = translation.decode("utf-8")
+        pokemon.species_changed = False
+        pokemon.translation_changed = False
+        return pokemon
 
     @classmethod
     def pokemon_from_json(cls, json_data):
         """
         Create the pokemon from a dictionary.
         """
-        logging.info("Creating pokemon from JSON")
+        logger.debug("Creating pokemon from JSON")
         pokemon = cls(
             name=json_data["name"],
             description=json_data["description"],
@@ -145,21 +943,118 @@ class Pokemon:
 
     @property
     def is_yoda_translation(self):
-        logging.info(f"Getting translation type for pokemon: {self.name}")
         return self.habitat == "cave" or self.isLegendary
 
+    @property
+    def has_changed(self):
+        return self.species_changed or self.species_touched or self.translation_changed
+
+    def write_changes(self, pipe):
+        """
+        Queue the writes for whatever changed since the pokemon was loaded.
+
+        Species data and translations live under separate keys so each gets
+        its own TTL. Fresh species data drops any stored translation since it
+        may belong to a different description; species data that was only
+        revalidated is rewritten with its new fetch time. The rendered
+        variants affected are dropped, and the default-language ones are
+        rendered and stored again.
+        """
+        translation_key = keys.translation_key(self.name)
+        if self.species_changed or self.translation_changed:
+            pipe.delete(*self.rendered_keys(self.name, self.TRANSLATED))
+        if self.species_changed:
+            pipe.delete(
+                *self.rendered_keys(self.name, self.PLAIN),
+                *(
+                    key
+                    for language in self.flavor_texts
+                    if language != self.POKEMON_LANGUAGE_KEY
+                    for key in self.rendered_keys(
+                        self.name, self.rendered_variant(self.PLAIN, language)
+                    )
+                ),
+                keys.missing_key(self.name),
+            )
+        if self.species_changed or self.species_touched:
+            get_codec().write(
+                pipe,
+                keys.species_key(self.name),
+                self.species_data(),
+                ttl_with_jitter(settings.POKEMON_SPECIES_TTL),
+            )
+        if self.species_changed and not self.translation:
+            pipe.delete(translation_key)
+        if self.translation_changed and self.translation:
+            pipe.set(
+                translation_key,
+                self.translation,
+                ex=ttl_with_jitter(settings.POKEMON_TRANSLATION_TTL),
+            )
+        # The common variants are stored with the data they render, so reads
+        # only ever fill in missing ones and never overwrite a newer version.
+        self.queue_rendered(
+            pipe,
+            plain=self.species_changed or self.species_touched,
+            translated=self.has_changed,
+        )
+
+    def mark_saved(self):
+        self.species_changed = False
+        self.species_touched = False
+        self.translation_changed = False
+        PokemonCache.set(keys.normalize_name(self.name), copy.copy(self))
+
+    @metrics.timed("Pokemon.save")
     def save(self):
         """
-        Save the pokemon to Redis.
+        Save the pokemon to Redis if anything on it changed.
+        """
+        if not self.has_changed:
+            return
+        logger.debug("Saving pokemon to DB")
+        pipe = self.redis_client.pipeline(transaction=False)
+        self.write_changes(pipe)
+        PokemonCacheInvalidator.publish(keys.normalize_name(self.name), pipe)
+        pipe.execute()
+        self.mark_saved()
+
+    @metrics.timed("Pokemon.save")
+    async def asave(self, redis_client=None):
+        """
+        Save the pokemon to Redis through the async Redis client if anything
+        on it changed.
+        """
+        if not self.has_changed:
+            return
+        logger.debug("Saving pokemon to DB")
+        redis_client = redis_client or get_async_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        self.write_changes(pipe)
+        PokemonCacheInvalidator.publish(keys.normalize_name(self.name), pipe)
+        await pipe.execute()
+        self.mark_saved()
+
+    def species_data(self):
         """
-        logging.info("Saving pokemon to DB")
-        self.redis_client.set(self.name, json.dumps(self.pokemon_to_dict()))
+        The stored form of the species: everything but the translation, plus
+        when it was fetched, its flavor texts by language and the upstream
+        validators to revalidate it with.
+        """
+        species = self.pokemon_to_dict()
+        species.pop("translation", None)
+        species["fetched_at"] = self.fetched_at
+        if self.flavor_texts:
+            species["flavor_texts"] = self.flavor_texts
+        if self.validators:
+            species["validators"] = self.validators
+        return species
 
     def pokemon_to_dict(self):
         """
         Convert the pokemon to a dictionary.
         """
-        logging.info(f"Converting pokemon: {self.name} into dict")
+        logger.debug("Converting pokemon %s into dict", self.name)
         result = {
             "name": self.name,
             "description": self.description,
@@ -171,22 +1066,23 @@ class Pokemon:
 
         return result
 
-    def serialize(self, translate=False):
-        logging.info(f"Serializing pokemon: {self.name}")
+    @metrics.timed("Pokemon.serialize")
+    def serialize(self, translate=False, language=None):
+        logger.debug("Serializing pokemon %s", self.name)
         result = {
             "name": self.name,
             "habitat": self.habitat,
-            "description": self.description,
+            "description": self.description_in(language),
             "isLegendary": self.isLegendary,
         }
         if translate:
-            logging.info(f"Translating pokemon {self.name}")
+            logger.debug("Serializing translation of pokemon %s", self.name)
             result["description"] = self.translation or self.description
             result["translation"] = (
                 "Yoda" if self.is_yoda_translation else "Shakespeare"
             )
 
-        logging.info(f"Serialized pokemon: {result}")
+        logger.debug("Serialized pokemon: %s", result)
 
         return result
     
@@ -194,12 +1090,113 @@ class Pokemon:
         """
         Translate the pokemon description.
         """
-        logging.info(f"Translating pokemon, {self.name} description")
+        logger.debug("Translating description of pokemon %s", self.name)
         if self.translation:
             return
         if self.is_yoda_translation:
-            logging.info("Translating pokemon to Yoda")
+            logger.debug("Translating pokemon to Yoda")
             self.translation = self.get_translation(self.description, "yoda")
         else:
-            logging.info("Translating pokemon to Shakespeare")
+            logger.debug("Translating pokemon to Shakespeare")
             self.translation = self.get_translation(self.description, "shakespeare")
+        self.translation_changed = bool(self.translation)
+
+    def enqueue_translation(self):
+        """
+        Leave the translation to ``manage.py translation_worker``.
+        """
+        return TranslationJobs.enqueue(keys.normalize_name(self.name))
+
+    @staticmethod
+    def enqueue_translations(names):
+        """
+        Leave the translations of several pokemon to the worker.
+        """
+        return TranslationJobs.enqueue_many(
+            [keys.normalize_name(name) for name in names]
+        )
+
+    async def aenqueue_translation(self, redis_client=None):
+        return await TranslationJobs.aenqueue(
+            redis_client or get_async_redis_client(), keys.normalize_name(self.name)
+        )
+
+    @classmethod
+    def translate_and_save(cls, name):
+        """
+        Fill in and store the translation of a cached pokemon, for queued
+        translation jobs.
+        """
+        pokemon = cls.get(name)
+        if not pokemon:
+            return None
+        pokemon.translate_description()
+        pokemon.save()
+        return pokemon
+
+    @property
+    def translation_type(self):
+        return "yoda" if self.is_yoda_translation else "shakespeare"
+
+    async def atranslate_description(self):
+        """
+        Translate the pokemon description without blocking the event loop.
+        """
+        logger.debug("Translating description of pokemon %s", self.name)
+        if self.translation:
+            return
+        self.translation = await self.aget_translation(
+            self.description, self.translation_type
+        )
+        self.translation_changed = bool(self.translation)
+
+
+def collect_metrics():
+    """
+    Metrics Redis keeps already, read at every scrape: the translation
+    circuit and quota, translation store lookups and species refreshes.
+    """
+    breaker = TranslationBreaker.status()
+    store = TranslationTexts.stats()
+    refreshes = Pokemon.refresh_stats()
+    return [
+        (
+            "pokedex_translation_circuit_open",
+            GAUGE,
+            "1 while translation calls are stopped.",
+            [({}, int(breaker["state"] == CircuitBreaker.OPEN))],
+        ),
+        (
+            "pokedex_translation_circuit_failures",
+            GAUGE,
+            "Translation failures in a row.",
+            [({}, breaker["failures"])],
+        ),
+        (
+            "pokedex_translation_quota_remaining",
+            GAUGE,
+            "Translation calls left in the shared quota.",
+            [({}, TranslationQuota.remaining())],
+        ),
+        (
+            "pokedex_translation_store_lookups_total",
+            COUNTER,
+            "Translation store lookups by result.",
+            [({"result": "hit"}, store["hits"]), ({"result": "miss"}, store["misses"])],
+        ),
+        (
+            "pokedex_species_refreshes_total",
+            COUNTER,
+            "Species refreshes by whether PokeAPI answered 304 Not Modified.",
+            [
+                ({"outcome": "not_modified"}, refreshes["not_modified"]),
+                (
+                    {"outcome": "refetched"},
+                    refreshes["refreshes"] - refreshes["not_modified"],
+                ),
+            ],
+        ),
+    ]
+
+
+metrics.register_collector(collect_metrics)
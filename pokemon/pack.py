@@ -0,0 +1,144 @@
+"""
+Species data packs.
+
+A pack holds the projected species documents PokeAPI would return, so
+species can be served without network access. It is read through mmap: every
+worker on a host shares the same page cache and nothing is copied per
+process.
+
+Layout, little endian::
+
+    header   magic "PDXPACK1", version u32, slot count u32, key count u32,
+             reserved u32
+    table    slot count x (key hash u64, record offset u32, record length u32)
+    records  compact JSON documents
+
+The table is an open-addressing hash table keyed by the 64-bit blake2b hash
+of a species name or ID, probed linearly from ``hash % slot count``. An
+empty slot has hash 0. The slot count is a power of two at least twice the
+number of keys, so probes stay short.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+
+from pokemon import keys
+from pokemon.projection import project_species
+
+MAGIC = b"PDXPACK1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+SLOT = struct.Struct("<QII")
+
+
+class PackError(Exception):
+    pass
+
+
+def key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def write_pack(path: str, documents: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write the projected documents to a pack at ``path``, replacing any
+    previous pack atomically. Returns the number of species written.
+    """
+    records, entries, species = bytearray(), [], 0
+    for document in documents:
+        species += 1
+        projected = project_species(document)
+        record = json.dumps(projected, separators=(",", ":")).encode("utf-8")
+        location = (len(records), len(record))
+        records += record
+        entries.append((keys.normalize_name(document["name"]), location))
+        if document.get("id") is not None:
+            entries.append((str(document["id"]), location))
+
+    if not species:
+        raise PackError("No species to pack")
+
+    slot_count = 1
+    while slot_count < 2 * len(entries):
+        slot_count *= 2
+    slots = [(0, 0, 0)] * slot_count
+    for key, (offset, length) in entries:
+        hashed = key_hash(key)
+        slot = hashed % slot_count
+        while slots[slot][0] and slots[slot][0] != hashed:
+            slot = (slot + 1) % slot_count
+        slots[slot] = (hashed, offset, length)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, slot_count, len(entries), 0))
+        for slot in slots:
+            f.write(SLOT.pack(*slot))
+        f.write(records)
+    os.replace(temporary, path)
+    return species
+
+
+class SpeciesPack:
+    """
+    Read-only access to a pack with O(1) lookups by species name or ID.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise PackError(f"{path} is not a species pack")
+        magic, version, self.slot_count, self.key_count, _ = HEADER.unpack_from(
+            self.data
+        )
+        if magic != MAGIC or version != VERSION:
+            raise PackError(f"{path} is not a version {VERSION} species pack")
+        self.records_offset = HEADER.size + self.slot_count * SLOT.size
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        key = keys.normalize_name(name)
+        hashed = key_hash(key)
+        slot = hashed % self.slot_count
+        for _ in range(self.slot_count):
+            slot_hash, offset, length = SLOT.unpack_from(
+                self.data, HEADER.size + slot * SLOT.size
+            )
+            if not slot_hash:
+                return None
+            if slot_hash == hashed:
+                start = self.records_offset + offset
+                document = json.loads(self.data[start : start + length])
+                if key in (document["name"], str(document["id"])):
+                    return document
+            slot = (slot + 1) % self.slot_count
+        return None
+
+    def close(self) -> None:
+        self.data.close()
+
+
+_packs: Dict[str, SpeciesPack] = {}
+_packs_lock = threading.Lock()
+
+
+def get_species_pack(path: str = None) -> SpeciesPack:
+    """
+    Return the pack at ``path``, by default ``POKEMON_SPECIES_PACK``, mapping
+    it on first use.
+    """
+    path = path or settings.POKEMON_SPECIES_PACK
+    if path not in _packs:
+        with _packs_lock:
+            if path not in _packs:
+                _packs[path] = SpeciesPack(path)
+    return _packs[path]
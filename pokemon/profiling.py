@@ -0,0 +1,175 @@
+"""
+On-demand profiles of real requests.
+
+A request is profiled with cProfile when it carries a header signed with the
+project's SECRET_KEY (``manage.py profiles --token`` makes one), when it asks
+with ``?profile=1`` from an allowlisted address, or by random sampling.
+Profiles are written to a directory that keeps the newest ``size`` of them:
+a ``.prof`` file for ``pstats`` and a ``.json`` file describing the request.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_HEADER = "X-Pokedex-Profile"
+PROFILE_META_KEY = "HTTP_X_POKEDEX_PROFILE"
+PROFILE_SALT = "pokedex.profile"
+
+# cProfile can only run one profiler per thread at a time.
+_active = threading.local()
+
+
+def make_token() -> str:
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign("profile")
+
+
+def valid_token(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            token, max_age=settings.POKEMON_PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_trigger(request) -> Optional[str]:
+    """
+    Why the request should be profiled, or None. Requests that ask for
+    nothing cost a few dictionary lookups and, with sampling on, one random
+    number.
+    """
+    token = request.META.get(PROFILE_META_KEY)
+    if token is not None and valid_token(token):
+        return "header"
+    allowed = settings.POKEMON_PROFILE_ALLOWED_IPS
+    if (
+        allowed
+        and request.META.get("REMOTE_ADDR") in allowed
+        and "profile" in request.GET
+    ):
+        return "query"
+    rate = settings.POKEMON_PROFILE_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+class Profile:
+    """
+    Profile the code run between ``start`` and ``stop`` on this thread.
+    Under ASGI that is everything the event loop runs meanwhile, other
+    requests included.
+    """
+
+    def __init__(self) -> None:
+        self.profiler = None
+
+    def start(self) -> bool:
+        if getattr(_active, "profiling", False):
+            return False
+        self.profiler = cProfile.Profile()
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Another profiler, e.g. a coverage tool, holds the hooks.
+            return False
+        _active.profiling = True
+        self.started = time.perf_counter()
+        return True
+
+    def stop(self) -> float:
+        self.profiler.disable()
+        _active.profiling = False
+        return time.perf_counter() - self.started
+
+
+class ProfileRing:
+    """
+    A directory holding the newest ``size`` profiles. Every worker may write
+    to it; each write prunes the oldest profiles past ``size``.
+    """
+
+    def __init__(self, directory: str, size: int) -> None:
+        self.directory = directory
+        self.size = size
+
+    def write(self, profiler: cProfile.Profile, details: Dict[str, Any]) -> str:
+        """
+        Store a profile with the details of its request and return its name.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        name = "%s.%06d-%s" % (
+            time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)),
+            now % 1 * 1_000_000,
+            uuid.uuid4().hex[:8],
+        )
+        path = os.path.join(self.directory, name)
+        profiler.dump_stats(f"{path}.prof.tmp")
+        os.replace(f"{path}.prof.tmp", f"{path}.prof")
+        with open(f"{path}.json.tmp", "w") as f:
+            json.dump(dict(details, name=name, created_at=now), f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+        self.prune()
+        return name
+
+    def names(self) -> List[str]:
+        """
+        Profile names, oldest first.
+        """
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in files if name.endswith(".json"))
+
+    def details(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(name, "json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def summary(self, name: str, sort: str = "cumulative", limit: int = 25) -> str:
+        """
+        The ``limit`` costliest functions of a profile, as pstats prints them.
+        """
+        output = io.StringIO()
+        stats = pstats.Stats(self.path(name, "prof"), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def prune(self) -> None:
+        names = self.names()
+        for name in names[: max(len(names) - self.size, 0)]:
+            self.delete(name)
+
+    def clear(self) -> None:
+        for name in self.names():
+            self.delete(name)
+
+    def delete(self, name: str) -> None:
+        for extension in ("json", "prof"):
+            try:
+                os.remove(self.path(name, extension))
+            except FileNotFoundError:
+                pass
+
+    def path(self, name: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{os.path.basename(name)}.{extension}")
+
+
+def get_profile_ring() -> ProfileRing:
+    return ProfileRing(settings.POKEMON_PROFILE_DIR, settings.POKEMON_PROFILE_RING_SIZE)
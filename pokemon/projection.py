@@ -0,0 +1,105 @@
+"""
+Projection of PokeAPI species documents down to the fields the service uses.
+
+A species document carries every flavor text in every language plus names,
+genera, pokedex numbers, varieties and URLs for each. Decoding it with
+``keep_species_fields`` as the ``object_pairs_hook`` drops everything else
+while parsing, so the full document is never built in memory. The species
+pack builder does that; responses from PokeAPI are decoded in full, since
+keeping every language leaves the hook little memory to save for the extra
+parse time it costs.
+
+The flavor texts that survive are grouped by language once, at ingestion,
+with ``flavor_text_index``; serving a description is then a dictionary lookup
+and a pick by ``select_description``.
+"""
+
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from pokemon import keys
+
+LATEST = "latest"
+EARLIEST = "earliest"
+RANDOM = "random"
+POLICIES = (LATEST, EARLIEST, RANDOM)
+
+SPECIES_FIELDS = frozenset(
+    {
+        "id",
+        "name",
+        "flavor_text_entries",
+        "flavor_text",
+        "language",
+        "habitat",
+        "is_legendary",
+    }
+)
+
+
+def keep_species_fields(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    return {key: value for key, value in pairs if key in SPECIES_FIELDS}
+
+
+def loads_species(raw) -> Dict[str, Any]:
+    """
+    Decode a species document straight into its projection.
+    """
+    return project_species(json.loads(raw, object_pairs_hook=keep_species_fields))
+
+
+def project_species(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only what ``Pokemon.create_pokemon`` reads from a species document:
+    its name and ID, flavor texts with their language, habitat and legendary
+    flag.
+    """
+    habitat = document.get("habitat")
+    return {
+        "id": document.get("id"),
+        "name": document["name"],
+        "flavor_text_entries": [
+            {
+                "flavor_text": entry["flavor_text"],
+                "language": {"name": entry["language"]["name"]},
+            }
+            for entry in document["flavor_text_entries"]
+        ],
+        "habitat": {"name": habitat["name"]} if habitat else None,
+        "is_legendary": document["is_legendary"],
+    }
+
+
+def flavor_text_index(entries: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Group flavor texts by lowercased language name, keeping the order
+    PokeAPI lists them in, which follows the games' release order. A text
+    repeated across versions (often with different line breaks) is kept
+    once, where it first appeared.
+    """
+    index: Dict[str, List[str]] = {}
+    seen = set()
+    for entry in entries:
+        language = entry["language"]["name"].lower()
+        text = entry["flavor_text"]
+        key = (language, keys.normalize_text(text))
+        if key in seen:
+            continue
+        seen.add(key)
+        index.setdefault(language, []).append(text)
+    return index
+
+
+def select_description(texts: Optional[List[str]], policy: str) -> Optional[str]:
+    """
+    Pick one of a language's flavor texts: the newest game's, the oldest
+    game's, or any. Returns None when there are none.
+    """
+    if not texts:
+        return None
+    if policy == RANDOM:
+        return random.choice(texts)
+    if policy == EARLIEST:
+        return texts[0]
+    return texts[-1]
@@ -1,4 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from pokemon.metrics import metrics
 
 
 class PokemonSerializer(serializers.Serializer):
@@ -9,3 +13,37 @@ class PokemonSerializer(serializers.Serializer):
 
 class PokemonTranslatedSerializer(PokemonSerializer):
     translation = serializers.CharField()
+
+
+class PokemonLanguageSerializer(serializers.Serializer):
+    lang = serializers.RegexField(
+        r"^[A-Za-z]{2,8}(-[A-Za-z0-9]{1,8})*$", required=False
+    )
+
+    def validate_lang(self, value):
+        return value.lower()
+
+
+class PokemonBulkRequestSerializer(serializers.Serializer):
+    names = serializers.ListField(child=serializers.SlugField(), allow_empty=False)
+    translated = serializers.BooleanField(default=False)
+
+    def validate_names(self, value):
+        if len(value) > settings.POKEMON_BULK_MAX_NAMES:
+            raise serializers.ValidationError(
+                f"Ask for at most {settings.POKEMON_BULK_MAX_NAMES} names."
+            )
+        return value
+
+
+def is_valid(serializer):
+    with metrics.span("serializer.validate"):
+        return serializer.is_valid()
+
+
+def render(data):
+    """
+    Render response data as JSON, as DRF's JSONRenderer does for responses.
+    """
+    with metrics.span("renderer.render"):
+        return JSONRenderer().render(data)
@@ -1,12 +1,327 @@
-from typing import Any, Dict
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from urllib import parse
 
+from django.conf import settings
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from pokemon.metrics import metrics
 
-def make_request(url, **kwargs) -> Dict[Any, Any]:
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_executors: Dict[str, tuple] = {}
+_executors_lock = threading.Lock()
+_pending: Dict[str, tuple] = {}
+
+# Response validators, as stored with a cached document, and the request
+# headers that send them back.
+VALIDATORS = (
+    ("etag", "ETag", "If-None-Match"),
+    ("last_modified", "Last-Modified", "If-Modified-Since"),
+)
+
+
+class UpstreamUnavailable(Exception):
+    """
+    An upstream could not be reached or failed, even after retries.
+    """
+
+    status = 503
+
+
+class UpstreamTimeout(UpstreamUnavailable):
+    """
+    An upstream did not answer in time.
+    """
+
+    status = 504
+
+
+def upstream_prefix(url: str) -> str:
+    """
+    Reduce an upstream URL to the scheme and host its connection pool is
+    mounted on.
+    """
+    parts = parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def build_session() -> requests.Session:
+    """
+    Build a session with one keep-alive connection pool per upstream host.
+    """
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+        # A 429's Retry-After can be an hour away; hand it to the caller
+        # instead of sleeping on it inside the retry loop.
+        respect_retry_after_header=False,
+    )
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=retry))
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+
+    pool_sizes: Dict[str, int] = {}
+    for url, size in settings.HTTP_POOL_SIZES.items():
+        prefix = upstream_prefix(url)
+        pool_sizes[prefix] = max(size, pool_sizes.get(prefix, 0))
+    for prefix, size in pool_sizes.items():
+        session.mount(
+            prefix,
+            HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry),
+        )
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the session shared by every thread of the current process.
+
+    The session is rebuilt after a fork so that workers never share sockets
+    with their parent.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+    return _session
+
+
+def reset_session() -> None:
+    """
+    Drop the shared session, closing its pooled connections.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Return the named thread pool of the current process, which bounds how many
+    upstream calls that kind of work may have in flight at once.
+    """
+    pid = os.getpid()
+    with _executors_lock:
+        owner, executor = _executors.get(name, (None, None))
+        if owner != pid:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f"pokedex-{name}"
+            )
+            _executors[name] = (pid, executor)
+    return executor
+
+
+def submit_once(name: str, max_workers: int, key: str, fn, *args) -> Optional[Future]:
+    """
+    Run ``fn(*args)`` on the named thread pool unless work for ``key`` is
+    already queued or running there. Returns None when it was skipped.
+    """
+    pid = os.getpid()
+    with _executors_lock:
+        owner, pending = _pending.get(name, (None, None))
+        if owner != pid:
+            pending = set()
+            _pending[name] = (pid, pending)
+        if key in pending:
+            return None
+        pending.add(key)
+
+    def done(future):
+        with _executors_lock:
+            pending.discard(key)
+
+    try:
+        future = get_executor(name, max_workers).submit(fn, *args)
+    except Exception:
+        with _executors_lock:
+            pending.discard(key)
+        raise
+    future.add_done_callback(done)
+    return future
+
+
+def count_response(url, status) -> None:
+    """
+    Count an upstream response by host and status code, after retries.
+    """
+    metrics.inc(
+        "pokedex_upstream_responses_total",
+        host=parse.urlsplit(url).netloc,
+        status=status,
+    )
+
+
+def session_get(url, **kwargs) -> requests.Response:
+    try:
+        response = get_session().get(url, **kwargs)
+    except requests.exceptions.RequestException:
+        count_response(url, "error")
+        raise
+    count_response(url, response.status_code)
+    return response
+
+
+def make_request(url, object_pairs_hook=None, **kwargs) -> Dict[Any, Any]:
     """
     Non-generic utility to make a request to the given URL.
+
+    ``object_pairs_hook`` is handed to the JSON decoder, e.g. to drop fields
+    while the body is parsed.
+    """
+    kwargs.setdefault(
+        "timeout", (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+    )
+    response = session_get(url, **kwargs)
+    response.raise_for_status()
+    return response.json(object_pairs_hook=object_pairs_hook)
+
+
+def conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    validators = validators or {}
+    return {
+        request_header: validators[name]
+        for name, _, request_header in VALIDATORS
+        if validators.get(name)
+    }
+
+
+def response_validators(headers) -> Dict[str, str]:
+    return {
+        name: headers[response_header]
+        for name, response_header, _ in VALIDATORS
+        if response_header in headers
+    }
+
+
+def make_conditional_request(
+    url, validators=None, object_pairs_hook=None, **kwargs
+) -> Tuple[Optional[Dict[Any, Any]], Dict[str, str]]:
+    """
+    Revalidate a document fetched earlier with the given ``validators``.
+
+    Returns the document and its new validators, or None and the old
+    validators when the upstream answers 304 Not Modified, skipping the
+    download and the parse.
+    """
+    kwargs.setdefault(
+        "timeout", (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+    )
+    kwargs["headers"] = {**kwargs.get("headers", {}), **conditional_headers(validators)}
+    response = session_get(url, **kwargs)
+    if response.status_code == 304:
+        return None, validators
+    response.raise_for_status()
+    return (
+        response.json(object_pairs_hook=object_pairs_hook),
+        response_validators(response.headers),
+    )
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def build_async_client() -> httpx.AsyncClient:
+    """
+    Build an async client with one keep-alive connection pool per upstream host.
+    """
+    timeout = httpx.Timeout(
+        settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+    )
+    pool_sizes: Dict[str, int] = {}
+    for url, size in settings.HTTP_POOL_SIZES.items():
+        prefix = upstream_prefix(url).rstrip("/")
+        pool_sizes[prefix] = max(size, pool_sizes.get(prefix, 0))
+    mounts = {
+        prefix: httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            retries=settings.HTTP_MAX_RETRIES,
+        )
+        for prefix, size in pool_sizes.items()
+    }
+    return httpx.AsyncClient(
+        timeout=timeout,
+        mounts=mounts,
+        transport=httpx.AsyncHTTPTransport(retries=settings.HTTP_MAX_RETRIES),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the async client bound to the running event loop.
+
+    httpx connections belong to the loop that opened them, so each loop gets
+    its own client; under uvicorn that is one per worker.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = build_async_client()
+    return client
+
+
+async def async_get(url, **kwargs) -> httpx.Response:
+    """
+    GET through the async client of the running loop.
+
+    Transport retries only cover connection errors, so 502/503/504 responses
+    are retried here with the same backoff as the sync session.
+    """
+    client = get_async_client()
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.HTTPError:
+            count_response(url, "error")
+            raise
+        if response.status_code not in (502, 503, 504):
+            break
+        if attempt < settings.HTTP_MAX_RETRIES:
+            await asyncio.sleep(settings.HTTP_RETRY_BACKOFF * (2**attempt))
+    count_response(url, response.status_code)
+    return response
+
+
+async def make_async_request(url, object_pairs_hook=None, **kwargs) -> Dict[Any, Any]:
+    """
+    Async counterpart of ``make_request``.
+    """
+    response = await async_get(url, **kwargs)
+    response.raise_for_status()
+    return response.json(object_pairs_hook=object_pairs_hook)
+
+
+async def make_async_conditional_request(
+    url, validators=None, object_pairs_hook=None, **kwargs
+) -> Tuple[Optional[Dict[Any, Any]], Dict[str, str]]:
+    """
+    Async counterpart of ``make_conditional_request``.
     """
-    response = requests.get(url, **kwargs)
+    kwargs["headers"] = {**kwargs.get("headers", {}), **conditional_headers(validators)}
+    response = await async_get(url, **kwargs)
+    if response.status_code == 304:
+        return None, validators
     response.raise_for_status()
-    return response.json()
+    return (
+        response.json(object_pairs_hook=object_pairs_hook),
+        response_validators(response.headers),
+    )
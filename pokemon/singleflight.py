@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+import redis
+
+from pokemon import keys
+
+logger = logging.getLogger(__name__)
+
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key so only one of them runs.
+
+    Inside a process, callers for a key that is already in flight wait for
+    the leader's result. Across processes, the leader also takes a short
+    Redis lease and publishes its result under a short-lived key; callers
+    that lose the lease poll for that result instead of repeating the work.
+    Waiting is bounded by ``wait_timeout``, after which a caller does the work
+    itself. Results must be JSON serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        redis_client: redis.Redis,
+        lease_ttl: float,
+        wait_timeout: float,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.namespace = namespace
+        self.redis_client = redis_client
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._async_calls = weakref.WeakKeyDictionary()
+
+    def lease_key(self, key: str) -> str:
+        return keys.flight_key(self.namespace, key, "lease")
+
+    def result_key(self, key: str) -> str:
+        return keys.flight_key(self.namespace, key, "result")
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                logger.warning("Timed out waiting on %s:%s", self.namespace, key)
+                return fn()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def _do_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        token = uuid.uuid4().hex
+        lease_key = self.lease_key(key)
+        try:
+            acquired = self.redis_client.set(
+                lease_key, token, nx=True, px=int(self.lease_ttl * 1000)
+            )
+        except redis.RedisError:
+            return fn()
+
+        if acquired:
+            try:
+                result = fn()
+                self.redis_client.set(
+                    self.result_key(key),
+                    json.dumps(result),
+                    px=int(self.lease_ttl * 1000),
+                )
+                return result
+            finally:
+                self._release(lease_key, token)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            raw = self.redis_client.get(self.result_key(key))
+            if raw is not None:
+                return json.loads(raw)
+            if not self.redis_client.exists(lease_key):
+                break
+            time.sleep(self.poll_interval)
+        return fn()
+
+    def _release(self, lease_key: str, token: str) -> None:
+        try:
+            self.redis_client.eval(RELEASE_SCRIPT, 1, lease_key, token)
+        except redis.RedisError as e:
+            logger.warning("Could not release %s: %s", lease_key, e)
+
+    async def ado(
+        self, key: str, fn: Callable[[], Awaitable[Any]], redis_client
+    ) -> Any:
+        """
+        Async counterpart of ``do`` for callers on an event loop.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.wait_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting on %s:%s", self.namespace, key)
+                return await fn()
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await self._ado_shared(key, fn, redis_client)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del calls[key]
+
+    async def _ado_shared(self, key, fn, redis_client) -> Any:
+        token = uuid.uuid4().hex
+        lease_key = self.lease_key(key)
+        try:
+            acquired = await redis_client.set(
+                lease_key, token, nx=True, px=int(self.lease_ttl * 1000)
+            )
+        except redis.RedisError:
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                await redis_client.set(
+                    self.result_key(key),
+                    json.dumps(result),
+                    px=int(self.lease_ttl * 1000),
+                )
+                return result
+            finally:
+                try:
+                    await redis_client.eval(RELEASE_SCRIPT, 1, lease_key, token)
+                except redis.RedisError as e:
+                    logger.warning("Could not release %s: %s", lease_key, e)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            raw = await redis_client.get(self.result_key(key))
+            if raw is not None:
+                return json.loads(raw)
+            if not await redis_client.exists(lease_key):
+                break
+            await asyncio.sleep(self.poll_interval)
+        return await fn()
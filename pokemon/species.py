@@ -0,0 +1,131 @@
+"""
+The catalogue of species names.
+
+PokeAPI lists every species, so the names can be snapshotted to a file and
+loaded into memory. Lookups for names that aren't in the snapshot can then be
+answered without touching Redis or PokeAPI.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, FrozenSet, Iterator, List, Optional
+
+from django.conf import settings
+
+from pokemon import keys
+from pokemon.metrics import metrics
+from pokemon.services import make_request
+
+logger = logging.getLogger(__name__)
+
+
+def species_pages(
+    offset: int = 0, page_size: int = 100, limit: Optional[int] = None
+) -> Iterator[List[str]]:
+    """
+    Yield pages of species names from the PokeAPI listing.
+    """
+    end = offset + limit if limit else None
+    while end is None or offset < end:
+        size = min(page_size, end - offset) if end else page_size
+        page = make_request(
+            settings.POKEMON_API_URL, params={"offset": offset, "limit": size}
+        )
+        names = [species["name"] for species in page["results"]]
+        if not names:
+            return
+        yield names
+        offset += len(names)
+        if offset >= page["count"]:
+            return
+
+
+def write_snapshot(path: str, names: List[str]) -> None:
+    """
+    Write the names to ``path``, replacing any previous snapshot atomically
+    so running workers never read a partial file.
+    """
+    snapshot = {
+        "built_at": time.time(),
+        "count": len(names),
+        "names": sorted(set(keys.normalize_name(name) for name in names)),
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+class SpeciesIndex:
+    """
+    The set of valid species names, loaded from a snapshot file.
+
+    The file is checked for changes at most every ``refresh_interval``
+    seconds, so a rebuilt snapshot is picked up without a restart. Without a
+    snapshot every name is allowed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        refresh_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.names: Optional[FrozenSet[str]] = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def allows(self, name: str) -> bool:
+        """
+        Whether ``name`` (already normalized) may be a species. Rejections
+        are counted as ``index`` lookups, each one a Redis read and likely a
+        PokeAPI call saved.
+        """
+        if self.clock() >= self._next_check:
+            self.reload()
+        names = self.names
+        # PokeAPI also answers to species IDs, which the snapshot doesn't list.
+        if names is None or name in names or name.isdigit():
+            return True
+        metrics.inc("pokedex_cache_lookups_total", layer="index", result="rejected")
+        return False
+
+    def reload(self) -> None:
+        with self._lock:
+            if self.clock() < self._next_check:
+                return
+            self._next_check = self.clock() + self.refresh_interval
+            if not self.path:
+                return
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                if self.names is not None:
+                    logger.warning("Species index %s disappeared", self.path)
+                self.names = self._mtime = None
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path) as f:
+                    names = json.load(f)["names"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Could not load species index %s: %s", self.path, e)
+                return
+            self.names = frozenset(names)
+            self._mtime = mtime
+            logger.info("Loaded %s species names from %s", len(names), self.path)
+
+    def stats(self):
+        names = self.names
+        return {
+            "loaded": names is not None,
+            "size": len(names) if names is not None else 0,
+        }
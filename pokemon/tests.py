@@ -1,13 +1,57 @@
+import io
 import json
+import logging
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
 from typing import Dict
-from mock import patch
+from mock import AsyncMock, patch
 
+import httpx
+import redis
+import requests
+
+from django.core.management import CommandError, call_command
+
+from django.conf import settings
+from django.test import RequestFactory, override_settings
 from rest_framework.test import APITestCase
 
-from pokemon.models import Pokemon
+from pokemon import keys, services, workers
+from pokemon.cache import CacheInvalidator, LocalCache, TranslationStore
+from pokemon.codecs import get_codec
+from pokemon.logs import SampleFilter
+from pokemon.metrics import Metrics, metrics
+from pokemon.pack import SpeciesPack, get_species_pack
+from pokemon.profiling import PROFILE_HEADER, ProfileRing, make_token
+from pokemon.projection import flavor_text_index, loads_species, select_description
+from pokemon.singleflight import SingleFlight
+from pokemon.species import SpeciesIndex, write_snapshot
+from pokemon.throttling import CircuitBreaker, TokenBucket
+from pokemon.models import (
+    Pokemon,
+    PokemonCache,
+    RedisClient,
+    TranslationBreaker,
+    TranslationJobs,
+    TranslationQuota,
+    TranslationTexts,
+    get_async_redis_client,
+)
+from pokemon.views import AsyncPokemonRetrieveView, AsyncPokemonTranslateView
 
 
 class PokemonRetrieveViewTest(APITestCase):
+    def setUp(self):
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+
     def test_pokemon_with_cave_habitat_will_have_yoda_translation(self):
         pokemon = Pokemon(
             name="Pikachu",
@@ -45,7 +89,7 @@ class PokemonRetrieveViewTest(APITestCase):
         self.assertFalse(pokemon.is_yoda_translation)
 
     def test_get_remote_pokemons_will_return_pokemon_from_remote(self):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "name": "Pikachu",
                 "flavor_text_entries": [
@@ -73,7 +117,7 @@ class PokemonRetrieveViewTest(APITestCase):
 
     def test_get_shakespeare_translation_will_return_translation_from_remote(self):
         translation = "From the time 't is born,  a flame burns at the tip of its tail. Its life would end if 't be true the flame wast to wend out."
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "success": {"total": 1},
                 "contents": {
@@ -88,7 +132,7 @@ class PokemonRetrieveViewTest(APITestCase):
 
     def test_get_yoda_translation_will_return_translation(self):
         translation = "From the time 't is born,  a flame burns at the tip of its tail. Its life would end if 't be true the flame wast to wend out."
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "success": {"total": 1},
                 "contents": {
@@ -102,7 +146,7 @@ class PokemonRetrieveViewTest(APITestCase):
         self.assertEqual(translation, pokemon)
 
     def test_retrieve_description_will_pull_out_description_from_api_response(self):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "name": "Pikachu",
                 "flavor_text_entries": [
@@ -129,7 +173,7 @@ class PokemonRetrieveViewTest(APITestCase):
     def test_retrieve_description_will_pull_out_description_from_list_from_api_response(
         self,
     ):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "name": "Pikachu",
                 "flavor_text_entries": [
@@ -162,7 +206,7 @@ class PokemonRetrieveViewTest(APITestCase):
         self.assertEqual(description, pokemon["flavor_text_entries"][0]["flavor_text"])
 
     def test_creating_pokemon_from_remote_will_yield_pokemon(self):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "name": "Pikachu",
                 "flavor_text_entries": [
@@ -230,13 +274,13 @@ class PokemonRetrieveViewTest(APITestCase):
         pokemon = Pokemon(**pikachu_dict)
         pokemon.save()
         self.assertEqual(
-            pokemon.redis_client.get(pikachu_dict["name"]).decode("utf-8"),
-            json.dumps(pokemon.pokemon_to_dict()),
+            get_codec().decode(pokemon.redis_client.get(keys.species_key("Pikachu"))),
+            {**pokemon.pokemon_to_dict(), "fetched_at": pokemon.fetched_at},
         )
-        pokemon.redis_client.delete(pikachu_dict["name"])
+        pokemon.redis_client.delete(keys.species_key("Pikachu"))
 
     def test_get_method_will_return_pokemon(self):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "name": "Pikachu",
                 "flavor_text_entries": [
@@ -387,7 +431,7 @@ class PokemonRetrieveViewTest(APITestCase):
         )
 
     def test_translate_pokemon_description_will_mutate_translation(self):
-        with patch("pokemon.models.requests.get") as mock_get:
+        with patch("pokemon.services.requests.Session.get") as mock_get:
             mock_get.return_value.json.return_value = {
                 "success": {"total": 1},
                 "contents": {
@@ -423,3 +467,1934 @@ class PokemonRetrieveViewTest(APITestCase):
         self.assertIn("description", response.data)
         self.assertIn("habitat", response.data)
         self.assertIn("isLegendary", response.data)
+
+
+class UpstreamSessionTest(APITestCase):
+    def setUp(self):
+        services.reset_session()
+
+    def tearDown(self):
+        services.reset_session()
+
+    def test_session_is_shared_between_requests(self):
+        self.assertIs(services.get_session(), services.get_session())
+
+    def test_session_is_rebuilt_after_reset(self):
+        session = services.get_session()
+        services.reset_session()
+        self.assertIsNot(session, services.get_session())
+
+    def test_each_upstream_host_gets_its_own_pool_size(self):
+        with self.settings(
+            HTTP_POOL_SIZES={
+                "https://pokeapi.co/api/v2/pokemon-species/": 7,
+                "https://api.funtranslations.com/translate/yoda.json": 3,
+            }
+        ):
+            session = services.get_session()
+            pokeapi = session.get_adapter("https://pokeapi.co/api/v2/pokemon-species/x")
+            translations = session.get_adapter(
+                "https://api.funtranslations.com/translate/shakespeare.json"
+            )
+
+        self.assertEqual(pokeapi._pool_maxsize, 7)
+        self.assertEqual(translations._pool_maxsize, 3)
+
+    def test_retries_do_not_sleep_through_retry_after(self):
+        adapter = services.get_session().get_adapter("https://pokeapi.co/")
+        self.assertFalse(adapter.max_retries.respect_retry_after_header)
+
+    def test_make_request_applies_default_timeouts(self):
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            mock_get.return_value.json.return_value = {}
+            services.make_request("https://pokeapi.co/api/v2/pokemon-species/x")
+
+        self.assertEqual(
+            mock_get.call_args.kwargs["timeout"],
+            (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+        )
+
+    def test_upstream_timeout_answers_504(self):
+        with patch(
+            "pokemon.services.requests.Session.get",
+            side_effect=requests.exceptions.ReadTimeout("too slow"),
+        ):
+            response = self.client.get("/pokemon/ditto/")
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertFalse(RedisClient.exists(keys.missing_key("ditto")))
+
+    def test_unreachable_upstream_answers_503(self):
+        with patch(
+            "pokemon.services.requests.Session.get",
+            side_effect=requests.exceptions.ConnectionError("refused"),
+        ):
+            response = self.client.get("/pokemon/translated/ditto/")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"detail": "Pokemon service unavailable"})
+
+
+class AsyncPokemonTest(APITestCase):
+    species = {
+        "name": "pikachu",
+        "flavor_text_entries": [
+            {"language": {"name": "en"}, "flavor_text": "A cute electric mouse"},
+        ],
+        "habitat": {"name": "forest"},
+        "is_legendary": False,
+    }
+
+    def tearDown(self):
+        RedisClient.delete(keys.species_key("pikachu"))
+
+    async def test_aget_will_return_pokemon_from_remote(self):
+        with patch(
+            "pokemon.models.make_async_conditional_request",
+            new=AsyncMock(return_value=(self.species, {})),
+        ):
+            pokemon = await Pokemon.aget("pikachu")
+
+        self.assertEqual(pokemon.name, "pikachu")
+        self.assertEqual(pokemon.description, "A cute electric mouse")
+        self.assertEqual(pokemon.habitat, "forest")
+        await get_async_redis_client().aclose()
+
+    async def test_asave_will_store_pokemon_for_aget(self):
+        pokemon = Pokemon.create_pokemon(self.species)
+        await pokemon.asave()
+        with patch(
+            "pokemon.models.make_async_conditional_request", new=AsyncMock()
+        ) as mock_get:
+            cached = await Pokemon.aget("pikachu")
+
+        mock_get.assert_not_called()
+        self.assertEqual(cached.pokemon_to_dict(), pokemon.pokemon_to_dict())
+        await get_async_redis_client().aclose()
+
+    async def test_async_retrieve_view_keeps_response_shape(self):
+        request = RequestFactory().get("/pokemon/pikachu/")
+        with patch(
+            "pokemon.models.make_async_conditional_request",
+            new=AsyncMock(return_value=(self.species, {})),
+        ):
+            response = await AsyncPokemonRetrieveView.as_view()(
+                request, pokemon_name="pikachu"
+            )
+
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(data), {"name", "description", "habitat", "isLegendary"}
+        )
+        self.assertEqual(data["name"], "pikachu")
+        self.assertEqual(data["description"], "A cute electric mouse")
+        await get_async_redis_client().aclose()
+
+    async def test_async_translate_view_returns_not_found(self):
+        request = RequestFactory().get("/pokemon/translated/missingno/")
+        with patch.object(
+            Pokemon, "aget_remote_pokemon", new=AsyncMock(return_value=None)
+        ):
+            response = await AsyncPokemonTranslateView.as_view()(
+                request, pokemon_name="missingno"
+            )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {"detail": "Pokemon not found"})
+        await get_async_redis_client().aclose()
+
+    async def test_async_views_answer_503_or_504_when_upstream_is_down(self):
+        for error, view, status in (
+            (httpx.ReadTimeout("too slow"), AsyncPokemonRetrieveView, 504),
+            (httpx.ConnectError("refused"), AsyncPokemonTranslateView, 503),
+        ):
+            request = RequestFactory().get("/pokemon/ditto/")
+            with patch(
+                "pokemon.models.make_async_conditional_request",
+                new=AsyncMock(side_effect=error),
+            ):
+                response = await view.as_view()(request, pokemon_name="ditto")
+
+            self.assertEqual(response.status_code, status)
+        await get_async_redis_client().aclose()
+
+
+class LocalCacheTest(APITestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = LocalCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_least_recently_used_entry_is_evicted_first(self):
+        self.cache.set("bulbasaur", 1)
+        self.cache.set("charmander", 2)
+        self.cache.get("bulbasaur")
+        self.cache.set("squirtle", 3)
+
+        self.assertEqual(self.cache.get("bulbasaur"), 1)
+        self.assertIsNone(self.cache.get("charmander"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("bulbasaur", 1)
+        self.now = 11
+        self.assertIsNone(self.cache.get("bulbasaur"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.set("bulbasaur", 1)
+        self.cache.get("bulbasaur")
+        self.cache.get("charmander")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_invalidation_from_other_process_evicts_entry(self):
+        invalidator = CacheInvalidator(self.cache, "test", RedisClient)
+        invalidator.origin = "me"
+        self.cache.set("bulbasaur", 1)
+        self.cache.set("charmander", 2)
+
+        invalidator.handle(b"me:bulbasaur")
+        invalidator.handle(b"someone-else:charmander")
+
+        self.assertEqual(self.cache.get("bulbasaur"), 1)
+        self.assertIsNone(self.cache.get("charmander"))
+
+    def test_get_serves_saved_pokemon_without_redis(self):
+        PokemonCache.clear()
+        pokemon = Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        )
+        pokemon.save()
+        with patch.object(RedisClient, "get") as mock_get:
+            cached = Pokemon.get("pikachu")
+
+        mock_get.assert_not_called()
+        self.assertIsNot(cached, pokemon)
+        self.assertEqual(cached.pokemon_to_dict(), pokemon.pokemon_to_dict())
+        RedisClient.delete(keys.species_key("pikachu"))
+        PokemonCache.clear()
+
+
+class SingleFlightTest(APITestCase):
+    def setUp(self):
+        self.flight = SingleFlight(
+            uuid.uuid4().hex, RedisClient, lease_ttl=2, wait_timeout=1
+        )
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(0.1)
+        return {"name": "pikachu"}
+
+    def test_concurrent_callers_share_one_call(self):
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.flight.do("pikachu", self.fetch))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"name": "pikachu"}] * 8)
+
+    def test_caller_uses_result_of_another_process(self):
+        RedisClient.set(self.flight.lease_key("pikachu"), "other", px=2000)
+        RedisClient.set(
+            self.flight.result_key("pikachu"), json.dumps({"name": "raichu"}), px=2000
+        )
+
+        self.assertEqual(self.flight.do("pikachu", self.fetch), {"name": "raichu"})
+        self.assertEqual(self.calls, 0)
+
+    def test_caller_fetches_itself_when_wait_times_out(self):
+        self.flight.wait_timeout = 0.2
+        RedisClient.set(self.flight.lease_key("pikachu"), "other", px=2000)
+
+        self.assertEqual(self.flight.do("pikachu", self.fetch), {"name": "pikachu"})
+        self.assertEqual(self.calls, 1)
+
+    def test_lease_is_released_after_the_call(self):
+        self.flight.do("pikachu", self.fetch)
+        self.assertFalse(RedisClient.exists(self.flight.lease_key("pikachu")))
+
+    def test_keys_follow_the_key_prefix(self):
+        self.assertTrue(
+            self.flight.lease_key("pikachu").startswith(f"{keys.prefix()}:flight:")
+        )
+        with override_settings(POKEMON_KEY_PREFIX="other"):
+            self.assertTrue(self.flight.result_key("pikachu").startswith("other:"))
+
+
+class PokemonPersistenceTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        self.pokemon = Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        )
+
+    def tearDown(self):
+        RedisClient.delete(keys.species_key("pikachu"), keys.translation_key("pikachu"))
+        PokemonCache.clear()
+
+    def test_new_pokemon_is_saved_with_species_ttl(self):
+        self.pokemon.save()
+        ttl = RedisClient.ttl(keys.species_key("pikachu"))
+        jitter = settings.POKEMON_SPECIES_TTL * settings.POKEMON_TTL_JITTER
+        self.assertGreaterEqual(ttl, settings.POKEMON_SPECIES_TTL - jitter - 1)
+        self.assertLessEqual(ttl, settings.POKEMON_SPECIES_TTL + jitter)
+        self.assertFalse(self.pokemon.has_changed)
+
+    def test_unchanged_pokemon_is_not_written_again(self):
+        self.pokemon.save()
+        PokemonCache.clear()
+        pokemon = Pokemon.get("pikachu")
+        with patch.object(RedisClient, "pipeline") as mock_pipeline:
+            pokemon.save()
+
+        mock_pipeline.assert_not_called()
+
+    def test_new_translation_is_saved_under_its_own_key(self):
+        self.pokemon.save()
+        RedisClient.persist(keys.species_key("pikachu"))
+        with patch.object(Pokemon, "get_translation", return_value="Cute mouse, hmm"):
+            self.pokemon.translate_description()
+        self.pokemon.save()
+
+        self.assertEqual(RedisClient.ttl(keys.species_key("pikachu")), -1)
+        self.assertGreater(RedisClient.ttl(keys.translation_key("pikachu")), 0)
+        PokemonCache.clear()
+        self.assertEqual(Pokemon.get("pikachu").translation, "Cute mouse, hmm")
+
+    def test_fresh_species_data_drops_stored_translation(self):
+        RedisClient.set(keys.translation_key("pikachu"), "Stale, hmm")
+        self.pokemon.save()
+        PokemonCache.clear()
+        self.assertIsNone(Pokemon.get("pikachu").translation)
+
+
+class StaleWhileRevalidateTest(APITestCase):
+    remote = {
+        "name": "pikachu",
+        "flavor_text_entries": [
+            {"flavor_text": "A cute electric mouse", "language": {"name": "en"}},
+        ],
+        "habitat": {"name": "grassland"},
+        "is_legendary": False,
+    }
+
+    def setUp(self):
+        PokemonCache.clear()
+
+    def tearDown(self):
+        RedisClient.delete(keys.species_key("pikachu"), keys.translation_key("pikachu"))
+        PokemonCache.clear()
+
+    def save_pokemon(self, age):
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+            translation="Cute mouse, hmm",
+            fetched_at=time.time() - age,
+        ).save()
+        PokemonCache.clear()
+
+    def test_fetch_time_is_stored_with_species_data(self):
+        self.save_pokemon(age=0)
+        stored = get_codec().decode(RedisClient.get(keys.species_key("pikachu")))
+        self.assertAlmostEqual(stored["fetched_at"], time.time(), delta=5)
+        self.assertEqual(Pokemon.get("pikachu").freshness, Pokemon.FRESH)
+
+    def test_fresh_pokemon_is_not_refreshed(self):
+        self.save_pokemon(age=0)
+        with patch.object(Pokemon, "schedule_refresh") as mock_schedule:
+            Pokemon.get("pikachu")
+        mock_schedule.assert_not_called()
+
+    def wait_for_refresh(self):
+        refreshed = threading.Event()
+        refresh = Pokemon.refresh.__func__
+
+        def wrapper(cls, pokemon):
+            try:
+                return refresh(cls, pokemon)
+            finally:
+                refreshed.set()
+
+        return refreshed, patch.object(Pokemon, "refresh", classmethod(wrapper))
+
+    def test_stale_pokemon_is_served_and_refreshed_in_background(self):
+        self.save_pokemon(age=settings.POKEMON_SOFT_TTL + 1)
+        refreshed, patch_refresh = self.wait_for_refresh()
+        with patch_refresh, patch.object(
+            Pokemon, "get_remote_pokemon", return_value=self.remote
+        ):
+            pokemon = Pokemon.get("pikachu")
+            self.assertTrue(refreshed.wait(5))
+
+        self.assertEqual(pokemon.habitat, "forest")
+        self.assertEqual(pokemon.freshness, Pokemon.STALE)
+        PokemonCache.clear()
+        pokemon = Pokemon.get("pikachu")
+        self.assertEqual(pokemon.habitat, "grassland")
+        self.assertEqual(pokemon.freshness, Pokemon.FRESH)
+        self.assertEqual(pokemon.translation, "Cute mouse, hmm")
+
+    def test_background_refresh_is_scheduled_once_per_name(self):
+        self.save_pokemon(age=settings.POKEMON_SOFT_TTL + 1)
+        started, release = threading.Event(), threading.Event()
+
+        def refresh(pokemon):
+            started.set()
+            release.wait(5)
+
+        with patch.object(Pokemon, "refresh", side_effect=refresh) as mock_refresh:
+            for _ in range(3):
+                Pokemon.get("pikachu")
+            self.assertTrue(started.wait(5))
+            release.set()
+
+        self.assertEqual(mock_refresh.call_count, 1)
+
+    def test_expired_pokemon_is_refetched_inline(self):
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        with patch.object(Pokemon, "get_remote_pokemon", return_value=self.remote):
+            pokemon = Pokemon.get("pikachu")
+
+        self.assertEqual(pokemon.habitat, "grassland")
+        self.assertEqual(pokemon.freshness, Pokemon.FRESH)
+        self.assertEqual(pokemon.translation, "Cute mouse, hmm")
+
+    def test_expired_pokemon_is_served_when_refetch_fails(self):
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        with patch.object(Pokemon, "get_remote_pokemon", return_value=None):
+            pokemon = Pokemon.get("pikachu")
+
+        self.assertEqual(pokemon.habitat, "forest")
+
+    def test_refresh_drops_translation_of_a_withdrawn_description(self):
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        remote = {
+            **self.remote,
+            "flavor_text_entries": [
+                {"flavor_text": "It stores electricity", "language": {"name": "en"}},
+            ],
+        }
+        with patch.object(Pokemon, "get_remote_pokemon", return_value=remote):
+            pokemon = Pokemon.get("pikachu")
+
+        self.assertEqual(pokemon.description, "It stores electricity")
+        self.assertIsNone(pokemon.translation)
+        self.assertFalse(RedisClient.exists(keys.translation_key("pikachu")))
+
+
+class UpstreamRevalidationTest(APITestCase):
+    remote = StaleWhileRevalidateTest.remote
+    validators = {"etag": '"v1"', "last_modified": "Sat, 01 Aug 2026 00:00:00 GMT"}
+
+    def setUp(self):
+        PokemonCache.clear()
+        RedisClient.delete(keys.refresh_stats_key())
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.translation_key("pikachu"),
+            keys.refresh_stats_key(),
+            *Pokemon.rendered_keys("pikachu", Pokemon.PLAIN),
+        )
+        PokemonCache.clear()
+
+    def save_pokemon(self, age):
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+            translation="Cute mouse, hmm",
+            fetched_at=time.time() - age,
+            validators=self.validators,
+        ).save()
+        PokemonCache.clear()
+
+    def upstream(self, status_code, body=None, headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = json.dumps(body).encode("utf-8") if body else b""
+        response.headers.update(headers or {})
+        return patch("pokemon.services.requests.Session.get", return_value=response)
+
+    def test_validators_are_stored_with_species(self):
+        headers = {"ETag": '"v1"', "Last-Modified": self.validators["last_modified"]}
+        with self.upstream(200, self.remote, headers):
+            Pokemon.get("pikachu").save()
+
+        stored = get_codec().decode(RedisClient.get(keys.species_key("pikachu")))
+        self.assertEqual(stored["validators"], self.validators)
+
+    def test_not_modified_refresh_only_moves_fetch_time(self):
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        Pokemon.save_rendered("pikachu", Pokemon.PLAIN, b"{}")
+        with self.upstream(304) as mock_get:
+            pokemon = Pokemon.get("pikachu")
+
+        self.assertEqual(
+            mock_get.call_args.kwargs["headers"],
+            {
+                "If-None-Match": '"v1"',
+                "If-Modified-Since": self.validators["last_modified"],
+            },
+        )
+        self.assertEqual(pokemon.freshness, Pokemon.FRESH)
+        PokemonCache.clear()
+        stored = Pokemon.get("pikachu")
+        self.assertEqual(stored.freshness, Pokemon.FRESH)
+        self.assertEqual(stored.habitat, "forest")
+        self.assertEqual(stored.translation, "Cute mouse, hmm")
+        self.assertEqual(stored.validators, self.validators)
+        self.assertEqual(Pokemon.get_rendered("pikachu", Pokemon.PLAIN), b"{}")
+
+    def test_refresh_outcomes_are_counted(self):
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        with self.upstream(304):
+            Pokemon.get("pikachu")
+        PokemonCache.clear()
+        self.save_pokemon(age=settings.POKEMON_HARD_TTL + 1)
+        with self.upstream(200, self.remote, {"ETag": '"v2"'}):
+            pokemon = Pokemon.get("pikachu")
+
+        self.assertEqual(pokemon.habitat, "grassland")
+        self.assertEqual(pokemon.validators, {"etag": '"v2"'})
+        self.assertEqual(
+            Pokemon.refresh_stats(),
+            {"refreshes": 2, "not_modified": 1, "not_modified_rate": 0.5},
+        )
+
+        out = io.StringIO()
+        call_command("refresh_status", "--reset", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["refreshes"], 0)
+
+
+class TranslationThrottlingTest(APITestCase):
+    def setUp(self):
+        name = f"test-{uuid.uuid4().hex}"
+        self.bucket = TokenBucket(name, RedisClient, rate=0.001, capacity=2)
+        self.breaker = CircuitBreaker(
+            name, RedisClient, failure_threshold=2, cooldown=30
+        )
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+
+    def tearDown(self):
+        self.bucket.reset()
+        self.breaker.reset()
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+
+    def mock_response(self, mock_get, status, headers=None):
+        response = mock_get.return_value
+        response.status_code = status
+        response.headers = headers or {}
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            response=response
+        )
+
+    def test_bucket_allows_capacity_then_refuses(self):
+        self.assertTrue(self.bucket.acquire())
+        self.assertTrue(self.bucket.acquire())
+        self.assertFalse(self.bucket.acquire())
+        self.assertLess(self.bucket.remaining(), 1)
+
+    def test_bucket_refills_over_time(self):
+        bucket = TokenBucket(self.bucket.name, RedisClient, rate=50, capacity=1)
+        self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire())
+        time.sleep(0.05)
+        self.assertTrue(bucket.acquire())
+
+    def test_key_prefix_separates_deployments(self):
+        self.assertTrue(self.bucket.acquire(2))
+        self.breaker.record_failure(trip=True)
+        with override_settings(POKEMON_KEY_PREFIX="other"):
+            breaker = CircuitBreaker(
+                self.breaker.name, RedisClient, failure_threshold=2, cooldown=30
+            )
+            try:
+                self.assertTrue(self.bucket.acquire())
+                self.assertTrue(breaker.allow())
+                self.assertTrue(self.bucket.key.startswith("other:"))
+            finally:
+                self.bucket.reset()
+                breaker.reset()
+
+    def test_breaker_opens_after_threshold_failures(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.status()["state"], CircuitBreaker.OPEN)
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+    def test_open_breaker_is_seen_by_other_workers(self):
+        self.breaker.record_failure(retry_after=120, trip=True)
+        other = CircuitBreaker(
+            self.breaker.name, RedisClient, failure_threshold=2, cooldown=30
+        )
+        self.assertFalse(other.allow())
+        self.assertGreater(other.status()["retry_in"], 30)
+
+    def test_rate_limited_translation_opens_breaker(self):
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            self.mock_response(mock_get, 429, {"Retry-After": "90"})
+            self.assertIsNone(Pokemon.request_translation("Hello", "yoda"))
+            mock_get.reset_mock()
+            self.assertIsNone(Pokemon.request_translation("Hello", "yoda"))
+
+        mock_get.assert_not_called()
+        self.assertEqual(TranslationBreaker.status()["state"], CircuitBreaker.OPEN)
+
+    def test_client_errors_do_not_open_breaker(self):
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            self.mock_response(mock_get, 400)
+            for _ in range(settings.POKEMON_TRANSLATION_BREAKER_THRESHOLD):
+                Pokemon.request_translation("Hello", "yoda")
+
+        self.assertEqual(TranslationBreaker.status()["failures"], 0)
+        self.assertTrue(TranslationBreaker.allow())
+
+    def test_exhausted_quota_skips_upstream(self):
+        with patch.object(TranslationQuota, "acquire", return_value=False):
+            with patch("pokemon.services.requests.Session.get") as mock_get:
+                self.assertIsNone(Pokemon.request_translation("Hello", "yoda"))
+
+        mock_get.assert_not_called()
+
+    def test_status_command_reports_quota_and_breaker(self):
+        TranslationBreaker.trip()
+        out = io.StringIO()
+        call_command("translation_status", stdout=out)
+        status = json.loads(out.getvalue())
+        self.assertEqual(status["breaker"]["state"], "open")
+        self.assertEqual(
+            status["quota"]["capacity"], settings.POKEMON_TRANSLATION_RATE_LIMIT
+        )
+
+        out = io.StringIO()
+        call_command("translation_status", "--reset", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["breaker"]["state"], "closed")
+
+
+class RenderedCacheTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        ).save()
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.translation_key("pikachu"),
+            keys.rendered_key("pikachu", Pokemon.PLAIN),
+            keys.rendered_key("pikachu", Pokemon.TRANSLATED),
+        )
+        PokemonCache.clear()
+
+    def test_rendered_body_is_served_without_building_pokemon(self):
+        with self.settings(POKEMON_RENDERED_CACHE=True):
+            first = self.client.get("/pokemon/pikachu/")
+            with patch.object(Pokemon, "get") as mock_get:
+                second = self.client.get("/pokemon/pikachu/")
+
+        mock_get.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(json.loads(second.content), first.data)
+
+    def test_rendered_body_is_not_used_when_disabled(self):
+        Pokemon.save_rendered("pikachu", Pokemon.PLAIN, b'{"name": "stale"}')
+        response = self.client.get("/pokemon/pikachu/")
+        self.assertEqual(response.data["name"], "pikachu")
+
+    def test_untranslated_fallback_is_not_stored(self):
+        with self.settings(POKEMON_RENDERED_CACHE=True):
+            with patch.object(Pokemon, "get_translation", return_value=None):
+                self.client.get("/pokemon/translated/pikachu/")
+
+        self.assertIsNone(Pokemon.get_rendered("pikachu", Pokemon.TRANSLATED))
+
+    def test_new_translation_drops_stored_body(self):
+        Pokemon.save_rendered("pikachu", Pokemon.TRANSLATED, b"{}")
+        pokemon = Pokemon.get("pikachu")
+        with patch.object(Pokemon, "get_translation", return_value="Cute, hmm"):
+            pokemon.translate_description()
+        pokemon.save()
+
+        self.assertIsNone(Pokemon.get_rendered("pikachu", Pokemon.TRANSLATED))
+
+
+class HttpCachingTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+        self.save_species("A cute electric mouse")
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.translation_key("pikachu"),
+            *(
+                key
+                for variant in (Pokemon.PLAIN, Pokemon.TRANSLATED)
+                for key in (
+                    keys.rendered_key("pikachu", variant),
+                    keys.etag_key("pikachu", variant),
+                )
+            ),
+            TranslationJobs.stream,
+            TranslationJobs.queued_key("pikachu"),
+        )
+        PokemonCache.clear()
+
+    def save_species(self, description):
+        Pokemon(
+            name="pikachu",
+            description=description,
+            habitat="forest",
+            isLegendary=False,
+        ).save()
+
+    @override_settings(
+        POKEMON_HTTP_MAX_AGE=60, POKEMON_HTTP_STALE_WHILE_REVALIDATE=600
+    )
+    def test_response_carries_etag_and_cache_control(self):
+        response = self.client.get("/pokemon/pikachu/")
+
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=60, stale-while-revalidate=600"
+        )
+        self.assertEqual(
+            response["ETag"].encode("utf-8"),
+            RedisClient.get(keys.etag_key("pikachu", Pokemon.PLAIN)),
+        )
+        self.assertEqual(response["ETag"], Pokemon.rendered_etag(response.content))
+
+    def test_matching_etag_is_answered_without_building_pokemon(self):
+        etag = self.client.get("/pokemon/pikachu/")["ETag"]
+
+        with patch.object(Pokemon, "get") as mock_get:
+            response = self.client.get(
+                "/pokemon/pikachu/", HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+            )
+
+        mock_get.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_changed_species_gets_a_new_etag(self):
+        etag = self.client.get("/pokemon/pikachu/")["ETag"]
+        self.save_species("It stores electricity")
+
+        response = self.client.get("/pokemon/pikachu/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_reads_do_not_write_rendered_variants(self):
+        etag = RedisClient.get(keys.etag_key("pikachu", Pokemon.PLAIN))
+        with patch.object(
+            Pokemon, "queue_save_rendered", wraps=Pokemon.queue_save_rendered
+        ) as queue_save_rendered:
+            for _ in range(3):
+                response = self.client.get(
+                    "/pokemon/pikachu/", HTTP_IF_NONE_MATCH='"other"'
+                )
+                self.assertEqual(response["ETag"].encode("utf-8"), etag)
+
+        queue_save_rendered.assert_not_called()
+
+    def test_stale_render_does_not_overwrite_newer_etag(self):
+        stale = self.client.get("/pokemon/pikachu/")
+        self.save_species("It stores electricity")
+        Pokemon.save_rendered(
+            "pikachu", Pokemon.PLAIN, stale.content, keep_body=False, only_missing=True
+        )
+
+        response = self.client.get(
+            "/pokemon/pikachu/", HTTP_IF_NONE_MATCH=stale["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["ETag"].encode("utf-8"),
+            RedisClient.get(keys.etag_key("pikachu", Pokemon.PLAIN)),
+        )
+
+    def test_expired_etag_is_stored_again(self):
+        RedisClient.delete(keys.etag_key("pikachu", Pokemon.PLAIN))
+        response = self.client.get("/pokemon/pikachu/", HTTP_IF_NONE_MATCH='"other"')
+
+        self.assertEqual(
+            response["ETag"].encode("utf-8"),
+            RedisClient.get(keys.etag_key("pikachu", Pokemon.PLAIN)),
+        )
+
+    @override_settings(POKEMON_HTTP_MAX_AGE=0)
+    def test_zero_max_age_asks_for_revalidation(self):
+        response = self.client.get("/pokemon/pikachu/")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+    def test_untranslated_fallback_is_not_cacheable(self):
+        with patch.object(Pokemon, "get_translation", return_value=None):
+            response = self.client.get("/pokemon/translated/pikachu/")
+
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertFalse(response.has_header("ETag"))
+        self.assertIsNone(RedisClient.get(keys.etag_key("pikachu", Pokemon.TRANSLATED)))
+
+    @override_settings(
+        POKEMON_TRANSLATION_MODE="queue", POKEMON_TRANSLATION_PENDING_STATUS=202
+    )
+    def test_pending_translation_is_not_cacheable(self):
+        response = self.client.get("/pokemon/translated/pikachu/")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+    async def test_async_view_answers_conditional_requests(self):
+        view = AsyncPokemonRetrieveView.as_view()
+        first = await view(
+            RequestFactory().get("/pokemon/pikachu/"), pokemon_name="pikachu"
+        )
+        second = await view(
+            RequestFactory().get(
+                "/pokemon/pikachu/", HTTP_IF_NONE_MATCH=first["ETag"]
+            ),
+            pokemon_name="pikachu",
+        )
+
+        self.assertEqual(first["ETag"], Pokemon.rendered_etag(first.content))
+        self.assertEqual(second.status_code, 304)
+        await get_async_redis_client().aclose()
+
+
+class CacheStorageTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        self.pokemon = Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        )
+
+    def tearDown(self):
+        RedisClient.delete(
+            "pikachu", keys.species_key("pikachu"), keys.translation_key("pikachu")
+        )
+        PokemonCache.clear()
+
+    def test_every_codec_round_trips_through_redis(self):
+        for codec in ("json", "msgpack", "hash"):
+            with self.subTest(codec=codec), self.settings(POKEMON_CACHE_CODEC=codec):
+                RedisClient.delete(keys.species_key("pikachu"))
+                Pokemon(**self.pokemon.pokemon_to_dict()).save()
+                PokemonCache.clear()
+                self.assertEqual(
+                    Pokemon.get("pikachu").pokemon_to_dict(),
+                    self.pokemon.pokemon_to_dict(),
+                )
+
+    def test_keys_are_namespaced_and_versioned(self):
+        self.assertEqual(keys.species_key("Pikachu"), "pdx:v2:species:pikachu")
+
+    def test_names_are_normalized(self):
+        self.pokemon.save()
+        PokemonCache.clear()
+        with patch.object(Pokemon, "fetch_pokemon") as mock_fetch:
+            pokemon = Pokemon.get("  PIKACHU ")
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(pokemon.name, "pikachu")
+
+    def test_migration_moves_legacy_entries(self):
+        RedisClient.set(
+            "pikachu",
+            json.dumps({**self.pokemon.pokemon_to_dict(), "translation": "Hmm"}),
+        )
+        call_command("migrate_pokedex_cache", stdout=io.StringIO())
+
+        self.assertFalse(RedisClient.exists("pikachu"))
+        pokemon = Pokemon.get("pikachu")
+        self.assertEqual(pokemon.description, "A cute electric mouse")
+        self.assertEqual(pokemon.translation, "Hmm")
+
+    def test_migration_only_removes_legacy_pokemon_keys(self):
+        RedisClient.set("pikachu", json.dumps(self.pokemon.pokemon_to_dict()))
+        RedisClient.set("pikachu:translation", "Hmm")
+        RedisClient.set("pikachu:body:plain", "{}")
+        unrelated = ["other:translation", "foo:body:x", "notpokemon", "session"]
+        RedisClient.set("other:translation", "kept")
+        RedisClient.set("foo:body:x", "kept")
+        RedisClient.set("notpokemon", "not json")
+        RedisClient.hset("session", "user", "ash")
+        self.addCleanup(RedisClient.delete, *unrelated)
+
+        call_command("migrate_pokedex_cache", stdout=io.StringIO())
+
+        self.assertEqual(
+            RedisClient.exists("pikachu", "pikachu:translation", "pikachu:body:plain"),
+            0,
+        )
+        self.assertEqual(RedisClient.exists(*unrelated), len(unrelated))
+
+    def test_migration_dry_run_changes_nothing(self):
+        RedisClient.set("pikachu", json.dumps(self.pokemon.pokemon_to_dict()))
+        self.addCleanup(RedisClient.delete, "pikachu")
+        out = io.StringIO()
+        call_command("migrate_pokedex_cache", dry_run=True, verbosity=2, stdout=out)
+
+        self.assertIn("pikachu -> ", out.getvalue())
+        self.assertIn("migrated: 1", out.getvalue())
+        self.assertTrue(RedisClient.exists("pikachu"))
+        self.assertFalse(RedisClient.exists(keys.species_key("pikachu")))
+
+    def test_migration_re_encodes_entries_with_current_codec(self):
+        self.pokemon.save()
+        with self.settings(POKEMON_CACHE_CODEC="hash"):
+            call_command(
+                "migrate_pokedex_cache", from_codec="json", stdout=io.StringIO()
+            )
+            PokemonCache.clear()
+            self.assertEqual(RedisClient.type(keys.species_key("pikachu")), b"hash")
+            self.assertEqual(Pokemon.get("pikachu").description, "A cute electric mouse")
+
+
+class TranslationStoreTest(APITestCase):
+    text = "A cute\x0celectric  mouse."
+
+    def setUp(self):
+        self.store = TranslationStore(RedisClient, ttl=100)
+        self.tearDown()
+
+    def tearDown(self):
+        for translation_type in ("yoda", "shakespeare"):
+            RedisClient.delete(keys.translation_text_key(translation_type, self.text))
+        self.store.reset_stats()
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+
+    def test_lookups_are_counted(self):
+        self.assertIsNone(self.store.get("yoda", self.text))
+        self.store.set("yoda", self.text, "Cute, hmm")
+        self.assertEqual(self.store.get("yoda", self.text), "Cute, hmm")
+
+        stats = self.store.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stored"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_entries_are_shared_by_equal_texts_of_one_type(self):
+        self.store.set("yoda", self.text, "Cute, hmm")
+        self.assertEqual(self.store.get("yoda", "A cute electric mouse."), "Cute, hmm")
+        self.assertIsNone(self.store.get("shakespeare", self.text))
+
+    def test_reads_extend_expiry(self):
+        self.store.set("yoda", self.text, "Cute, hmm")
+        key = keys.translation_text_key("yoda", self.text)
+        RedisClient.expire(key, 5)
+        self.store.get("yoda", self.text)
+        self.assertGreater(RedisClient.ttl(key), 90)
+
+    def test_zero_ttl_never_expires(self):
+        store = TranslationStore(RedisClient, ttl=0)
+        store.set("yoda", self.text, "Cute, hmm")
+        key = keys.translation_text_key("yoda", self.text)
+        self.assertEqual(RedisClient.ttl(key), -1)
+        RedisClient.expire(key, 5)
+        self.assertEqual(store.get("yoda", self.text), "Cute, hmm")
+        self.assertEqual(store.get("yoda", self.text), "Cute, hmm")
+        self.assertEqual(RedisClient.ttl(key), -1)
+
+    def test_stored_translation_skips_upstream(self):
+        TranslationTexts.set("yoda", self.text, "Cute, hmm")
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            self.assertEqual(Pokemon.get_translation(self.text, "yoda"), "Cute, hmm")
+
+        mock_get.assert_not_called()
+
+    def test_upstream_translation_is_stored(self):
+        with patch.object(Pokemon, "request_translation", return_value="Cute, hmm"):
+            Pokemon.get_translation(self.text, "yoda")
+        with patch.object(Pokemon, "request_translation") as mock_request:
+            self.assertEqual(Pokemon.get_translation(self.text, "yoda"), "Cute, hmm")
+
+        mock_request.assert_not_called()
+
+    def test_failed_translation_is_not_stored(self):
+        with patch.object(Pokemon, "request_translation", return_value=None):
+            Pokemon.get_translation(self.text, "shakespeare")
+        self.assertIsNone(TranslationTexts.get("shakespeare", self.text))
+
+
+class TranslationQueueTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        TranslationQuota.reset()
+        TranslationBreaker.reset()
+        RedisClient.delete(TranslationJobs.stream, TranslationJobs.queued_key("pikachu"))
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        ).save()
+        PokemonCache.clear()
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.translation_key("pikachu"),
+            TranslationJobs.stream,
+            TranslationJobs.queued_key("pikachu"),
+        )
+        PokemonCache.clear()
+
+    def work(self):
+        call_command("translation_worker", "--once", stdout=io.StringIO())
+
+    @override_settings(POKEMON_TRANSLATION_MODE="queue")
+    def test_missing_translation_is_queued_once(self):
+        with patch.object(Pokemon, "get_translation") as mock_translation:
+            for _ in range(2):
+                response = self.client.get("/pokemon/translated/pikachu/")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data["description"], "A cute electric mouse")
+
+        mock_translation.assert_not_called()
+        self.assertEqual(TranslationJobs.stats()["depth"], 1)
+
+    @override_settings(
+        POKEMON_TRANSLATION_MODE="queue", POKEMON_TRANSLATION_PENDING_STATUS=202
+    )
+    def test_pending_translation_can_answer_accepted(self):
+        response = self.client.get("/pokemon/translated/pikachu/")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            response["Retry-After"], str(settings.POKEMON_TRANSLATION_RETRY_AFTER)
+        )
+
+    @override_settings(POKEMON_TRANSLATION_MODE="queue")
+    def test_worker_stores_translation_and_acks(self):
+        self.client.get("/pokemon/translated/pikachu/")
+        with patch.object(Pokemon, "get_translation", return_value="Cute, hmm"):
+            self.work()
+
+        self.assertEqual(TranslationJobs.stats()["depth"], 0)
+        self.assertFalse(RedisClient.exists(TranslationJobs.queued_key("pikachu")))
+        PokemonCache.clear()
+        response = self.client.get("/pokemon/translated/pikachu/")
+        self.assertEqual(response.data["description"], "Cute, hmm")
+
+    def test_failed_job_stays_pending(self):
+        Pokemon.get("pikachu").enqueue_translation()
+        with patch.object(Pokemon, "translate_and_save", side_effect=ValueError):
+            call_command(
+                "translation_worker", "--once", stdout=io.StringIO(), stderr=io.StringIO()
+            )
+
+        stats = TranslationJobs.stats()
+        self.assertEqual(stats["depth"], 1)
+        self.assertEqual(stats["pending"], 1)
+        self.assertEqual(stats["lag"], 0)
+
+    def test_once_does_not_block_on_an_empty_queue(self):
+        with patch.object(
+            RedisClient, "xreadgroup", wraps=RedisClient.xreadgroup
+        ) as mock_read:
+            self.work()
+
+        # BLOCK 0 would wait forever for a job.
+        self.assertIsNone(mock_read.call_args.kwargs["block"])
+
+    def test_job_without_translation_is_retried_then_dropped(self):
+        Pokemon.get("pikachu").enqueue_translation()
+        with patch.object(Pokemon, "get_translation", return_value=None):
+            call_command(
+                "translation_worker",
+                "--once",
+                stdout=io.StringIO(),
+                stderr=io.StringIO(),
+            )
+            self.assertEqual(TranslationJobs.stats()["pending"], 1)
+            self.assertTrue(RedisClient.exists(TranslationJobs.queued_key("pikachu")))
+
+            call_command(
+                "translation_worker",
+                "--once",
+                "--reclaim-after=0",
+                "--max-attempts=2",
+                stdout=io.StringIO(),
+                stderr=io.StringIO(),
+            )
+
+        self.assertEqual(TranslationJobs.stats()["depth"], 0)
+        self.assertFalse(RedisClient.exists(TranslationJobs.queued_key("pikachu")))
+
+    def test_failed_enqueue_leaves_no_marker(self):
+        RedisClient.set(TranslationJobs.stream, "not a stream")
+        with self.assertRaises(redis.ResponseError):
+            TranslationJobs.enqueue("pikachu")
+
+        self.assertFalse(RedisClient.exists(TranslationJobs.queued_key("pikachu")))
+
+    def test_stats_report_depth_and_age_of_waiting_jobs(self):
+        Pokemon.get("pikachu").enqueue_translation()
+        time.sleep(0.01)
+        stats = TranslationJobs.stats()
+        self.assertEqual(stats["depth"], 1)
+        self.assertEqual(stats["lag"], 1)
+        self.assertGreater(stats["oldest_age"], 0)
+
+
+class PokemonBulkViewTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        ).save()
+        PokemonCache.clear()
+
+    def tearDown(self):
+        for name in ("pikachu", "bulbasaur"):
+            RedisClient.delete(keys.species_key(name), keys.translation_key(name))
+        PokemonCache.clear()
+
+    def fetch(self, name):
+        if name != "bulbasaur":
+            return None
+        return Pokemon(
+            name="bulbasaur",
+            description="A strange seed",
+            habitat="grassland",
+            isLegendary=False,
+        )
+
+    def test_bulk_lookup_returns_hits_misses_and_errors(self):
+        with patch.object(Pokemon, "fetch_pokemon", side_effect=self.fetch):
+            response = self.client.get("/pokemon/?names=pikachu,Bulbasaur,missingno")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [pokemon["name"] for pokemon in response.data["results"]],
+            ["pikachu", "bulbasaur"],
+        )
+        self.assertEqual(response.data["errors"], {"missingno": "Pokemon not found"})
+        self.assertTrue(RedisClient.exists(keys.species_key("bulbasaur")))
+
+    def test_bulk_lookup_reads_cached_entries_in_one_round_trip(self):
+        with patch.object(Pokemon, "fetch_pokemon", side_effect=self.fetch):
+            Pokemon.get_many(["bulbasaur"])
+        PokemonCache.clear()
+
+        with patch.object(RedisClient, "pipeline", wraps=RedisClient.pipeline) as pipe:
+            pokemons, errors = Pokemon.get_many(["pikachu", "bulbasaur"])
+
+        self.assertEqual(pipe.call_count, 1)
+        self.assertEqual(set(pokemons), {"pikachu", "bulbasaur"})
+        self.assertEqual(errors, {})
+
+    def test_bulk_lookup_can_translate(self):
+        with patch.object(Pokemon, "get_translation", return_value="Cute, hmm"):
+            response = self.client.post(
+                "/pokemon/", {"names": ["pikachu"], "translated": True}, format="json"
+            )
+
+        self.assertEqual(response.data["results"][0]["description"], "Cute, hmm")
+        self.assertEqual(response.data["results"][0]["translation"], "Shakespeare")
+
+    @override_settings(
+        POKEMON_TRANSLATION_MODE="queue", POKEMON_TRANSLATION_PENDING_STATUS=202
+    )
+    def test_bulk_lookup_queues_missing_translations(self):
+        RedisClient.delete(TranslationJobs.stream, TranslationJobs.queued_key("pikachu"))
+        try:
+            with patch.object(Pokemon, "get_translation") as mock_translation:
+                response = self.client.get("/pokemon/?names=pikachu&translated=1")
+
+            mock_translation.assert_not_called()
+            self.assertEqual(response.data["results"], [])
+            self.assertEqual(response.data["pending"], ["pikachu"])
+            self.assertEqual(TranslationJobs.stats()["depth"], 1)
+        finally:
+            RedisClient.delete(
+                TranslationJobs.stream, TranslationJobs.queued_key("pikachu")
+            )
+
+    def test_bulk_lookup_rejects_empty_and_oversized_requests(self):
+        self.assertEqual(self.client.get("/pokemon/").status_code, 400)
+        with self.settings(POKEMON_BULK_MAX_NAMES=1):
+            response = self.client.get("/pokemon/?names=pikachu,bulbasaur")
+        self.assertEqual(response.status_code, 400)
+
+
+class WarmPokedexCommandTest(APITestCase):
+    names = ["bulbasaur", "ivysaur", "venusaur"]
+
+    def setUp(self):
+        self.checkpoint = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+        self.addCleanup(os.remove, self.checkpoint)
+
+    def tearDown(self):
+        for name in self.names:
+            RedisClient.delete(keys.species_key(name))
+        PokemonCache.clear()
+
+    def listing(self, url, params):
+        offset, limit = params["offset"], params["limit"]
+        return {
+            "count": len(self.names),
+            "results": [{"name": name} for name in self.names[offset : offset + limit]],
+        }
+
+    def species(self, name):
+        if name == "ivysaur":
+            return None
+        return {
+            "name": name,
+            "flavor_text_entries": [
+                {"language": {"name": "en"}, "flavor_text": f"{name} text"}
+            ],
+            "habitat": {"name": "grassland"},
+            "is_legendary": False,
+        }
+
+    def warm(self, **options):
+        with patch(
+            "pokemon.species.make_request",
+            side_effect=self.listing,
+        ), patch.object(
+            Pokemon, "get_remote_pokemon", side_effect=self.species
+        ) as mock_remote:
+            call_command(
+                "warm_pokedex",
+                page_size=2,
+                rate=0,
+                checkpoint=self.checkpoint,
+                stdout=io.StringIO(),
+                **options,
+            )
+        return mock_remote
+
+    def test_warm_up_caches_species_and_records_failures(self):
+        self.warm(restart=True)
+
+        self.assertEqual(Pokemon.get("bulbasaur").description, "bulbasaur text")
+        self.assertTrue(RedisClient.exists(keys.species_key("venusaur")))
+        with open(self.checkpoint) as checkpoint:
+            state = json.load(checkpoint)
+        self.assertEqual(state["offset"], 3)
+        self.assertEqual(state["failures"], {"ivysaur": "Pokemon not found"})
+
+    def test_warm_up_skips_cached_species_and_resumes(self):
+        self.warm(restart=True)
+        mock_remote = self.warm(restart=True)
+        self.assertEqual(
+            [call.args[0] for call in mock_remote.call_args_list], ["ivysaur"]
+        )
+
+        mock_remote = self.warm()
+        mock_remote.assert_not_called()
+
+
+class SpeciesLookupTest(APITestCase):
+    def setUp(self):
+        PokemonCache.clear()
+        self.snapshot = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+        self.addCleanup(os.remove, self.snapshot)
+        write_snapshot(self.snapshot, ["Pikachu", "bulbasaur"])
+        self.now = 0
+        self.index = SpeciesIndex(self.snapshot, 60, clock=lambda: self.now)
+
+    def tearDown(self):
+        for name in ("pikachu", "missingno"):
+            RedisClient.delete(keys.species_key(name), keys.missing_key(name))
+        PokemonCache.clear()
+
+    def mock_not_found(self, mock_get):
+        response = mock_get.return_value
+        response.status_code = 404
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            response=response
+        )
+
+    def test_not_found_is_remembered(self):
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            self.mock_not_found(mock_get)
+            self.assertIsNone(Pokemon.get("missingno"))
+            self.assertIsNone(Pokemon.get("missingno"))
+
+        self.assertEqual(mock_get.call_count, 1)
+        ttl = RedisClient.ttl(keys.missing_key("missingno"))
+        self.assertTrue(0 < ttl <= settings.POKEMON_NEGATIVE_TTL)
+
+    def test_saving_species_forgets_it_was_missing(self):
+        RedisClient.set(keys.missing_key("pikachu"), 1)
+        Pokemon(
+            name="pikachu",
+            description="A cute electric mouse",
+            habitat="forest",
+            isLegendary=False,
+        ).save()
+        PokemonCache.clear()
+        self.assertIsNotNone(Pokemon.get("pikachu"))
+
+    def test_index_rejects_unknown_names_without_io(self):
+        metrics.reset()
+        with patch("pokemon.models.SpeciesNames", self.index):
+            with patch.object(RedisClient, "pipeline") as mock_pipeline:
+                self.assertIsNone(Pokemon.get("not-a-pokemon"))
+                response = self.client.get("/pokemon/not-a-pokemon/")
+
+        mock_pipeline.assert_not_called()
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.index.stats(), {"loaded": True, "size": 2})
+        self.assertIn(
+            'pokedex_cache_lookups_total{layer="index",result="rejected"} 2',
+            metrics.render().splitlines(),
+        )
+        metrics.reset()
+
+    def test_index_allows_known_names_and_ids(self):
+        self.assertTrue(self.index.allows("pikachu"))
+        self.assertTrue(self.index.allows("25"))
+        self.assertFalse(self.index.allows("raichu"))
+
+    def test_index_picks_up_rebuilt_snapshot(self):
+        self.assertFalse(self.index.allows("raichu"))
+        write_snapshot(self.snapshot, ["pikachu", "raichu"])
+        os.utime(self.snapshot, ns=(0, time.time_ns() + 10**9))
+        self.assertFalse(self.index.allows("raichu"))
+        self.now = 61
+        self.assertTrue(self.index.allows("raichu"))
+
+    def test_missing_snapshot_allows_every_name(self):
+        index = SpeciesIndex(self.snapshot + ".absent", 60)
+        self.assertTrue(index.allows("anything"))
+
+    def test_bulk_lookup_reports_rejected_names(self):
+        with patch("pokemon.models.SpeciesNames", self.index):
+            pokemons, errors = Pokemon.get_many(["not-a-pokemon"])
+
+        self.assertEqual(pokemons, {})
+        self.assertEqual(errors, {"not-a-pokemon": "Pokemon not found"})
+
+    def test_build_command_snapshots_listing(self):
+        listing = {"count": 2, "results": [{"name": "pikachu"}, {"name": "raichu"}]}
+        with patch("pokemon.species.make_request", return_value=listing):
+            call_command(
+                "build_species_index", output=self.snapshot, stdout=io.StringIO()
+            )
+
+        with open(self.snapshot) as f:
+            self.assertEqual(json.load(f)["names"], ["pikachu", "raichu"])
+
+
+class SpeciesPackTest(APITestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.pack = os.path.join(self.source, "species.pack")
+        for index, name in enumerate(["pikachu", "zubat"], start=25):
+            os.makedirs(os.path.join(self.source, str(index)))
+            with open(os.path.join(self.source, str(index), "index.json"), "w") as f:
+                json.dump(self.document(index, name), f)
+        with open(os.path.join(self.source, "notes.json"), "w") as f:
+            json.dump({"unrelated": True}, f)
+
+    @staticmethod
+    def document(index, name):
+        return {
+            "id": index,
+            "name": name,
+            "flavor_text_entries": [
+                {"flavor_text": f"{name} text", "language": {"name": "en"}},
+                {"flavor_text": f"{name} texte", "language": {"name": "fr"}},
+            ],
+            "genera": [{"genus": "Mouse Pokemon", "language": {"name": "en"}}],
+            "habitat": {"name": "forest", "url": "https://pokeapi.co/"},
+            "is_legendary": False,
+        }
+
+    def build(self):
+        out = io.StringIO()
+        call_command("build_species_pack", self.source, output=self.pack, stdout=out)
+        return out.getvalue()
+
+    def test_pack_keeps_only_needed_fields(self):
+        self.assertIn("Packed 2 species", self.build())
+        pack = SpeciesPack(self.pack)
+        self.addCleanup(pack.close)
+
+        self.assertEqual(
+            pack.get("Pikachu"),
+            {
+                "id": 25,
+                "name": "pikachu",
+                "flavor_text_entries": [
+                    {"flavor_text": "pikachu text", "language": {"name": "en"}},
+                    {"flavor_text": "pikachu texte", "language": {"name": "fr"}},
+                ],
+                "habitat": {"name": "forest"},
+                "is_legendary": False,
+            },
+        )
+
+    def test_pack_looks_up_names_and_ids(self):
+        self.build()
+        pack = SpeciesPack(self.pack)
+        self.addCleanup(pack.close)
+
+        self.assertEqual(pack.get("26")["name"], "zubat")
+        self.assertIsNone(pack.get("raichu"))
+
+    def test_pack_data_source_skips_network(self):
+        self.build()
+        with override_settings(
+            POKEMON_DATA_SOURCE="pack", POKEMON_SPECIES_PACK=self.pack
+        ):
+            self.addCleanup(get_species_pack(self.pack).close)
+            with patch("pokemon.services.requests.Session.get") as mock_get:
+                pokemon = Pokemon.create_pokemon_from_remote("zubat")
+                missing = Pokemon.get_remote_pokemon("raichu")
+
+        mock_get.assert_not_called()
+        self.assertEqual(pokemon.description, "zubat text")
+        self.assertEqual(pokemon.habitat, "forest")
+        self.assertIsNone(missing)
+
+    def test_empty_source_keeps_existing_pack(self):
+        self.build()
+        empty = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, empty)
+        with self.assertRaises(CommandError):
+            call_command("build_species_pack", empty, output=self.pack)
+        pack = SpeciesPack(self.pack)
+        self.addCleanup(pack.close)
+        self.assertEqual(pack.get("pikachu")["id"], 25)
+
+
+class SpeciesProjectionTest(APITestCase):
+    document = {
+        "id": 25,
+        "name": "pikachu",
+        "flavor_text_entries": [
+            {
+                "flavor_text": "A cute electric mouse",
+                "language": {"name": "en", "url": "https://pokeapi.co/lang/9/"},
+                "version": {"name": "red", "url": "https://pokeapi.co/version/1/"},
+            },
+            {
+                "flavor_text": "Une souris",
+                "language": {"name": "fr", "url": "https://pokeapi.co/lang/5/"},
+                "version": {"name": "red", "url": "https://pokeapi.co/version/1/"},
+            },
+            {
+                "flavor_text": "It stores electricity",
+                "language": {"name": "en", "url": "https://pokeapi.co/lang/9/"},
+                "version": {"name": "blue", "url": "https://pokeapi.co/version/2/"},
+            },
+        ],
+        "genera": [{"genus": "Mouse Pokemon", "language": {"name": "en"}}],
+        "habitat": {"name": "forest", "url": "https://pokeapi.co/habitat/2/"},
+        "is_legendary": False,
+    }
+
+    def tearDown(self):
+        RedisClient.delete(keys.species_key("pikachu"))
+        PokemonCache.clear()
+
+    def test_decoder_keeps_only_needed_fields(self):
+        self.assertEqual(
+            loads_species(json.dumps(self.document)),
+            {
+                "id": 25,
+                "name": "pikachu",
+                "flavor_text_entries": [
+                    {
+                        "flavor_text": "A cute electric mouse",
+                        "language": {"name": "en"},
+                    },
+                    {
+                        "flavor_text": "Une souris",
+                        "language": {"name": "fr"},
+                    },
+                    {
+                        "flavor_text": "It stores electricity",
+                        "language": {"name": "en"},
+                    },
+                ],
+                "habitat": {"name": "forest"},
+                "is_legendary": False,
+            },
+        )
+
+    def test_remote_species_keeps_every_language(self):
+        raw = json.dumps(self.document)
+        with patch("pokemon.services.requests.Session.get") as mock_get:
+            mock_get.return_value.json.side_effect = lambda **kwargs: json.loads(
+                raw, **kwargs
+            )
+            details = Pokemon.get_remote_pokemon("pikachu")
+
+        hook = mock_get.return_value.json.call_args.kwargs.get("object_pairs_hook")
+        self.assertIsNone(hook)
+        pokemon = Pokemon.create_pokemon(details)
+        self.assertEqual(pokemon.flavor_texts["fr"], ["Une souris"])
+        self.assertEqual(len(pokemon.descriptions), 2)
+
+    def test_english_descriptions_are_stored_with_species(self):
+        pokemon = Pokemon.create_pokemon(loads_species(json.dumps(self.document)))
+        pokemon.save()
+        PokemonCache.clear()
+
+        stored = Pokemon.get("pikachu")
+        self.assertEqual(
+            stored.descriptions, ["A cute electric mouse", "It stores electricity"]
+        )
+        self.assertIn(stored.description, stored.descriptions)
+
+    def test_descriptions_stored_before_language_index_still_load(self):
+        pokemon = Pokemon.from_dict(
+            {
+                "name": "pikachu",
+                "description": "A cute electric mouse",
+                "habitat": "forest",
+                "isLegendary": False,
+                "fetched_at": time.time(),
+                "descriptions": ["A cute electric mouse"],
+            }
+        )
+        self.assertEqual(pokemon.flavor_texts, {"en": ["A cute electric mouse"]})
+
+
+class DescriptionLanguageTest(APITestCase):
+    document = SpeciesProjectionTest.document
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.rendered_key("pikachu", Pokemon.PLAIN),
+            keys.rendered_key("pikachu", "plain:fr"),
+            keys.etag_key("pikachu", Pokemon.PLAIN),
+            keys.etag_key("pikachu", "plain:fr"),
+        )
+        PokemonCache.clear()
+
+    def save_species(self):
+        pokemon = Pokemon.create_pokemon(loads_species(json.dumps(self.document)))
+        pokemon.save()
+        return pokemon
+
+    def test_flavor_texts_are_indexed_by_language_once(self):
+        entries = self.document["flavor_text_entries"] + [
+            {"flavor_text": "A cute\nelectric  mouse", "language": {"name": "EN"}}
+        ]
+        self.assertEqual(
+            flavor_text_index(entries),
+            {
+                "en": ["A cute electric mouse", "It stores electricity"],
+                "fr": ["Une souris"],
+            },
+        )
+
+    def test_policies_pick_deterministically_unless_random(self):
+        texts = ["red", "blue", "sword"]
+        self.assertEqual(select_description(texts, "latest"), "sword")
+        self.assertEqual(select_description(texts, "earliest"), "red")
+        self.assertIn(select_description(texts, "random"), texts)
+        self.assertIsNone(select_description([], "latest"))
+
+    @override_settings(POKEMON_DESCRIPTION_POLICY="latest")
+    def test_default_policy_serves_the_same_description_every_time(self):
+        descriptions = {
+            Pokemon.create_pokemon(loads_species(json.dumps(self.document))).description
+            for _ in range(10)
+        }
+        self.assertEqual(descriptions, {"It stores electricity"})
+
+    def test_lang_parameter_selects_description_language(self):
+        self.save_species()
+        url = "/pokemon/pikachu/"
+
+        response = self.client.get(url, {"lang": "FR"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["description"], "Une souris")
+
+        response = self.client.get(url, {"lang": "de"})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(url, {"lang": "fr;drop"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(POKEMON_RENDERED_CACHE=True)
+    def test_languages_are_rendered_separately(self):
+        self.save_species()
+        url = "/pokemon/pikachu/"
+
+        self.client.get(url)
+        self.client.get(url, {"lang": "fr"})
+        self.client.get(url, {"lang": "de"})
+
+        self.assertIn(
+            b"It stores electricity", Pokemon.get_rendered("pikachu", Pokemon.PLAIN)
+        )
+        self.assertIn(b"Une souris", Pokemon.get_rendered("pikachu", "plain:fr"))
+        self.assertIsNone(Pokemon.get_rendered("pikachu", "plain:de"))
+        self.assertEqual(
+            self.client.get(url, {"lang": "fr"}).json()["description"], "Une souris"
+        )
+
+    def test_other_languages_are_rendered_on_first_request(self):
+        self.save_species()
+        self.assertTrue(RedisClient.exists(keys.etag_key("pikachu", Pokemon.PLAIN)))
+        self.assertFalse(RedisClient.exists(keys.etag_key("pikachu", "plain:fr")))
+
+        response = self.client.get(
+            "/pokemon/pikachu/", {"lang": "fr"}, HTTP_IF_NONE_MATCH='"other"'
+        )
+
+        self.assertEqual(
+            response["ETag"].encode("utf-8"),
+            RedisClient.get(keys.etag_key("pikachu", "plain:fr")),
+        )
+
+
+class MetricsTest(APITestCase):
+    def setUp(self):
+        metrics.reset()
+        PokemonCache.clear()
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.etag_key("pikachu", Pokemon.PLAIN),
+            keys.missing_key("unknownmon"),
+        )
+        PokemonCache.clear()
+        metrics.reset()
+
+    def test_histograms_render_cumulative_buckets(self):
+        metrics.observe("pokedex_span_seconds", 0.003, span="test")
+        metrics.observe("pokedex_span_seconds", 0.2, span="test")
+        metrics.observe("pokedex_span_seconds", 60, span="test")
+
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE pokedex_span_seconds histogram", lines)
+        series = [line for line in lines if 'span="test"' in line]
+        self.assertEqual(
+            series[0], 'pokedex_span_seconds_bucket{span="test",le="0.001"} 0'
+        )
+        self.assertIn('pokedex_span_seconds_bucket{span="test",le="0.005"} 1', series)
+        self.assertIn('pokedex_span_seconds_bucket{span="test",le="0.25"} 2', series)
+        self.assertIn('pokedex_span_seconds_bucket{span="test",le="10"} 2', series)
+        self.assertIn('pokedex_span_seconds_bucket{span="test",le="+Inf"} 3', series)
+        self.assertEqual(series[-1], 'pokedex_span_seconds_sum{span="test"} 60.203')
+        self.assertEqual(series[-2], 'pokedex_span_seconds_count{span="test"} 3')
+
+    def test_workers_add_up(self):
+        workers = [Metrics(RedisClient), Metrics(RedisClient)]
+        for count, worker in enumerate(workers, start=1):
+            worker.inc("pokedex_responses_total", count, view="test", status=200)
+            worker.flush()
+
+        self.assertIn(
+            'pokedex_responses_total{status="200",view="test"} 3',
+            metrics.render().splitlines(),
+        )
+
+    def test_forked_worker_drops_parent_buffer(self):
+        worker = Metrics(RedisClient)
+        worker.inc("pokedex_responses_total", view="test", status=200)
+        worker._pid = -1
+        worker.inc("pokedex_responses_total", view="test", status=404)
+        worker.flush()
+
+        lines = metrics.render().splitlines()
+        self.assertIn('pokedex_responses_total{status="404",view="test"} 1', lines)
+        self.assertNotIn('pokedex_responses_total{status="200",view="test"} 1', lines)
+
+    def test_failed_flush_keeps_samples(self):
+        worker = Metrics(RedisClient)
+        worker.inc("pokedex_responses_total", view="test", status=200)
+        failure = redis.ConnectionError("down")
+        with patch("redis.client.Pipeline.execute", side_effect=failure):
+            worker.flush()
+        worker.flush()
+
+        self.assertIn(
+            'pokedex_responses_total{status="200",view="test"} 1',
+            metrics.render().splitlines(),
+        )
+
+    def test_endpoint_reports_requests_and_lookups(self):
+        Pokemon(
+            name="pikachu", description="A mouse", habitat="forest", isLegendary=False
+        ).save()
+        PokemonCache.clear()
+        self.client.get("/pokemon/pikachu/")
+        self.client.get("/pokemon/pikachu/")
+        missing = requests.Response()
+        missing.status_code = 404
+        with patch("pokemon.services.requests.Session.get", return_value=missing):
+            self.client.get("/pokemon/unknownmon/")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        lines = response.content.decode("utf-8").splitlines()
+        for line in (
+            'pokedex_responses_total{status="200",view="pokemon-retrieve"} 2',
+            'pokedex_responses_total{status="404",view="pokemon-retrieve"} 1',
+            'pokedex_span_seconds_count{span="Pokemon.get"} 3',
+            'pokedex_span_seconds_count{span="Pokemon.get_remote_pokemon"} 1',
+            'pokedex_span_seconds_count{span="Pokemon.serialize"} 3',
+            'pokedex_span_seconds_count{span="view.pokemon-retrieve"} 3',
+            'pokedex_cache_lookups_total{layer="local",result="hit"} 1',
+            'pokedex_cache_lookups_total{layer="local",result="miss"} 2',
+            'pokedex_cache_lookups_total{layer="redis",result="hit"} 1',
+            'pokedex_cache_lookups_total{layer="redis",result="miss"} 1',
+            'pokedex_upstream_responses_total{host="pokeapi.co",status="404"} 1',
+            "# TYPE pokedex_translation_circuit_open gauge",
+            "pokedex_translation_circuit_open 0",
+        ):
+            self.assertIn(line, lines)
+        for span in ("serializer.validate", "renderer.render"):
+            count = f'pokedex_span_seconds_count{{span="{span}"}} '
+            self.assertTrue(any(line.startswith(count) for line in lines), span)
+
+
+class LoggingTest(APITestCase):
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"),
+            keys.etag_key("pikachu", Pokemon.PLAIN),
+            keys.missing_key("unknownmon"),
+        )
+        PokemonCache.clear()
+
+    def test_sampling_keeps_warnings(self):
+        sample = SampleFilter(rate=0)
+        record = logging.LogRecord("pokemon", logging.INFO, "", 0, "chatty", (), None)
+        self.assertFalse(sample.filter(record))
+        record.levelno = logging.WARNING
+        self.assertTrue(sample.filter(record))
+        self.assertTrue(SampleFilter(rate=1).filter(record))
+
+    def test_access_log_has_one_line_per_request_with_timings(self):
+        Pokemon(
+            name="pikachu", description="A mouse", habitat="forest", isLegendary=False
+        ).save()
+        with self.assertLogs("pokemon.access", "INFO") as logs:
+            self.client.get("/pokemon/pikachu/?lang=en")
+
+        self.assertEqual(len(logs.records), 1)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["method"], "GET")
+        self.assertEqual(entry["path"], "/pokemon/pikachu/?lang=en")
+        self.assertEqual(entry["view"], "pokemon-retrieve")
+        self.assertEqual(entry["status"], 200)
+        self.assertGreater(entry["bytes"], 0)
+        self.assertGreaterEqual(entry["duration_ms"], entry["spans_ms"]["Pokemon.get"])
+        self.assertIn("Pokemon.serialize", entry["spans_ms"])
+
+
+class ProfilingTest(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings = override_settings(POKEMON_PROFILE_DIR=self.directory)
+        self.settings.enable()
+        Pokemon(
+            name="pikachu", description="A mouse", habitat="forest", isLegendary=False
+        ).save()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.directory)
+        RedisClient.delete(
+            keys.species_key("pikachu"), keys.etag_key("pikachu", Pokemon.PLAIN)
+        )
+        PokemonCache.clear()
+
+    def profiles(self):
+        return ProfileRing(self.directory, 50).names()
+
+    def test_requests_are_not_profiled_unless_asked(self):
+        response = self.client.get("/pokemon/pikachu/?profile=1")
+        self.assertNotIn("X-Pokedex-Profile-Id", response)
+        response = self.client.get(
+            "/pokemon/pikachu/", headers={PROFILE_HEADER: "profile:forged"}
+        )
+        self.assertNotIn("X-Pokedex-Profile-Id", response)
+        self.assertEqual(self.profiles(), [])
+
+    def test_signed_header_profiles_the_request(self):
+        response = self.client.get(
+            "/pokemon/pikachu/", headers={PROFILE_HEADER: make_token()}
+        )
+        self.assertEqual(response.status_code, 200)
+        name = response["X-Pokedex-Profile-Id"]
+        self.assertEqual(self.profiles(), [name])
+
+        ring = ProfileRing(self.directory, 50)
+        details = ring.details(name)
+        self.assertEqual(details["path"], "/pokemon/pikachu/")
+        self.assertEqual(details["status"], 200)
+        self.assertEqual(details["trigger"], "header")
+        self.assertIn("serialize", ring.summary(name))
+
+    @override_settings(POKEMON_PROFILE_ALLOWED_IPS=["127.0.0.1"])
+    def test_query_flag_profiles_allowlisted_addresses(self):
+        response = self.client.get("/pokemon/pikachu/?profile=1")
+        self.assertIn("X-Pokedex-Profile-Id", response)
+        response = self.client.get("/metrics?profile=1")
+        self.assertNotIn("X-Pokedex-Profile-Id", response)
+
+    @override_settings(POKEMON_PROFILE_SAMPLE_RATE=1, POKEMON_PROFILE_RING_SIZE=2)
+    def test_ring_keeps_the_newest_profiles(self):
+        names = [
+            self.client.get("/pokemon/pikachu/")["X-Pokedex-Profile-Id"]
+            for _ in range(3)
+        ]
+        self.assertEqual(self.profiles(), names[1:])
+
+        output = io.StringIO()
+        call_command("profiles", stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
+        self.assertIn("sample", output.getvalue())
+
+        output = io.StringIO()
+        call_command("profiles", names[-1], "--limit", "5", stdout=output)
+        self.assertIn("function calls", output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("profiles", names[0], stdout=io.StringIO())
+
+
+LEAN_SETTINGS_PROBE = """
+import json, sys
+import django
+django.setup()
+from django.test import Client
+from pokemon.views import PokemonRetrieveView
+response = Client().get("/pokemon/", {"names": ""}, HTTP_ACCEPT="*/*")
+print(json.dumps({
+    "status": response.status_code,
+    "content_type": response["Content-Type"],
+    "cookies": list(response.cookies),
+    "renderers": [c.__name__ for c in PokemonRetrieveView.renderer_classes],
+    "sessions": "django.contrib.sessions.middleware" in sys.modules,
+}))
+"""
+
+
+class LeanSettingsTest(APITestCase):
+    def test_lean_profile_serves_json_without_sessions(self):
+        output = subprocess.run(
+            [sys.executable, "-c", LEAN_SETTINGS_PROBE],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE="pokedex.settings_lean"),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        probe = json.loads(output.splitlines()[-1])
+        self.assertEqual(probe["status"], 400)
+        self.assertEqual(probe["content_type"], "application/json")
+        self.assertEqual(probe["cookies"], [])
+        self.assertEqual(probe["renderers"], ["JSONRenderer"])
+        self.assertFalse(probe["sessions"])
+
+
+class WorkersTest(APITestCase):
+    def setUp(self):
+        Pokemon(
+            name="pikachu", description="A mouse", habitat="forest", isLegendary=False
+        ).save()
+        PokemonCache.clear()
+        workers.reset_after_fork()
+
+    def tearDown(self):
+        RedisClient.delete(
+            keys.species_key("pikachu"), keys.etag_key("pikachu", Pokemon.PLAIN)
+        )
+        PokemonCache.clear()
+
+    def test_ready_passes_once_the_worker_is_warm(self):
+        with patch("pokemon.views.submit_once") as submit_once:
+            response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+        submit_once.assert_called_once_with("warmup", 1, "warmup", workers.warm_up)
+
+        with override_settings(POKEMON_WARM_SPECIES=["pikachu"]):
+            self.assertTrue(workers.warm_up())
+        self.assertIsNotNone(PokemonCache.get("pikachu"))
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ready"})
+
+    def test_not_ready_without_redis(self):
+        failure = redis.ConnectionError("down")
+        with patch.object(RedisClient, "ping", side_effect=failure):
+            self.assertFalse(workers.warm_up())
+        self.assertFalse(workers.is_warm())
+
+        self.assertTrue(workers.warm_up())
+        with patch.object(RedisClient, "ping", side_effect=failure):
+            response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+
+    def test_reset_after_fork_drops_inherited_connections(self):
+        RedisClient.ping()
+        session = services.get_session()
+        self.assertTrue(workers.warm_up())
+
+        workers.reset_after_fork()
+        self.assertFalse(workers.is_warm())
+        self.assertEqual(RedisClient.connection_pool._created_connections, 0)
+        self.assertIsNot(services.get_session(), session)
+        self.assertTrue(RedisClient.ping())
+
+    def test_gunicorn_config_selects_the_worker_class(self):
+        path = os.path.join(settings.BASE_DIR, "pokedex", "gunicorn_conf.py")
+        with patch.dict(os.environ, GUNICORN_WORKER_CLASS="uvicorn"):
+            config = runpy.run_path(path)
+        self.assertEqual(config["worker_class"], "uvicorn.workers.UvicornWorker")
+        self.assertEqual(config["wsgi_app"], "pokedex.asgi:application")
+        self.assertTrue(config["preload_app"])
+        with patch.dict(os.environ, GUNICORN_WORKER_CLASS="eventlet"):
+            self.assertRaises(ValueError, runpy.run_path, path)
@@ -0,0 +1,221 @@
+"""
+Cluster-wide protection for rate-limited upstreams.
+
+State lives in Redis so every worker draws from the same quota and sees the
+same breaker: a token bucket refilled continuously at a fixed rate, and a
+circuit breaker that stops calls for a cooldown once the upstream answers
+with 429s or 5xx errors.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from pokemon import keys
+
+logger = logging.getLogger(__name__)
+
+# Refill, then take ``ARGV[3]`` tokens if there are enough. Taking 0 tokens
+# only reports the current level. Uses the Redis clock so workers with
+# drifting clocks still agree.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call("time")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("hmget", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if requested > 0 and tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+    redis.call("hset", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+    redis.call("pexpire", KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+end
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucket:
+    """
+    Allows ``capacity`` calls at once, refilled at ``rate`` calls per second,
+    shared by every worker using the same Redis. A rate of 0 disables it.
+    """
+
+    def __init__(
+        self, name: str, redis_client: redis.Redis, rate: float, capacity: int
+    ) -> None:
+        self.name = name
+        self.redis_client = redis_client
+        self.rate = rate
+        self.capacity = capacity
+
+    @property
+    def key(self) -> str:
+        return keys.throttle_key(self.name, "bucket")
+
+    def acquire(self, tokens: int = 1) -> bool:
+        if not self.rate:
+            return True
+        allowed, _ = self.redis_client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity, tokens
+        )
+        return bool(allowed)
+
+    async def aacquire(self, redis_client, tokens: int = 1) -> bool:
+        if not self.rate:
+            return True
+        allowed, _ = await redis_client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity, tokens
+        )
+        return bool(allowed)
+
+    def remaining(self) -> Optional[float]:
+        if not self.rate:
+            return None
+        _, tokens = self.redis_client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity, 0
+        )
+        return float(tokens)
+
+    def reset(self) -> None:
+        self.redis_client.delete(self.key)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "remaining": self.remaining(),
+        }
+
+
+class CircuitBreaker:
+    """
+    Opens for ``cooldown`` seconds after ``failure_threshold`` failures in a
+    row, or straight away when the upstream says it is rate limiting us.
+    While open, ``allow`` answers from memory once any call has seen the open
+    state, so a short-circuited call costs no I/O at all.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        redis_client: redis.Redis,
+        failure_threshold: int,
+        cooldown: float,
+    ) -> None:
+        self.name = name
+        self.redis_client = redis_client
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._open_until = 0.0
+
+    @property
+    def open_key(self) -> str:
+        return keys.throttle_key(self.name, "open")
+
+    @property
+    def failures_key(self) -> str:
+        return keys.throttle_key(self.name, "failures")
+
+    def cooldown_ms(self, retry_after: Optional[float] = None) -> int:
+        return int(max(self.cooldown, retry_after or 0) * 1000)
+
+    def allow(self) -> bool:
+        if time.monotonic() < self._open_until:
+            return False
+        return self._remember(self.redis_client.pttl(self.open_key))
+
+    async def aallow(self, redis_client) -> bool:
+        if time.monotonic() < self._open_until:
+            return False
+        return self._remember(await redis_client.pttl(self.open_key))
+
+    def _remember(self, pttl: int) -> bool:
+        if pttl > 0:
+            self._open_until = time.monotonic() + pttl / 1000
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.redis_client.delete(self.failures_key)
+
+    async def arecord_success(self, redis_client) -> None:
+        await redis_client.delete(self.failures_key)
+
+    def record_failure(
+        self, retry_after: Optional[float] = None, trip: bool = False
+    ) -> None:
+        """
+        Count a failed call; ``trip`` opens the breaker regardless of the
+        count, for at least ``retry_after`` seconds when given.
+        """
+        if not trip:
+            pipe = self.redis_client.pipeline()
+            pipe.incr(self.failures_key)
+            pipe.pexpire(self.failures_key, self.cooldown_ms())
+            failures, _ = pipe.execute()
+            trip = failures >= self.failure_threshold
+        if trip:
+            self.trip(retry_after)
+
+    async def arecord_failure(
+        self, redis_client, retry_after: Optional[float] = None, trip: bool = False
+    ) -> None:
+        if not trip:
+            pipe = redis_client.pipeline()
+            pipe.incr(self.failures_key)
+            pipe.pexpire(self.failures_key, self.cooldown_ms())
+            failures, _ = await pipe.execute()
+            trip = failures >= self.failure_threshold
+        if trip:
+            pipe = redis_client.pipeline()
+            self._queue_trip(pipe, retry_after)
+            await pipe.execute()
+
+    def trip(self, retry_after: Optional[float] = None) -> None:
+        pipe = self.redis_client.pipeline()
+        self._queue_trip(pipe, retry_after)
+        pipe.execute()
+
+    def _queue_trip(self, pipe, retry_after: Optional[float]) -> None:
+        cooldown = self.cooldown_ms(retry_after)
+        logger.warning("Opening %s circuit for %.1fs", self.name, cooldown / 1000)
+        pipe.set(self.open_key, 1, px=cooldown)
+        pipe.delete(self.failures_key)
+        self._open_until = time.monotonic() + cooldown / 1000
+
+    def reset(self) -> None:
+        self.redis_client.delete(self.open_key, self.failures_key)
+        self._open_until = 0.0
+
+    def status(self) -> Dict[str, Any]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.pttl(self.open_key)
+        pipe.get(self.failures_key)
+        pttl, failures = pipe.execute()
+        return {
+            "state": self.OPEN if pttl > 0 else self.CLOSED,
+            "retry_in": round(pttl / 1000, 3) if pttl > 0 else 0,
+            "failures": int(failures or 0),
+            "failure_threshold": self.failure_threshold,
+            "cooldown": self.cooldown,
+        }
+
+
+def retry_after(headers) -> Optional[float]:
+    """
+    The delay a Retry-After header asks for, in seconds, if it gives one.
+    """
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
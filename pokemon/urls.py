@@ -1,17 +1,31 @@
+from django.conf import settings
 from django.urls import include, path
 from . import views
 
 
+if settings.POKEMON_ASYNC_VIEWS:
+    retrieve_view = views.AsyncPokemonRetrieveView
+    translate_view = views.AsyncPokemonTranslateView
+else:
+    retrieve_view = views.PokemonRetrieveView
+    translate_view = views.PokemonTranslateView
+
+
 urlpatterns = [
     path('', include([
+        path(
+            '',
+            views.PokemonBulkView.as_view(),
+            name='pokemon-bulk'
+        ),
         path(
             'translated/<slug:pokemon_name>/',
-            views.PokemonTranslateView.as_view(),
+            translate_view.as_view(),
             name='pokemon-translate'
         ),
         path(
             '<slug:pokemon_name>/',
-            views.PokemonRetrieveView.as_view(),
+            retrieve_view.as_view(),
             name='pokemon-retrieve'
         ),
     ]))
@@ -1,38 +1,440 @@
+import redis
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags
+from django.views import View
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from pokemon.models import Pokemon
-from pokemon.serializers import PokemonSerializer, PokemonTranslatedSerializer
+from pokemon.metrics import metrics
+from pokemon.models import Pokemon, RedisClient, count_lookup, get_async_redis_client
+from pokemon.serializers import (
+    PokemonBulkRequestSerializer,
+    PokemonLanguageSerializer,
+    PokemonSerializer,
+    PokemonTranslatedSerializer,
+    is_valid,
+    render,
+)
+from pokemon.services import UpstreamUnavailable, submit_once
+from pokemon.workers import is_warm, warm_up
 
 
-class PokemonRetrieveView(APIView):
+def cache_control():
+    if not settings.POKEMON_HTTP_MAX_AGE:
+        return "no-cache"
+    directives = ["public", f"max-age={settings.POKEMON_HTTP_MAX_AGE}"]
+    if settings.POKEMON_HTTP_STALE_WHILE_REVALIDATE:
+        directives.append(
+            f"stale-while-revalidate={settings.POKEMON_HTTP_STALE_WHILE_REVALIDATE}"
+        )
+    return ", ".join(directives)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an ``If-None-Match`` header covers ``etag``, comparing weakly as
+    RFC 9110 asks for GET.
+    """
+    if not if_none_match or not etag:
+        return False
+    etags = parse_etags(if_none_match)
+    return "*" in etags or any(tag.removeprefix("W/") == etag for tag in etags)
+
+
+def cacheable(request, response, etag):
+    """
+    Mark a response as cacheable under ``etag``, or swap it for a 304 when
+    the client already holds that version.
+    """
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        response = HttpResponseNotModified()
+    if etag:
+        response["ETag"] = etag
+    response["Cache-Control"] = cache_control()
+    return response
+
+
+def not_cacheable(response):
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def json_body_response(body):
+    return HttpResponse(body, content_type="application/json")
+
+
+def stored_response(request, body, etag):
+    """
+    Answer from what is stored for a variant, without building a Pokemon:
+    a 304 if the client's copy is current, the body if rendered bodies are
+    served, or None to go on to the view.
+    """
+    etag = etag and etag.decode("utf-8")
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        count_lookup("rendered", "not_modified")
+        return cacheable(request, HttpResponseNotModified(), etag)
+    if body and settings.POKEMON_RENDERED_CACHE:
+        count_lookup("rendered", "hit")
+        return cacheable(request, json_body_response(body), etag)
+    count_lookup("rendered", "miss")
+    return None
+
+
+def rendered_missing(body, etag):
+    """
+    Whether a variant is missing something it should have stored: its ETag,
+    or its body when rendered bodies are served.
+    """
+    return etag is None or (body is None and settings.POKEMON_RENDERED_CACHE)
+
+
+def needs_stored_response(request):
+    return settings.POKEMON_RENDERED_CACHE or "If-None-Match" in request.headers
+
+
+class RenderedCacheMixin:
+    """
+    Answer conditional requests, and serve pre-rendered bodies when
+    ``POKEMON_RENDERED_CACHE`` is on, straight from Redis before any DRF
+    request handling.
+    """
+
+    variant = None
+
+    def get_variant(self, request):
+        return self.variant
+
+    def dispatch(self, request, *args, **kwargs):
+        variant = self.get_variant(request)
+        self.rendered_missing = False
+        if request.method == "GET" and variant and needs_stored_response(request):
+            stored = RedisClient.mget(
+                Pokemon.rendered_keys(kwargs["pokemon_name"], variant)
+            )
+            response = stored_response(request, *stored)
+            if response:
+                return response
+            self.rendered_missing = rendered_missing(*stored)
+        return super().dispatch(request, *args, **kwargs)
+
+    def store_rendered(self, pokemon_name, data):
+        """
+        Return the ETag of the rendered body. Saving a pokemon stores its
+        rendered variants; only those ``dispatch`` found missing, e.g. after
+        they expired, are stored here, and never over a newer version.
+        """
+        body = render(data)
+        if not self.rendered_missing:
+            return Pokemon.rendered_etag(body)
+        return Pokemon.save_rendered(
+            pokemon_name,
+            self.get_variant(self.request),
+            body,
+            keep_body=settings.POKEMON_RENDERED_CACHE,
+            only_missing=True,
+        )
+
+
+class LanguageMixin:
+    """
+    Pick the description language from ``?lang=``; each language is its own
+    rendered variant.
+    """
+
+    def get_language(self, request):
+        """
+        Return the requested language, or None for the default, and the
+        validation errors if it is malformed.
+        """
+        serializer = PokemonLanguageSerializer(data=request.GET)
+        if not is_valid(serializer):
+            return None, serializer.errors
+        return serializer.validated_data.get("lang"), None
+
+    def get_variant(self, request):
+        language, errors = self.get_language(request)
+        if errors:
+            return None
+        return Pokemon.rendered_variant(self.variant, language)
+
+
+def no_description_response(response_class):
+    return response_class({"detail": "No description in that language"}, status=404)
+
+
+def upstream_unavailable_response(response_class, error):
+    """
+    Answer 503, or 504 on a timeout, when the species had to be fetched and
+    PokeAPI couldn't provide it.
+    """
+    return response_class(
+        {"detail": "Pokemon service unavailable"},
+        status=error.status,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+class PokemonRetrieveView(LanguageMixin, RenderedCacheMixin, APIView):
+    variant = Pokemon.PLAIN
+
     def get(self, request, pokemon_name):
-        redis_pokemon = Pokemon.get(pokemon_name)
+        language, errors = self.get_language(request)
+        if errors:
+            return Response(data=errors, status=400)
+        try:
+            redis_pokemon = Pokemon.get(pokemon_name)
+        except UpstreamUnavailable as e:
+            return upstream_unavailable_response(Response, e)
         if not redis_pokemon:
             return Response(data={"detail": "Pokemon not found"}, status=404)
 
         redis_pokemon.save()
-        serializer = PokemonSerializer(data=redis_pokemon.serialize())
-        if serializer.is_valid():
-            return Response(data=serializer.data, status=200)
+        if redis_pokemon.description_in(language) is None:
+            return no_description_response(Response)
+        serializer = PokemonSerializer(data=redis_pokemon.serialize(language=language))
+        if is_valid(serializer):
+            etag = self.store_rendered(pokemon_name, serializer.data)
+            return cacheable(request, Response(data=serializer.data, status=200), etag)
         return Response(data=serializer.errors, status=400)
 
 
-class PokemonTranslateView(APIView):
+def translation_queued():
+    return settings.POKEMON_TRANSLATION_MODE == "queue"
+
+
+def translation_pending_response(response_class):
+    return response_class(
+        {"detail": "Translation pending"},
+        status=202,
+        headers={
+            "Retry-After": str(settings.POKEMON_TRANSLATION_RETRY_AFTER),
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+class PokemonTranslateView(RenderedCacheMixin, APIView):
+    variant = Pokemon.TRANSLATED
+
     def get(self, request, pokemon_name):
-        redis_pokemon = Pokemon.get(pokemon_name)
+        try:
+            redis_pokemon = Pokemon.get(pokemon_name)
+        except UpstreamUnavailable as e:
+            return upstream_unavailable_response(Response, e)
         if not redis_pokemon:
             return Response(data={"detail": "Pokemon not found"}, status=404)
-        redis_pokemon.translate_description()
-        redis_pokemon.save()
+        if translation_queued() and not redis_pokemon.translation:
+            redis_pokemon.save()
+            redis_pokemon.enqueue_translation()
+            if settings.POKEMON_TRANSLATION_PENDING_STATUS == 202:
+                return translation_pending_response(Response)
+        else:
+            redis_pokemon.translate_description()
+            redis_pokemon.save()
         serializer = PokemonTranslatedSerializer(
             data=redis_pokemon.serialize(translate=True)
         )
-        if serializer.is_valid():
-            return Response(data=serializer.data, status=200)
+        if is_valid(serializer):
+            response = Response(data=serializer.data, status=200)
+            # An untranslated fallback is not worth keeping.
+            if not redis_pokemon.translation:
+                return not_cacheable(response)
+            etag = self.store_rendered(pokemon_name, serializer.data)
+            return cacheable(request, response, etag)
         return Response(data=serializer.errors, status=400)
 
         # return Response(
         #     data=serializer.data,
         #     status=200
         # )
+
+
+class PokemonBulkView(APIView):
+    """
+    Look up many pokemon in one request, either as
+    ``GET /pokemon/?names=a,b,c&translated=1`` or by POSTing
+    ``{"names": [...], "translated": true}``. Names that can't be retrieved
+    are reported under ``errors`` without failing the rest. With queued
+    translations, missing ones are queued and named under ``pending``.
+    """
+
+    def get(self, request):
+        names = request.query_params.get("names", "")
+        data = {"names": [name for name in names.split(",") if name.strip()]}
+        if "translated" in request.query_params:
+            data["translated"] = request.query_params["translated"]
+        return self.lookup(data)
+
+    def post(self, request):
+        return self.lookup(request.data)
+
+    def lookup(self, data):
+        request_serializer = PokemonBulkRequestSerializer(data=data)
+        if not is_valid(request_serializer):
+            return Response(data=request_serializer.errors, status=400)
+        translate = request_serializer.validated_data["translated"]
+        queued = translate and translation_queued()
+        pokemons, errors = Pokemon.get_many(
+            request_serializer.validated_data["names"],
+            translate=translate and not queued,
+        )
+        pending = None
+        if queued:
+            pending = [
+                name for name, pokemon in pokemons.items() if not pokemon.translation
+            ]
+            Pokemon.enqueue_translations(pending)
+            if settings.POKEMON_TRANSLATION_PENDING_STATUS == 202:
+                for name in pending:
+                    del pokemons[name]
+
+        serializer_class = (
+            PokemonTranslatedSerializer if translate else PokemonSerializer
+        )
+        results = []
+        for name, pokemon in pokemons.items():
+            serializer = serializer_class(data=pokemon.serialize(translate=translate))
+            if is_valid(serializer):
+                results.append(serializer.data)
+            else:
+                errors[name] = serializer.errors
+        data = {"results": results, "errors": errors}
+        if pending is not None:
+            data["pending"] = pending
+        return Response(data=data, status=200)
+
+
+class AsyncRenderedCacheMixin:
+    """
+    Async counterpart of ``RenderedCacheMixin``.
+    """
+
+    variant = None
+
+    def get_variant(self, request):
+        return self.variant
+
+    async def dispatch(self, request, *args, **kwargs):
+        variant = self.get_variant(request)
+        self.rendered_missing = False
+        if request.method == "GET" and variant and needs_stored_response(request):
+            stored = await get_async_redis_client().mget(
+                Pokemon.rendered_keys(kwargs["pokemon_name"], variant)
+            )
+            response = stored_response(request, *stored)
+            if response:
+                return response
+            self.rendered_missing = rendered_missing(*stored)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def store_rendered(self, pokemon_name, data):
+        """
+        Return the rendered body and its ETag, so the response is exactly
+        what the ETag describes, storing them only where ``dispatch`` found
+        them missing.
+        """
+        body = render(data)
+        if not self.rendered_missing:
+            return body, Pokemon.rendered_etag(body)
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        etag = Pokemon.queue_save_rendered(
+            pipe,
+            pokemon_name,
+            self.get_variant(self.request),
+            body,
+            keep_body=settings.POKEMON_RENDERED_CACHE,
+            only_missing=True,
+        )
+        await pipe.execute()
+        return body, etag
+
+
+class AsyncPokemonRetrieveView(LanguageMixin, AsyncRenderedCacheMixin, View):
+    """
+    Native async variant of ``PokemonRetrieveView`` used under ASGI.
+    """
+
+    variant = Pokemon.PLAIN
+
+    async def get(self, request, pokemon_name):
+        language, errors = self.get_language(request)
+        if errors:
+            return JsonResponse(errors, status=400)
+        try:
+            redis_pokemon = await Pokemon.aget(pokemon_name)
+        except UpstreamUnavailable as e:
+            return upstream_unavailable_response(JsonResponse, e)
+        if not redis_pokemon:
+            return JsonResponse({"detail": "Pokemon not found"}, status=404)
+
+        await redis_pokemon.asave()
+        if redis_pokemon.description_in(language) is None:
+            return no_description_response(JsonResponse)
+        serializer = PokemonSerializer(data=redis_pokemon.serialize(language=language))
+        if is_valid(serializer):
+            body, etag = await self.store_rendered(pokemon_name, serializer.data)
+            return cacheable(request, json_body_response(body), etag)
+        return JsonResponse(serializer.errors, status=400)
+
+
+class AsyncPokemonTranslateView(AsyncRenderedCacheMixin, View):
+    """
+    Native async variant of ``PokemonTranslateView`` used under ASGI.
+    """
+
+    variant = Pokemon.TRANSLATED
+
+    async def get(self, request, pokemon_name):
+        try:
+            redis_pokemon = await Pokemon.aget(pokemon_name)
+        except UpstreamUnavailable as e:
+            return upstream_unavailable_response(JsonResponse, e)
+        if not redis_pokemon:
+            return JsonResponse({"detail": "Pokemon not found"}, status=404)
+        if translation_queued() and not redis_pokemon.translation:
+            await redis_pokemon.asave()
+            await redis_pokemon.aenqueue_translation()
+            if settings.POKEMON_TRANSLATION_PENDING_STATUS == 202:
+                return translation_pending_response(JsonResponse)
+        else:
+            await redis_pokemon.atranslate_description()
+            await redis_pokemon.asave()
+        serializer = PokemonTranslatedSerializer(
+            data=redis_pokemon.serialize(translate=True)
+        )
+        if is_valid(serializer):
+            if not redis_pokemon.translation:
+                return not_cacheable(JsonResponse(serializer.data, status=200))
+            body, etag = await self.store_rendered(pokemon_name, serializer.data)
+            return cacheable(request, json_body_response(body), etag)
+        return JsonResponse(serializer.errors, status=400)
+
+
+class MetricsView(View):
+    """
+    The metrics of every worker in the Prometheus text format.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class ReadyView(View):
+    """
+    Readiness check: 200 once this worker is warm (see ``pokemon.workers``)
+    and Redis answers, 503 until then. A worker no server hook warmed up
+    starts warming on its first check.
+    """
+
+    def get(self, request):
+        if not is_warm():
+            submit_once("warmup", 1, "warmup", warm_up)
+            return JsonResponse({"status": "warming"}, status=503)
+        try:
+            RedisClient.ping()
+        except redis.RedisError:
+            return JsonResponse({"status": "redis unavailable"}, status=503)
+        return JsonResponse({"status": "ready"})
@@ -0,0 +1,85 @@
+"""
+Worker lifecycle under a pre-forking server such as gunicorn (see
+pokedex/gunicorn_conf.py).
+
+With ``preload_app`` the application is imported once in the master and the
+workers are forked from it. ``preload`` loads the read-only data every worker
+can share from the master, ``reset_after_fork`` drops the connections a
+worker inherited, and ``warm_up`` readies a worker's own caches before it
+reports ready.
+"""
+
+import logging
+import os
+
+import redis
+from django.conf import settings
+
+from pokemon import services
+from pokemon.metrics import metrics
+from pokemon.models import (
+    Pokemon,
+    PokemonCacheInvalidator,
+    RedisClient,
+    SpeciesNames,
+)
+from pokemon.pack import get_species_pack
+
+logger = logging.getLogger(__name__)
+
+_warm_pid = None
+
+
+def preload() -> None:
+    """
+    Load the species index and map the species pack, so forked workers share
+    their pages copy-on-write instead of each loading its own.
+    """
+    SpeciesNames.reload()
+    if settings.POKEMON_DATA_SOURCE == "pack":
+        get_species_pack()
+
+
+def reset_after_fork() -> None:
+    """
+    Forget the Redis connections and HTTP session inherited from the parent.
+    The pools are reset rather than disconnected: shutting the sockets down
+    would cut the parent's connections too.
+    """
+    global _warm_pid
+    for client in (RedisClient, metrics.redis_client):
+        client.connection_pool.reset()
+    services.reset_session()
+    _warm_pid = None
+
+
+def warm_up() -> bool:
+    """
+    Connect to Redis, start the cache invalidator and the metrics flusher and
+    fill the local cache with ``POKEMON_WARM_SPECIES``. Returns whether the
+    worker is warm; if Redis can't be reached it is not, and a later call
+    tries again.
+    """
+    global _warm_pid
+    if is_warm():
+        return True
+    try:
+        RedisClient.ping()
+        services.get_session()
+        if metrics.enabled:
+            metrics.ensure_flushing()
+        PokemonCacheInvalidator.ensure_listening()
+        if settings.POKEMON_WARM_SPECIES:
+            _, errors = Pokemon.get_many(settings.POKEMON_WARM_SPECIES)
+            if errors:
+                logger.warning("Could not warm up %s species", len(errors))
+    except redis.RedisError as e:
+        logger.warning("Could not warm up worker %s: %s", os.getpid(), e)
+        return False
+    _warm_pid = os.getpid()
+    logger.info("Worker %s is warm", os.getpid())
+    return True
+
+
+def is_warm() -> bool:
+    return _warm_pid == os.getpid()